@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+#
+#  spectrum_similarity.py
+"""
+Benchmarks for :mod:`chemistry_tools.spectrum_similarity`.
+
+Synthetic spectra are generated with realistic distributions: precursor *m/z* values between 150 and 1000,
+fragment *m/z* values below the precursor (rounded to 0.01, so related spectra share peaks exactly),
+and log-normally distributed intensities. Queries are noisy copies of library spectra,
+with peaks dropped and intensities perturbed, so every search has true matches to find.
+
+The results are written as JSON, for comparison between versions.
+With ``chemistry_tools`` installed, run::
+
+	python3 benchmarks/spectrum_similarity.py --output bench_output.json
+	python3 benchmarks/spectrum_similarity.py --quick
+	python3 benchmarks/spectrum_similarity.py --library-sizes 1000 1000000
+
+No network access is required.
+The ``--quick`` run takes a few seconds; the default sizes take a few minutes.
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# 3rd party
+import numpy
+
+# this package
+from chemistry_tools.spectrum_similarity import Spectrum, SpectrumSimilarity
+from chemistry_tools.spectrum_similarity.scoring import score_pairs
+from chemistry_tools.spectrum_similarity.search import SpectralLibrary, search_library
+
+__all__ = [
+		"synthetic_spectrum",
+		"synthetic_library",
+		"noisy_copy",
+		"bench_pairwise",
+		"bench_library",
+		"run",
+		"main",
+		]
+
+
+def synthetic_spectrum(rng: numpy.random.Generator, n_peaks: int) -> Spectrum:
+	"""
+	Generate a random tandem mass spectrum.
+
+	:param rng:
+	:param n_peaks: The number of peaks.
+	"""
+
+	precursor_mz = rng.uniform(150, 1000)
+	mz = numpy.round(rng.uniform(50, max(precursor_mz, 50 + n_peaks * 0.02), size=n_peaks), 2)
+	mz = numpy.unique(mz)
+	intensity = rng.lognormal(mean=0, sigma=1.5, size=len(mz)) * 1000
+
+	return Spectrum(mz, intensity, precursor_mz=round(precursor_mz, 4))
+
+
+def noisy_copy(rng: numpy.random.Generator, spectrum: Spectrum, drop: float = 0.2) -> Spectrum:
+	"""
+	Returns a copy of ``spectrum`` with a fraction of its peaks dropped and the intensities perturbed.
+
+	:param rng:
+	:param spectrum:
+	:param drop: The fraction of peaks to drop.
+	"""
+
+	keep = rng.random(len(spectrum)) >= drop
+	keep[numpy.argmax(spectrum.intensity)] = True
+	intensity = spectrum.intensity[keep] * rng.lognormal(0, 0.2, size=keep.sum())
+
+	return Spectrum(spectrum.mz[keep], intensity, precursor_mz=spectrum.precursor_mz)
+
+
+def synthetic_library(rng: numpy.random.Generator, n_spectra: int, n_peaks: int) -> List[Spectrum]:
+	"""
+	Generate a library of random spectra.
+
+	The number of peaks of each spectrum is drawn from a Poisson distribution with mean ``n_peaks``.
+
+	:param rng:
+	:param n_spectra: The number of spectra.
+	:param n_peaks: The mean number of peaks per spectrum.
+	"""
+
+	counts = numpy.maximum(rng.poisson(n_peaks, size=n_spectra), 1)
+	return [synthetic_spectrum(rng, int(count)) for count in counts]
+
+
+def _timings(function: Callable[[], Any], repeats: int) -> Dict[str, float]:
+	times = []
+
+	for _ in range(repeats):
+		start = time.perf_counter()
+		function()
+		times.append(time.perf_counter() - start)
+
+	return {
+			"min_s": float(numpy.min(times)),
+			"median_s": float(numpy.median(times)),
+			"p95_s": float(numpy.percentile(times, 95)),
+			"repeats": repeats,
+			}
+
+
+def bench_pairwise(rng: numpy.random.Generator, n_peaks: int, repeats: int) -> Dict[str, Any]:
+	"""
+	Measure the latency of comparing two spectra with :class:`~.SpectrumSimilarity`,
+	and the throughput of :func:`~.score_pairs` on a batch of pairs.
+
+	:param rng:
+	:param n_peaks: The number of peaks in each spectrum.
+	:param repeats: The number of times to repeat each measurement.
+	"""  # noqa: D400
+
+	spectrum = synthetic_spectrum(rng, n_peaks)
+	query = noisy_copy(rng, spectrum)
+
+	def compare() -> None:
+		SpectrumSimilarity(query.to_array(), spectrum.to_array()).score()
+
+	latency = _timings(compare, repeats)
+
+	n_pairs = max(1, 100_000 // n_peaks)
+	library = synthetic_library(rng, n_pairs, n_peaks)
+	pairs = [(noisy_copy(rng, reference), reference) for reference in library]
+	batch = _timings(lambda: score_pairs(pairs, metrics=["cosine"]), max(1, repeats // 10))
+
+	return {
+			"benchmark": "pairwise",
+			"n_peaks": n_peaks,
+			"latency": latency,
+			"batch_pairs": n_pairs,
+			"batch": batch,
+			"batch_pairs_per_s": n_pairs / batch["median_s"],
+			}
+
+
+def bench_library(
+		rng: numpy.random.Generator,
+		n_spectra: int,
+		n_peaks: int,
+		n_queries: int,
+		) -> Dict[str, Any]:
+	"""
+	Measure the time and memory to build a :class:`~.SpectralLibrary`,
+	and the throughput of open and precursor-filtered searches against it.
+
+	:param rng:
+	:param n_spectra: The number of spectra in the library.
+	:param n_peaks: The mean number of peaks per spectrum.
+	:param n_queries: The number of queries to search.
+	"""  # noqa: D400
+
+	spectra = synthetic_library(rng, n_spectra, n_peaks)
+	queries = [noisy_copy(rng, spectra[idx]) for idx in rng.integers(0, n_spectra, size=n_queries)]
+
+	start = time.perf_counter()
+	library = SpectralLibrary(spectra)
+	build_s = time.perf_counter() - start
+
+	# Memory is measured in a separate build, as tracing allocations slows it down.
+	del library
+	tracemalloc.start()
+	library = SpectralLibrary(spectra)
+	_, peak_bytes = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	library_bytes = sum(
+			getattr(library, name).nbytes for name in ("mz", "intensity", "owner", "offsets", "norms", "order")
+			)
+
+	results: Dict[str, Any] = {
+			"benchmark": "library",
+			"n_spectra": n_spectra,
+			"n_peaks": n_peaks,
+			"n_queries": n_queries,
+			"build_s": build_s,
+			"build_peak_memory_bytes": peak_bytes,
+			"library_bytes": library_bytes,
+			}
+
+	for mode in ("open", "precursor"):
+		start = time.perf_counter()
+		for query in queries:
+			search_library(query, library, top_k=10, mode=mode)
+		elapsed = time.perf_counter() - start
+
+		results[mode] = {"total_s": elapsed, "queries_per_s": n_queries / elapsed}
+
+	return results
+
+
+def run(
+		peak_counts: Sequence[int] = (10, 100, 1000),
+		library_sizes: Sequence[int] = (1_000, 10_000, 100_000),
+		library_peaks: int = 50,
+		repeats: int = 50,
+		n_queries: int = 20,
+		seed: int = 20201,
+		) -> Dict[str, Any]:
+	"""
+	Run the benchmarks.
+
+	:param peak_counts: The numbers of peaks for the pairwise benchmarks.
+	:param library_sizes: The numbers of spectra for the library benchmarks.
+	:param library_peaks: The mean number of peaks of the library spectra.
+	:param repeats: The number of times to repeat each pairwise measurement.
+	:param n_queries: The number of queries to search against each library.
+	:param seed: Seed for the random number generator, so the same spectra are generated each time.
+
+	:returns: The results, with metadata about the environment.
+	"""
+
+	# this package
+	import chemistry_tools
+
+	rng = numpy.random.default_rng(seed)
+	results = []
+
+	for n_peaks in peak_counts:
+		results.append(bench_pairwise(rng, n_peaks, repeats))
+
+	for n_spectra in library_sizes:
+		results.append(bench_library(rng, n_spectra, library_peaks, n_queries))
+
+	return {
+			"metadata": {
+					"chemistry_tools": chemistry_tools.__version__,
+					"python": platform.python_version(),
+					"implementation": platform.python_implementation(),
+					"numpy": numpy.__version__,
+					"platform": platform.platform(),
+					"machine": platform.machine(),
+					"timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+					"seed": seed,
+					},
+			"results": results,
+			}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+	"""
+	Run the benchmarks from the command line.
+
+	:param argv: The command line arguments. Defaults to :py:data:`sys.argv`.
+	"""
+
+	parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip() if __doc__ else None)
+	parser.add_argument("--output", "-o", help="The file to write the JSON results to. Defaults to stdout.")
+	parser.add_argument("--peaks", type=int, nargs='+', default=[10, 100, 1000], help="Peaks per spectrum.")
+	parser.add_argument(
+			"--library-sizes",
+			type=int,
+			nargs='+',
+			default=[1_000, 10_000, 100_000],
+			help="Numbers of library spectra.",
+			)
+	parser.add_argument("--repeats", type=int, default=50, help="Repeats of each pairwise measurement.")
+	parser.add_argument("--queries", type=int, default=20, help="Queries searched against each library.")
+	parser.add_argument("--seed", type=int, default=20201)
+	parser.add_argument("--quick", action="store_true", help="Run a small version of the benchmarks.")
+	args = parser.parse_args(argv)
+
+	if args.quick:
+		args.peaks, args.library_sizes, args.repeats, args.queries = [10, 100], [1_000], 5, 5
+
+	results = run(
+			peak_counts=args.peaks,
+			library_sizes=args.library_sizes,
+			repeats=args.repeats,
+			n_queries=args.queries,
+			seed=args.seed,
+			)
+
+	output = json.dumps(results, indent=2)
+
+	if args.output:
+		with open(args.output, 'w', encoding="UTF-8") as fp:
+			fp.write(output + '\n')
+	else:
+		print(output)
+
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -3,6 +3,12 @@
 #  cache.py
 """
 Cache for HTTP requests.
+
+.. versionchanged:: 1.2.0
+
+	:data:`~.cached_requests` may be shared between threads. Its connections are kept in a pool,
+	configured with :func:`~.configure_connections`, and :func:`~.connection_pool` gives a block of code
+	(and the threads it fans out to) a separate pool of connections.
 """
 #
 #  Copyright (c) 2020 Dominic Davis-Foster <dominic@davis-foster.co.uk>
@@ -23,29 +29,451 @@ Cache for HTTP requests.
 #  MA 02110-1301, USA.
 #
 
+# stdlib
+import datetime
+import hashlib
+import os
+import re
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Union
+
 # 3rd party
+import requests
 from apeye import rate_limiter
+from cachecontrol.cache import BaseCache  # nodep
+from cachecontrol.caches.file_cache import FileCache  # nodep
+from cachecontrol.controller import CacheController  # nodep
+from cachecontrol.heuristics import ExpiresAfter, datetime_to_header, expire_after  # nodep
+from urllib3 import HTTPResponse  # nodep
+
+# this package
+from chemistry_tools.cache_backends import CacheStats
+from chemistry_tools.rate_limit import AdaptiveTokenBucket, Backoff, RateLimitAdapter, TokenBucket, _Timeout
 
 __all__ = [
+		"backoff",
+		"bucket",
 		"cache",
 		"cache_dir",
 		"cached_requests",
 		"clear_cache",
+		"BodyKeyedCacheController",
+		"bypass_negative_cache",
+		"CACHEABLE_METHODS",
+		"heuristic",
+		"NegativeExpiresAfter",
+		"NEGATIVE_STATUS_CODES",
+		"cache_stats",
+		"set_cache_backend",
+		"set_rate_limiter",
+		"configure_connections",
+		"connection_pool",
+		"get_session",
+		"register_clear_callback",
 		]
 
+#: The HTTP methods whose responses are cached.
+#:
+#: .. versionadded:: 1.2.0
+CACHEABLE_METHODS = ("GET", "POST")
+
+
+#: The HTTP status codes of error responses which are cached, for the shorter time given by
+#: :attr:`NegativeExpiresAfter.negative_delta <.NegativeExpiresAfter>`.
+#: PubChem gives these responses for identifiers which are not found or are invalid.
+#:
+#: .. versionadded:: 1.2.0
+NEGATIVE_STATUS_CODES = (400, 404)
+
+_bypass_negative_cache: "ContextVar[bool]" = ContextVar("bypass_negative_cache", default=False)
+
+
+@contextmanager
+def bypass_negative_cache() -> Iterator[None]:
+	"""
+	Context manager within which cached error responses (see :data:`~.NEGATIVE_STATUS_CODES`) are ignored,
+	and the requests are sent again.
+
+	The new responses replace those in the cache.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	token = _bypass_negative_cache.set(True)
+
+	try:
+		yield
+	finally:
+		_bypass_negative_cache.reset(token)
+
+
+class NegativeExpiresAfter(ExpiresAfter):
+	"""
+	:class:`cachecontrol.heuristics.ExpiresAfter` which caches error responses
+	(see :data:`~.NEGATIVE_STATUS_CODES`) for a shorter time than other responses.
+
+	:param expires_after: The time to cache responses for.
+	:param negative_expires_after: The time to cache error responses for.
+
+	.. versionadded:: 1.2.0
+	"""  # noqa: D400
+
+	def __init__(
+			self,
+			expires_after: datetime.timedelta = datetime.timedelta(days=28),
+			negative_expires_after: datetime.timedelta = datetime.timedelta(days=1),
+			):
+		super().__init__(
+				days=expires_after.days,
+				seconds=expires_after.seconds,
+				microseconds=expires_after.microseconds,
+				)
+
+		#: The time to cache error responses for.
+		self.negative_delta = negative_expires_after
+
+	def update_headers(self, response: HTTPResponse) -> Dict[str, str]:  # noqa: D102
+		headers = super().update_headers(response)
+
+		if response.status in NEGATIVE_STATUS_CODES:
+			headers["expires"] = datetime_to_header(expire_after(self.negative_delta))
+
+		return headers
+
+	def warning(self, response: HTTPResponse) -> str:  # noqa: D102
+		delta = self.negative_delta if response.status in NEGATIVE_STATUS_CODES else self.delta
+		return f"110 - Automatically cached for {delta}. Response might be stale"
+
+
+class BodyKeyedCacheController(CacheController):
+	"""
+	:class:`cachecontrol.controller.CacheController` which includes the body of ``POST`` requests in the cache key,
+	so responses to requests sent to the same URL with different data are cached separately.
+
+	Error responses with the status codes in :data:`~.NEGATIVE_STATUS_CODES` are also cached,
+	except within :func:`~.bypass_negative_cache`.
+
+	If the cache backend has a ``ttl(key)`` method, such as :meth:`SQLiteCache.ttl() <.SQLiteCache.ttl>`,
+	the time it returns replaces the time the response would be fresh for (including any set by a heuristic),
+	so a backend may keep responses for longer as well as shorter.
+	Error responses are never kept for longer than the heuristic allows.
+
+	.. versionadded:: 1.2.0
+	"""  # noqa: D400
+
+	def __init__(self, *args, status_codes: Optional[Collection[int]] = None, **kwargs):
+		if status_codes is None:
+			status_codes = (200, 203, 300, 301, 308, *NEGATIVE_STATUS_CODES)
+
+		super().__init__(*args, status_codes=status_codes, **kwargs)
+
+	@staticmethod
+	def _keyed(request: requests.PreparedRequest) -> requests.PreparedRequest:
+		if request.method != "POST" or not request.body or request.url is None:
+			return request
+
+		body = request.body if isinstance(request.body, bytes) else str(request.body).encode("UTF-8")
+		keyed = request.copy()
+		separator = '&' if '?' in request.url else '?'
+		keyed.url = f"{request.url}{separator}__body__={hashlib.sha256(body).hexdigest()}"
+		return keyed
+
+	def cached_request(self, request: requests.PreparedRequest) -> Any:  # noqa: D102
+		response = super().cached_request(self._keyed(request))
+
+		if response and response.status in NEGATIVE_STATUS_CODES and _bypass_negative_cache.get():
+			return False
+
+		return response
+
+	def conditional_headers(self, request: requests.PreparedRequest) -> Any:  # noqa: D102
+		return super().conditional_headers(self._keyed(request))
+
+	def cache_response(  # noqa: D102
+			self,
+			request: requests.PreparedRequest,
+			response: Union[HTTPResponse, "weakref.ReferenceType[HTTPResponse]"],
+			*args,
+			**kwargs,
+			) -> None:
+		request = self._keyed(request)
+
+		# cachecontrol passes a weak reference to responses which are cached once they have been read.
+		resolved = response() if isinstance(response, weakref.ReferenceType) else response
+		ttl = getattr(self.cache, "ttl", None)
+
+		if ttl is not None and resolved is not None and request.url is not None:
+			delta = ttl(self.cache_url(request.url))
+			if delta is not None and resolved.status not in NEGATIVE_STATUS_CODES:
+				resolved.headers["expires"] = datetime_to_header(expire_after(delta))
+				resolved.headers["cache-control"] = "public"
+
+		super().cache_response(request, response, *args, **kwargs)
+
+	def update_cached_response(self, request: requests.PreparedRequest, *args, **kwargs) -> Any:  # noqa: D102
+		return super().update_cached_response(self._keyed(request), *args, **kwargs)
+
 #: The cache object.
 cache = rate_limiter.HTTPCache("chemistry_tools")
 
 #: Instance of :class:`requests.Session` with a rate limit of 5 requests per second and a 28 day on-disk cache.
+#:
+#: .. versionchanged:: 1.2.0
+#:
+#: 	The responses to ``POST`` requests are also cached,
+#: 	as are "not found" and "bad request" errors, for 1 day (see :data:`~.heuristic`).
+#: 	Requests time out after 30 seconds, unless configured otherwise with :func:`~.configure_connections`.
 cached_requests = cache.session
 
 #: The cache directory
 cache_dir = cache.cache_dir
 
+#: The rate limiter for :data:`~.cached_requests`, allowing up to 5 requests per second,
+#: and fewer while PubChem reports a high load. It may be replaced with :func:`~.set_rate_limiter`.
+#:
+#: .. versionadded:: 1.2.0
+bucket = AdaptiveTokenBucket(rate=5)
+
+#: How requests to PubChem are retried when the server is busy or the connection fails.
+#:
+#: .. versionadded:: 1.2.0
+backoff = Backoff()
+
+# Replace apeye's adapter with one that respects the rate limit when the session is shared between threads,
+# and which caches the responses to POST requests.
+_adapter = cached_requests.get_adapter("https://")
+_adapter = RateLimitAdapter(
+		bucket,
+		cache=_adapter.cache,
+		heuristic=NegativeExpiresAfter(_adapter.heuristic.delta),
+		controller_class=BodyKeyedCacheController,
+		cacheable_methods=CACHEABLE_METHODS,
+		timeout=30,
+		)
+cached_requests.mount("https://", _adapter)
+cached_requests.mount("http://", _adapter)
+
+#: The heuristic which sets the time responses are cached for by :data:`~.cached_requests`.
+#: Set its :attr:`~.NegativeExpiresAfter.negative_delta` to change the time error responses are cached for.
+#:
+#: .. versionadded:: 1.2.0
+heuristic: NegativeExpiresAfter = _adapter.heuristic
+
+# The names of the files of FileCache, which are the SHA-224 hash of the key.
+_FILE_CACHE_NAME = re.compile("^[0-9a-f]{56}$")
+
+# The functions registered with register_clear_callback().
+_clear_callbacks: List[Callable[[], None]] = []
+
+
+def register_clear_callback(callback: Callable[[], None]) -> Callable[[], None]:
+	"""
+	Register a function to be called by :func:`~.clear_cache` before it removes the cache directory,
+	to clear a cache kept elsewhere in memory or in the cache directory.
+
+	A database kept in the cache directory should be closed by the callback, as its file is about to be deleted,
+	and opened again when next needed.
+
+	Functions which are already registered are not registered again.
+
+	:param callback:
+
+	:returns: The callback, so this may be used as a decorator.
+
+	.. versionadded:: 1.2.0
+	"""  # noqa: D400
+
+	if callback not in _clear_callbacks:
+		_clear_callbacks.append(callback)
+
+	return callback
+
 
 def clear_cache() -> None:
 	"""
 	Clear the cache.
+
+	.. versionchanged:: 1.2.0
+
+		Also clears the :class:`chemistry_tools.pubchem.records.RecordStore`,
+		the :class:`chemistry_tools.pubchem.memory_cache.MemoryCache`,
+		and the backend set with :func:`~.set_cache_backend`.
+	"""
+
+	for callback in _clear_callbacks:
+		callback()
+
+	if isinstance(_adapter.cache, FileCache):
+		cache.clear()
+	elif hasattr(_adapter.cache, "clear"):
+		_adapter.cache.clear()
+	else:
+		cache.clear()
+
+
+def set_cache_backend(backend: BaseCache) -> None:
 	"""
+	Set the storage backend for :data:`~.cached_requests`.
+
+	:param backend: The backend, such as a :class:`chemistry_tools.cache_backends.SQLiteCache`.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	_adapter.cache = _adapter.controller.cache = backend
+
+
+def set_rate_limiter(limiter: TokenBucket) -> None:
+	"""
+	Set the rate limiter for :data:`~.cached_requests`,
+	and for :class:`chemistry_tools.pubchem.aio.AsyncPubChem` clients created afterwards.
+
+	:param limiter: The rate limiter, such as a :class:`chemistry_tools.rate_limit.SharedTokenBucket`
+		to share one limit between several processes.
+
+	.. versionadded:: 1.2.0
+	"""  # noqa: D400
+
+	global bucket
+
+	bucket = _adapter.bucket = limiter
+
+
+def _configure_session(
+		session: requests.Session,
+		adapter: RateLimitAdapter,
+		max_connections: int,
+		block: bool,
+		timeout: _Timeout,
+		keep_alive: bool,
+		) -> None:
+	if max_connections < 1:
+		raise ValueError("'max_connections' must be at least 1")
+
+	adapter.timeout = timeout
+	adapter.poolmanager.clear()
+	adapter.init_poolmanager(adapter._pool_connections, max_connections, block=block)  # type: ignore[attr-defined]
+	session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+
+def configure_connections(
+		max_connections: int = 10,
+		block: bool = False,
+		timeout: _Timeout = 30,
+		keep_alive: bool = True,
+		) -> None:
+	"""
+	Configure the connections made by :data:`~.cached_requests`.
+
+	This closes any idle connections, so should be called before making requests from several threads.
+
+	:param max_connections: The maximum number of connections to keep open to each host.
+		Should be at least the number of threads making requests at once.
+	:param block: When ``max_connections`` are in use, whether to wait for one to become free.
+		If :py:obj:`False` a new connection is opened, which is closed once the request completes.
+	:param timeout: The time in seconds to wait for the server, for requests which do not give a timeout.
+		May also be a ``(connect timeout, read timeout)`` tuple. If :py:obj:`None` requests wait indefinitely.
+	:param keep_alive: Whether to keep connections open to be reused by later requests.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	_configure_session(cached_requests, _adapter, max_connections, block, timeout, keep_alive)
+
+
+# The session created by the innermost connection_pool() in the current context.
+_session: ContextVar[Optional[requests.Session]] = ContextVar("_session", default=None)
+
+
+@contextmanager
+def connection_pool(
+		max_connections: int = 10,
+		block: bool = True,
+		timeout: _Timeout = 30,
+		keep_alive: bool = True,
+		) -> Iterator[requests.Session]:
+	"""
+	Context manager within which requests to PubChem (and the other web services used by this package)
+	are made with a new session and its own pool of connections.
+
+	The session shares the cache and the rate limiter of :data:`~.cached_requests`,
+	and may be used from several threads. It is also used by the threads started by
+	:func:`chemistry_tools.pubchem.batching.map_batches`, so each batch of a large lookup reuses one of
+	``max_connections`` connections rather than opening its own. The connections are closed on exit.
+
+	.. code-block:: python
+
+		with connection_pool(max_connections=4):
+			properties = get_properties(cids, "MolecularWeight", max_workers=4)
+
+	:param max_connections: The maximum number of connections to keep open to each host.
+	:param block: When ``max_connections`` are in use, whether to wait for one to become free.
+		If :py:obj:`False` a new connection is opened, which is closed once the request completes.
+	:param timeout: The time in seconds to wait for the server, for requests which do not give a timeout.
+		May also be a ``(connect timeout, read timeout)`` tuple. If :py:obj:`None` requests wait indefinitely.
+	:param keep_alive: Whether to keep connections open to be reused by later requests.
+
+	.. versionadded:: 1.2.0
+	"""  # noqa: D400
+
+	adapter = RateLimitAdapter(
+			_adapter.bucket,
+			cache=_adapter.cache,
+			heuristic=_adapter.heuristic,
+			controller_class=BodyKeyedCacheController,
+			cacheable_methods=CACHEABLE_METHODS,
+			)
+
+	with requests.Session() as session:
+		session.mount("https://", adapter)
+		session.mount("http://", adapter)
+		_configure_session(session, adapter, max_connections, block, timeout, keep_alive)
+
+		token = _session.set(session)
+
+		try:
+			yield session
+		finally:
+			_session.reset(token)
+
+
+def get_session(default: Optional[requests.Session] = None) -> requests.Session:
+	"""
+	Returns the session to make requests with in the current context.
+
+	:param default: The session to use outside of :func:`~.connection_pool`.
+		Defaults to :data:`~.cached_requests`.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	return _session.get() or default or cached_requests
+
+
+def cache_stats() -> CacheStats:
+	"""
+	Returns statistics about the storage backend of :data:`~.cached_requests`.
+
+	Backends with a ``stats()`` method (such as :class:`chemistry_tools.cache_backends.SQLiteCache`)
+	provide their own statistics. For the default on-disk cache the number and size of the stored files are given.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	backend = _adapter.cache
+
+	if hasattr(backend, "stats"):
+		return backend.stats()
+
+	entries = size = 0
+
+	if isinstance(backend, FileCache) and os.path.isdir(backend.directory):
+		for dirpath, _, filenames in os.walk(backend.directory):
+			for filename in filenames:
+				if _FILE_CACHE_NAME.match(filename):
+					entries += 1
+					size += os.path.getsize(os.path.join(dirpath, filename))
 
-	cache.clear()
+	return CacheStats(entries=entries, size=size)
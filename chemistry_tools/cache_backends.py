@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+#
+#  cache_backends.py
+"""
+Storage backends for the HTTP cache.
+
+Any :class:`cachecontrol.cache.BaseCache` may be used to store the responses cached by
+:data:`chemistry_tools.cache.cached_requests`, by passing it to :func:`chemistry_tools.cache.set_cache_backend`.
+By default responses are stored one per file, and are kept for 28 days however large the cache grows.
+:class:`~.SQLiteCache` stores responses in a single SQLite database instead, with an optional maximum size
+(removing the least recently used responses first) and a different time to keep responses for each endpoint.
+
+.. code-block:: python
+
+	import datetime
+	from chemistry_tools.cache import set_cache_backend
+	from chemistry_tools.cache_backends import SQLiteCache
+
+	set_cache_backend(SQLiteCache(
+			max_size=500 * 1024 * 1024,
+			ttls={
+				"/listkey/": datetime.timedelta(minutes=10),
+				"/record/": datetime.timedelta(days=90),
+				},
+			))
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import datetime
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Mapping, NamedTuple, Optional, Union
+
+# 3rd party
+from cachecontrol.cache import BaseCache  # nodep
+
+__all__ = ["CacheStats", "SQLiteCache"]
+
+
+class CacheStats(NamedTuple):
+	"""
+	Statistics about the HTTP cache, from :func:`chemistry_tools.cache.cache_stats`.
+	"""
+
+	#: The number of stored responses.
+	entries: int
+
+	#: The total size of the stored responses, in bytes.
+	size: int
+
+	#: The maximum size of the cache, in bytes, or :py:obj:`None` if the size is not limited.
+	max_size: Optional[int] = None
+
+	#: The number of responses found in the cache since it was opened, if recorded by the backend.
+	hits: Optional[int] = None
+
+	#: The number of responses not found in the cache since it was opened, if recorded by the backend.
+	misses: Optional[int] = None
+
+	#: The number of responses removed to keep the cache below ``max_size`` since it was opened,
+	#: if recorded by the backend.
+	evictions: Optional[int] = None
+
+
+class SQLiteCache(BaseCache):
+	"""
+	HTTP cache backend which stores responses in an SQLite database.
+
+	:param filename: The database file. Defaults to ``http_cache.sqlite`` in the
+		:data:`chemistry_tools.cache.cache_dir`. Use ``':memory:'`` for a cache which is not saved.
+	:param max_size: The maximum total size of the stored responses, in bytes.
+		When the cache grows larger the least recently used responses are removed.
+	:param ttls: Mapping of regular expressions to the time to keep responses whose URL matches them.
+		The first matching expression is used.
+	:param default_ttl: The time to keep responses whose URL does not match any of ``ttls``.
+		If :py:obj:`None` responses are kept for as long as the response headers and
+		the cache heuristic allow (28 days for :data:`~.cached_requests`).
+
+	With :data:`~.cached_requests` (and other sessions using :class:`~.BodyKeyedCacheController`)
+	these times replace those given by the response headers and the cache heuristic, and so may be longer.
+	Other sessions only use them to shorten the time responses are kept for.
+
+	The cache may be shared between threads and between processes.
+	"""
+
+	def __init__(
+			self,
+			filename: Union[str, "os.PathLike[str]", None] = None,
+			max_size: Optional[int] = None,
+			ttls: Optional[Mapping[str, datetime.timedelta]] = None,
+			default_ttl: Optional[datetime.timedelta] = None,
+			):
+		if filename is None:
+			# this package
+			from chemistry_tools.cache import cache_dir
+
+			cache_dir.maybe_make(parents=True)
+			filename = cache_dir / "http_cache.sqlite"
+
+		self.filename = os.fspath(filename)
+		self.max_size = max_size
+		self.ttls = {re.compile(pattern): ttl for pattern, ttl in (ttls or {}).items()}
+		self.default_ttl = default_ttl
+
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+		self._lock = threading.Lock()
+		self._connection = sqlite3.connect(self.filename, timeout=30, check_same_thread=False)
+
+		with self._lock, self._connection:
+			if self.filename != ":memory:":
+				# Allow other processes to read while one is writing.
+				self._connection.execute("PRAGMA journal_mode=WAL")
+
+			self._connection.execute(
+					"CREATE TABLE IF NOT EXISTS responses ("
+					"key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+					"expires REAL, accessed REAL NOT NULL)"
+					)
+			self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({self.filename!r})>"
+
+	def ttl(self, key: str) -> Optional[datetime.timedelta]:
+		"""
+		Returns the time to keep the response stored under ``key``, from ``ttls`` or ``default_ttl``.
+
+		:param key:
+		"""
+
+		for pattern, ttl in self.ttls.items():
+			if pattern.search(key):
+				return ttl
+
+		return self.default_ttl
+
+	def get(self, key: str) -> Optional[bytes]:
+		"""
+		Returns the response stored under ``key``, or :py:obj:`None` if it is not in the cache or has expired.
+
+		:param key:
+		"""
+
+		now = time.time()
+
+		with self._lock, self._connection:
+			query = "SELECT value, expires FROM responses WHERE key = ?"
+			row = self._connection.execute(query, (key, )).fetchone()
+
+			if row is None or (row[1] is not None and row[1] <= now):
+				self.misses += 1
+				return None
+
+			self._connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+			self.hits += 1
+			return row[0]
+
+	def set(  # noqa: A003  # pylint: disable=redefined-builtin
+		self,
+		key: str,
+		value: bytes,
+		expires: Union[int, datetime.datetime, None] = None,
+		) -> None:
+		"""
+		Store a response.
+
+		:param key:
+		:param value:
+		:param expires: The time the response expires, or the number of seconds until it expires.
+		"""
+
+		now = time.time()
+		expiry_times = []
+
+		if isinstance(expires, datetime.datetime):
+			expiry_times.append(expires.timestamp())
+		elif expires is not None:
+			expiry_times.append(now + expires)
+
+		ttl = self.ttl(key)
+		if ttl is not None:
+			expiry_times.append(now + ttl.total_seconds())
+
+		with self._lock:
+			# Lock the database against other processes until the cache is back below its maximum size.
+			self._connection.execute("BEGIN IMMEDIATE")
+
+			try:
+				self._connection.execute(
+						"INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+						(key, value, len(value), min(expiry_times, default=None), now),
+						)
+				self._evict()
+			except BaseException:
+				self._connection.rollback()
+				raise
+			else:
+				self._connection.commit()
+
+	def _evict(self) -> None:
+		if self.max_size is None:
+			return
+
+		excess = self._connection.execute("SELECT TOTAL(size) FROM responses").fetchone()[0] - self.max_size
+		if excess <= 0:
+			return
+
+		evicted = []
+		for key, size in self._connection.execute("SELECT key, size FROM responses ORDER BY accessed"):
+			evicted.append((key, ))
+			excess -= size
+			if excess <= 0:
+				break
+
+		self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+		self.evictions += len(evicted)
+
+	def delete(self, key: str) -> None:
+		"""
+		Remove a response from the cache.
+
+		:param key:
+		"""
+
+		with self._lock, self._connection:
+			self._connection.execute("DELETE FROM responses WHERE key = ?", (key, ))
+
+	def clear(self) -> None:
+		"""
+		Remove all responses from the cache.
+		"""
+
+		with self._lock, self._connection:
+			self._connection.execute("DELETE FROM responses")
+
+	def compact(self) -> None:
+		"""
+		Remove expired responses and return the space they used to the operating system.
+		"""
+
+		with self._lock:
+			with self._connection:
+				self._connection.execute("DELETE FROM responses WHERE expires <= ?", (time.time(), ))
+
+			self._connection.execute("VACUUM")
+
+	def stats(self) -> CacheStats:
+		"""
+		Returns statistics about the cache.
+		"""
+
+		with self._lock:
+			entries, size = self._connection.execute("SELECT COUNT(*), TOTAL(size) FROM responses").fetchone()
+
+		return CacheStats(
+				entries=entries,
+				size=int(size),
+				max_size=self.max_size,
+				hits=self.hits,
+				misses=self.misses,
+				evictions=self.evictions,
+				)
+
+	def close(self) -> None:
+		"""
+		Close the database.
+		"""
+
+		with self._lock:
+			self._connection.close()
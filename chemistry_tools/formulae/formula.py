@@ -141,6 +141,8 @@ class Formula(defaultdict, Counter):
 		If :py:obj:`None` an empty object is created
 	:param charge:
 
+	.. versionchanged:: 1.2.0  Formula objects can be pickled and copied with :func:`copy.deepcopy`.
+
 	.. autosummary-widths:: 55/100
 	"""
 
@@ -636,6 +638,10 @@ class Formula(defaultdict, Counter):
 
 		return self.__class__(self, charge=self.charge)
 
+	def __reduce__(self):  # noqa: MAN002
+		# defaultdict would pass its default_factory to __init__, which takes the composition instead.
+		return type(self), (dict(self), self.charge), vars(self).copy()
+
 	def __missing__(self, key) -> int:  # noqa: MAN001
 		# override default behavior: we don't want to add 0's to the dictionary
 		return 0
@@ -31,7 +31,7 @@ from typing import Any, Dict, List, Pattern, Sequence, Tuple
 from pandas import DataFrame  # type: ignore[import-untyped]
 
 # this package
-from chemistry_tools import cached_requests
+from chemistry_tools.cache import get_session
 from chemistry_tools.constants import prefixes
 from chemistry_tools.pubchem.errors import HTTP_ERROR_CODES
 
@@ -284,9 +284,11 @@ def iupac_name_from_cas(cas_number: str) -> str:
 	:param cas_number: The cas number to search
 
 	:return: The IUPAC name
+
+	.. versionchanged:: 1.2.0  Uses the session of :func:`chemistry_tools.cache.connection_pool` within it.
 	"""
 
-	r = cached_requests.get(f"https://cactus.nci.nih.gov/chemical/structure/{cas_number}/iupac_name")
+	r = get_session().get(f"https://cactus.nci.nih.gov/chemical/structure/{cas_number}/iupac_name")
 	if r.status_code in HTTP_ERROR_CODES:
 		raise ValueError(f"No compound found for CAS registry number {cas_number}.")
 
@@ -300,9 +302,11 @@ def cas_from_iupac_name(iupac_name: str) -> str:
 	:param iupac_name: The IUPAC name to search.
 
 	:return: The CAS registry number.
+
+	.. versionchanged:: 1.2.0  Uses the session of :func:`chemistry_tools.cache.connection_pool` within it.
 	"""
 
-	r = cached_requests.get(f"https://cactus.nci.nih.gov/chemical/structure/{iupac_name}/cas")
+	r = get_session().get(f"https://cactus.nci.nih.gov/chemical/structure/{iupac_name}/cas")
 	if r.status_code in HTTP_ERROR_CODES:
 		raise ValueError(f"No compound found for name {iupac_name}.")
 
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+#
+#  aio.py
+"""
+Access the PubChem REST API from :mod:`asyncio` code.
+
+The functions elsewhere in :mod:`chemistry_tools.pubchem` wait for each request to complete before returning,
+so looking up thousands of compounds one after another spends most of its time waiting on the network.
+The coroutines of :class:`~.AsyncPubChem` run many requests at once, up to a configurable limit,
+while a shared :class:`~.TokenBucket` keeps the requests sent to PubChem within its limit of 5 per second.
+Responses are stored in (and served from) the same on-disk cache as the synchronous functions,
+and requests answered from the cache do not count towards the rate limit.
+
+.. code-block:: python
+
+	async def molecular_weights(names):
+		async with AsyncPubChem(concurrency=10) as client:
+			lookups = (client.get_properties(name, "MolecularWeight") for name in names)
+			return await asyncio.gather(*lookups)
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import asyncio
+import contextvars
+import datetime
+import os
+import weakref
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Collection, Dict, List, Optional, Sequence, TypeVar, Union
+
+# 3rd party
+import requests
+from apeye.requests_url import RequestsURL
+from cachecontrol import CacheControlAdapter  # nodep
+from cachecontrol.cache import BaseCache  # nodep
+from cachecontrol.caches.file_cache import FileCache  # nodep
+from pandas import DataFrame  # type: ignore[import-untyped]
+
+# this package
+import chemistry_tools.cache
+from chemistry_tools.cache import CACHEABLE_METHODS, BodyKeyedCacheController, NegativeExpiresAfter
+from chemistry_tools.cache import backoff as default_backoff
+from chemistry_tools.cache import cache_dir as default_cache_dir
+from chemistry_tools.pubchem import API_BASE
+from chemistry_tools.pubchem.batching import split_identifiers
+from chemistry_tools.pubchem.compound import Compound
+from chemistry_tools.pubchem.enums import PubChemFormats, PubChemNamespace
+from chemistry_tools.pubchem.errors import HTTP_ERROR_CODES, PubChemHTTPError
+from chemistry_tools.pubchem.lookup import _compounds_from_description
+from chemistry_tools.pubchem.properties import _requested_properties, _select_properties, parse_properties
+from chemistry_tools.pubchem.pug_rest import _prepare_rest_get, _rest_request
+from chemistry_tools.pubchem.synonyms import _parse_synonyms
+from chemistry_tools.rate_limit import Backoff, TokenBucket
+from chemistry_tools.single_flight import SingleFlight
+
+__all__ = ["AsyncPubChem"]
+
+_T = TypeVar("_T")
+
+
+class _SplitCacheAdapter(CacheControlAdapter):
+	"""
+	:class:`cachecontrol.adapter.CacheControlAdapter` which checks the cache separately from sending the request,
+	so the caller can wait for the rate limiter only if the request will actually be sent.
+	"""  # noqa: D400
+
+	def cached_response(self, request: requests.PreparedRequest) -> Optional[requests.Response]:
+		"""
+		Returns the cached response to ``request``, or :py:obj:`None` if it is not in the cache.
+
+		:param request:
+		"""
+
+		if request.method not in self.cacheable_methods:
+			return None
+
+		try:
+			cached_response = self.controller.cached_request(request)
+		except zlib.error:  # pragma: no cover
+			return None
+
+		if cached_response:
+			return self.build_response(request, cached_response, from_cache=True)
+
+		return None
+
+	def send(  # type: ignore[override]
+		self,
+		request: requests.PreparedRequest,
+		cacheable_methods: Optional[Collection[str]] = None,
+		**kwargs,
+		) -> requests.Response:
+		# The cache has already been checked by cached_response()
+		if request.method in (cacheable_methods or self.cacheable_methods):
+			request.headers.update(self.controller.conditional_headers(request))
+
+		return super(CacheControlAdapter, self).send(request, **kwargs)
+
+
+class AsyncPubChem:
+	"""
+	Asynchronous client for the PubChem REST API.
+
+	The coroutines of this class mirror the functions of the same names in the synchronous API.
+	Lists of identifiers are split between requests as described in :mod:`chemistry_tools.pubchem.batching`,
+	with all the requests made concurrently.
+	Identical requests from concurrent tasks are combined into one (see :mod:`chemistry_tools.single_flight`).
+
+	:param concurrency: The maximum number of requests in progress at once.
+	:param bucket: The rate limiter for requests sent to PubChem. May be shared between clients.
+		Defaults to :data:`chemistry_tools.cache.bucket`, which is shared with the synchronous functions
+		(see :func:`chemistry_tools.cache.set_rate_limiter`).
+	:param cache_dir: The directory of the on-disk cache.
+		Defaults to the cache used by :data:`chemistry_tools.cache.cached_requests`.
+	:param expires_after: The maximum time to cache responses for.
+	:param base_url: The base URL of the PubChem REST API.
+	:param timeout: The time in seconds to wait for the server to respond.
+	:param cache: The storage backend for the HTTP cache, such as a :class:`~.SQLiteCache`.
+		If given, ``cache_dir`` is ignored.
+	:param negative_expires_after: The time to cache "not found" and "bad request" errors for.
+		See :func:`chemistry_tools.cache.bypass_negative_cache` to ignore cached errors.
+	:param backoff: How requests which fail because the server is busy or the connection failed are retried.
+		Defaults to :data:`chemistry_tools.cache.backoff`.
+
+	The client should be closed with :meth:`~.AsyncPubChem.close` once it is finished with,
+	or used as an async context manager.
+	"""
+
+	def __init__(
+			self,
+			concurrency: int = 10,
+			bucket: Optional[TokenBucket] = None,
+			cache_dir: Union[str, "os.PathLike[str]", None] = None,
+			expires_after: datetime.timedelta = datetime.timedelta(days=28),
+			base_url: Union[str, RequestsURL] = API_BASE,
+			timeout: Optional[float] = 30,
+			cache: Optional[BaseCache] = None,
+			negative_expires_after: datetime.timedelta = datetime.timedelta(days=1),
+			backoff: Optional[Backoff] = None,
+			):
+		if concurrency < 1:
+			raise ValueError("'concurrency' must be at least 1")
+
+		self.concurrency = concurrency
+		self.bucket = bucket or chemistry_tools.cache.bucket
+		self.backoff = backoff or default_backoff
+		self.base_url = RequestsURL(str(base_url))
+		self.timeout = timeout
+
+		self._adapter = _SplitCacheAdapter(
+				cache=cache or FileCache(os.fspath(cache_dir or default_cache_dir)),
+				controller_class=BodyKeyedCacheController,
+				cacheable_methods=CACHEABLE_METHODS,
+				heuristic=NegativeExpiresAfter(expires_after, negative_expires_after),
+				# One connection for each of the requests which may be in progress at once.
+				pool_maxsize=concurrency,
+				)
+		self.session = requests.Session()
+		self.session.mount("http://", self._adapter)
+		self.session.mount("https://", self._adapter)
+
+		self._executor = ThreadPoolExecutor(max_workers=concurrency)
+		self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]"
+		self._semaphores = weakref.WeakKeyDictionary()
+		self._in_flight = SingleFlight()
+
+	async def __aenter__(self) -> "AsyncPubChem":
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:  # noqa: MAN001
+		self.close()
+
+	def close(self) -> None:
+		"""
+		Close the client's session and threads.
+		"""
+
+		self._executor.shutdown(wait=True)
+		self.session.close()
+
+	async def _run(self, function: Callable[..., _T], *args, **kwargs) -> _T:
+		loop = asyncio.get_running_loop()
+		context = contextvars.copy_context()
+		return await loop.run_in_executor(self._executor, partial(context.run, function, *args, **kwargs))
+
+	def _semaphore(self) -> asyncio.Semaphore:
+		# Created on first use in each event loop, as before Python 3.10 the semaphore is bound to a loop.
+		# Only called from coroutines, so there is always a running loop.
+		loop = asyncio.get_running_loop()
+
+		if loop not in self._semaphores:
+			self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+
+		return self._semaphores[loop]
+
+	async def get(self, path: str, params: Optional[Dict[str, str]] = None) -> requests.Response:
+		"""
+		Make a ``GET`` request to the REST API, using the cache.
+
+		:param path: The path of the request, relative to the ``base_url``.
+		:param params: The query parameters for the request.
+		"""
+
+		return await self._send(requests.Request("GET", str(self.base_url / path), params=params))
+
+	async def post(
+			self,
+			path: str,
+			data: Dict[str, str],
+			params: Optional[Dict[str, str]] = None,
+			) -> requests.Response:
+		"""
+		Make a ``POST`` request to the REST API, using the cache.
+
+		:param path: The path of the request, relative to the ``base_url``.
+		:param data: The form data to send.
+		:param params: The query parameters for the request.
+		"""
+
+		return await self._send(requests.Request("POST", str(self.base_url / path), data=data, params=params))
+
+	async def _send(self, request: requests.Request) -> requests.Response:
+		prepared = self.session.prepare_request(request)
+
+		# Identical requests from concurrent tasks share one response.
+		key = (prepared.method, prepared.url, prepared.body)
+		send = partial(self.backoff.call_async, partial(self._send_prepared, prepared))
+		return await self._in_flight.do_async(key, send)
+
+	async def _send_prepared(self, prepared: requests.PreparedRequest) -> requests.Response:
+		async with self._semaphore():
+			response = await self._run(self._adapter.cached_response, prepared)
+			if response is not None:
+				return response
+
+			await self.bucket.acquire()
+			response = await self._run(self.session.send, prepared, timeout=self.timeout)
+			self.bucket.observe(response)
+			return response
+
+	async def do_rest_get(
+			self,
+			namespace: Union[PubChemNamespace, str],
+			identifier: Union[str, int, Sequence[Union[str, int]]],
+			format_: Union[PubChemFormats, str] = PubChemFormats.JSON,
+			domain: Optional[str] = None,
+			record_type: str = "2d",
+			png_width: int = 300,
+			png_height: int = 300,
+			) -> requests.Response:
+		r"""
+		Perform a GET request, as with :func:`chemistry_tools.pubchem.pug_rest.do_rest_get`.
+
+		:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
+		:param identifier: Identifiers (e.g. name, CID) for the compounds to look up.
+			When using the CID namespace data for multiple compounds can be retrieved at once by
+			supplying either a comma-separated string or a list.
+		:param format\_: The file format to retrieve the data in.
+			Valid values are in :class:`~.PubChemFormats`, plus ``'PNG'``.
+		:param domain:
+		:param record_type:
+		:param png_width:
+		:param png_height:
+		"""
+
+		parsed_identifier, query_params = _prepare_rest_get(namespace, identifier, format_, png_width, png_height)
+		path, data = _rest_request(namespace, parsed_identifier, format_, domain, record_type, query_params)
+
+		if data is None:
+			r = await self.get(path, query_params)
+		else:
+			r = await self.post(path, data, query_params)
+
+		if r.status_code in HTTP_ERROR_CODES:
+			raise PubChemHTTPError(r)
+
+		return r
+
+	async def _map_batches(
+			self,
+			function: Callable[[Union[str, List[str]]], Awaitable[List[_T]]],
+			identifier: Union[str, int, Sequence[Union[str, int]]],
+			namespace: Union[PubChemNamespace, str],
+			) -> List[_T]:
+		# The asynchronous counterpart to batching.map_batches, with every batch requested concurrently.
+		results = await asyncio.gather(*map(function, split_identifiers(identifier, namespace)))
+		return [item for result in results for item in result]
+
+	async def get_compounds(
+			self,
+			identifier: Union[str, int, Sequence[Union[str, int]]],
+			namespace: Union[PubChemNamespace, str] = PubChemNamespace.name,
+			) -> List[Compound]:
+		"""
+		Returns a list of Compound objects for compounds that match the search criteria.
+
+		See :func:`chemistry_tools.pubchem.lookup.get_compounds`.
+
+		:param identifier: Identifiers (e.g. name, CID) for the compound to look up.
+		:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
+		"""
+
+		async def fetch(batch: Union[str, List[str]]) -> List[Compound]:
+			response = await self.do_rest_get(namespace, batch, domain="description")
+			return _compounds_from_description(response.json())
+
+		return await self._map_batches(fetch, identifier, namespace)
+
+	async def get_properties(
+			self,
+			identifier: Union[str, int, Sequence[Union[str, int]]],
+			properties: Union[Sequence[str], str] = '',
+			namespace: Union[PubChemNamespace, str] = PubChemNamespace.name,
+			as_dataframe: bool = False,
+			) -> Union[List[Dict[str, Any]], DataFrame]:
+		"""
+		Returns the requested properties for the compound with the given identifier.
+
+		See :func:`chemistry_tools.pubchem.properties.get_properties`.
+
+		:param identifier: Identifiers (e.g. name, CID) for the compound to look up.
+		:param properties: The properties to retrieve for the compound.
+			Can be either a comma-separated string or a list.
+		:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
+		:param as_dataframe: Automatically extract the properties into a pandas :class:`~pandas.DataFrame`.
+		"""
+
+		properties = _requested_properties(properties)
+
+		async def fetch(batch: Union[str, List[str]]) -> List[Dict]:
+			response = await self.do_rest_get(namespace, batch, domain=f"property/{','.join(properties)}")
+			return parse_properties(response.json())
+
+		compounds = await self._map_batches(fetch, identifier, namespace)
+		return _select_properties(compounds, properties, as_dataframe)
+
+	async def get_synonyms(
+			self,
+			identifier: Union[str, int, Sequence[Union[str, int]]],
+			namespace: Union[PubChemNamespace, str] = PubChemNamespace.name,
+			) -> List[Dict]:
+		"""
+		Returns a list of synonyms for the compound with the given identifier.
+
+		See :func:`chemistry_tools.pubchem.synonyms.get_synonyms`.
+
+		:param identifier: Identifiers (e.g. name, CID) for the compound to look up.
+		:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
+		"""
+
+		async def fetch(batch: Union[str, List[str]]) -> List[Dict]:
+			response = await self.do_rest_get(namespace, batch, domain="synonyms")
+			return _parse_synonyms(response.json())
+
+		return await self._map_batches(fetch, identifier, namespace)
+
+	async def rest_get_full_record(
+			self,
+			identifier: Union[str, int, Sequence[Union[str, int]]],
+			namespace: Union[PubChemNamespace, str] = PubChemNamespace.name,
+			record_type: str = "2d",
+			**kwargs,
+			) -> Dict:
+		r"""
+		Obtains the full record for the given compound.
+
+		See :func:`chemistry_tools.pubchem.full_record.rest_get_full_record`.
+
+		:param identifier: Identifiers (e.g. name, CID) for the compound to look up.
+		:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
+		:param record_type:
+		:param \*\*kwargs: Optional arguments that ``json.loads`` takes.
+		"""
+
+		async def fetch(batch: Union[str, List[str]]) -> List[Dict]:
+			response = await self.do_rest_get(namespace, batch, record_type=record_type)
+			return response.json(**kwargs)["PC_Compounds"]
+
+		return {"PC_Compounds": await self._map_batches(fetch, identifier, namespace)}
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+#
+#  batching.py
+"""
+Split lists of identifiers between several requests.
+
+PubChem accepts many CIDs in one request, as a comma-separated list (sent in the body of a ``POST`` request
+if the list is too long for the URL), but very large requests may time out.
+Other namespaces (such as ``name``) accept only one identifier per request.
+:func:`~.split_identifiers` divides a list of identifiers into the groups to send in each request,
+and :func:`~.map_batches` makes the requests (optionally in parallel) and joins the results in input order.
+
+:func:`~.get_properties`, :func:`~.get_synonyms`, :func:`~.get_compounds` and :func:`~.rest_get_full_record`
+use these functions automatically.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import contextvars
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence, TypeVar, Union
+
+# this package
+from chemistry_tools.pubchem.enums import PubChemNamespace
+from chemistry_tools.pubchem.utils import _force_sequence_or_csv
+
+__all__ = ["MAX_BATCH_SIZE", "MAX_IDENTIFIER_LENGTH", "split_identifiers", "map_batches"]
+
+_T = TypeVar("_T")
+
+#: The maximum number of CIDs sent in one request.
+MAX_BATCH_SIZE = 1000
+
+#: The maximum length of the comma-separated list of CIDs sent in one request.
+MAX_IDENTIFIER_LENGTH = 10_000
+
+
+def _joined_length(identifiers: Sequence[str]) -> int:
+	return sum(map(len, identifiers)) + len(identifiers) - 1
+
+
+def split_identifiers(
+		identifier: Union[str, int, Sequence[Union[str, int]]],
+		namespace: Union[PubChemNamespace, str] = PubChemNamespace.name,
+		batch_size: int = MAX_BATCH_SIZE,
+		max_length: int = MAX_IDENTIFIER_LENGTH,
+		) -> List[Union[str, List[str]]]:
+	"""
+	Split identifiers into the groups to send in each request.
+
+	CIDs are divided into as few batches as possible without exceeding ``batch_size`` or ``max_length``,
+	with the CIDs spread evenly between the batches.
+	Identifiers in other namespaces are sent one per request. A string is treated as a single identifier,
+	as names may contain commas.
+
+	:param identifier: Identifiers (e.g. name, CID) for the compounds to look up.
+	:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
+	:param batch_size: The maximum number of CIDs in each batch.
+	:param max_length: The maximum length of each batch of CIDs as a comma-separated string.
+
+	:returns: A list of batches. Batches of CIDs are lists of strings.
+	"""
+
+	if namespace != PubChemNamespace.cid:
+		if isinstance(identifier, (str, int)):
+			return [str(identifier)]
+		else:
+			return [str(value) for value in identifier]
+
+	cids = _force_sequence_or_csv(identifier, "identifier")
+
+	n_batches = max(
+			math.ceil(len(cids) / batch_size),
+			math.ceil(_joined_length(cids) / max_length),
+			)
+
+	while True:
+		bounds = [round(idx * len(cids) / n_batches) for idx in range(n_batches + 1)]
+		batches = [cids[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+		# The CIDs may vary in length, so an even split could still give a batch which is too long.
+		if all(_joined_length(batch) <= max_length for batch in batches) or n_batches >= len(cids):
+			return batches
+
+		n_batches += 1
+
+
+def map_batches(
+		function: Callable[[Union[str, List[str]]], List[_T]],
+		batches: Sequence[Union[str, List[str]]],
+		max_workers: int = 1,
+		) -> List[_T]:
+	"""
+	Call ``function`` for each batch and join the results.
+
+	:param function: Makes a single request for a batch of identifiers and returns the parsed results.
+	:param batches: The batches of identifiers, from :func:`~.split_identifiers`.
+	:param max_workers: The number of requests to make at once.
+		Requests are still made no faster than the rate limit, but waiting for the server to respond
+		and reading from the cache are overlapped.
+
+	:returns: The results for each batch, in the order of ``batches``.
+	"""
+
+	if max_workers > 1 and len(batches) > 1:
+		# Run each batch in a copy of the caller's context, so context variables
+		# (such as that set by chemistry_tools.cache.bypass_negative_cache) apply in the worker threads.
+		context = contextvars.copy_context()
+
+		with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+			results = list(executor.map(lambda batch: context.copy().run(function, batch), batches))
+	else:
+		results = [function(batch) for batch in batches]
+
+	return [item for result in results for item in result]
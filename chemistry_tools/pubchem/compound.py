@@ -60,10 +60,10 @@ from chemistry_tools.pubchem.atom import Atom, parse_atoms
 from chemistry_tools.pubchem.bond import Bond, parse_bonds
 from chemistry_tools.pubchem.enums import CoordinateType
 from chemistry_tools.pubchem.full_record import parse_full_record, rest_get_full_record
+from chemistry_tools.pubchem.memory_cache import _memoize, _request_key
 from chemistry_tools.pubchem.properties import (
 		force_valid_properties,
-		parse_properties,
-		rest_get_properties_json,
+		get_properties,
 		valid_properties
 		)
 from chemistry_tools.pubchem.synonyms import get_synonyms
@@ -145,7 +145,10 @@ class Compound(Dictable):  # noqa: PRM002
 	def _record(self) -> Dict[str, Any]:
 
 		# Only requested when required
-		record = parse_full_record(rest_get_full_record(self.CID, "cid", self.record_type))[0]
+		def lookup() -> Dict[str, Any]:
+			return parse_full_record(rest_get_full_record(self.CID, "cid", self.record_type))[0]
+
+		record = _memoize(_request_key("parsed_record", self.CID, "cid", self.record_type), lookup)
 		self._has_full_record = True
 
 		for prop in record["properties"]:
@@ -273,6 +276,11 @@ class Compound(Dictable):  # noqa: PRM002
 			See :ref:`the table at the start of this chapter <properties table>` for a list of valid properties.
 
 		:return: Dictionary mapping the property names to their values
+
+		.. versionchanged:: 1.2.0
+
+			Only the properties which have not already been retrieved are requested,
+			through :func:`~.properties.get_properties` and the :class:`~.RecordStore`.
 		"""
 
 		if isinstance(properties, str) and properties.lower() == "all":
@@ -293,8 +301,7 @@ class Compound(Dictable):  # noqa: PRM002
 
 		if properties_to_get:
 			# print("Getting from API")
-			data = rest_get_properties_json(self.CID, "cid", properties)
-			new_properties = parse_properties(data)[0]
+			new_properties = get_properties(self.CID, properties_to_get, "cid")[0]
 
 			for prop in properties_to_get:
 				self._properties[prop] = new_properties[prop]
@@ -312,6 +319,8 @@ class Compound(Dictable):  # noqa: PRM002
 
 		:param prop: The property to retrieve for the compound.
 			See :ref:`the table at the start of this chapter <properties table>` for a list of valid properties.
+
+		.. versionchanged:: 1.2.0  The property is requested through the :class:`~.RecordStore`.
 		"""
 
 		prop = str(prop)
@@ -325,8 +334,7 @@ class Compound(Dictable):  # noqa: PRM002
 
 		else:
 			# print("Getting from API")
-			data = rest_get_properties_json(self.CID, "cid", prop)
-			new_properties = parse_properties(data)[0]
+			new_properties = get_properties(self.CID, prop, "cid")[0]
 
 			self._properties[prop] = new_properties[prop]
 			return new_properties[prop]
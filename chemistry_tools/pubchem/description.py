@@ -28,6 +28,7 @@ from typing import Any, Dict, List, Sequence, Union
 
 # this package
 from chemistry_tools.pubchem.enums import PubChemNamespace
+from chemistry_tools.pubchem.memory_cache import _memoize, _request_key
 from chemistry_tools.pubchem.properties import rest_get_properties_json
 from chemistry_tools.pubchem.pug_rest import do_rest_get
 
@@ -58,10 +59,11 @@ def get_description(name: str) -> str:
 	Returns the description compound with the given name.
 
 	:param name:
+
+	.. versionchanged:: 1.2.0  The parsed description is kept in the :class:`~.MemoryCache`.
 	"""
 
-	data = rest_get_description(name, PubChemNamespace.name)
-	parsed_data = parse_description(data)
+	parsed_data = _get_description(name)
 	return parsed_data[0]["Description"]
 
 
@@ -70,10 +72,11 @@ def get_common_name(name: str) -> str:
 	Returns the common name for the compound with the given name.
 
 	:param name:
+
+	.. versionchanged:: 1.2.0  The parsed description is kept in the :class:`~.MemoryCache`.
 	"""
 
-	data = rest_get_description(name, PubChemNamespace.name)
-	parsed_data = parse_description(data)
+	parsed_data = _get_description(name)
 	return parsed_data[0]["Title"]
 
 
@@ -82,13 +85,27 @@ def get_compound_id(name: str) -> str:
 	Returns the compound ID (CID) for the compound with the given name.
 
 	:param name:
+
+	.. versionchanged:: 1.2.0  The parsed description is kept in the :class:`~.MemoryCache`.
 	"""
 
-	data = rest_get_description(name, PubChemNamespace.name)
-	parsed_data = parse_description(data)
+	parsed_data = _get_description(name)
 	return parsed_data[0]["CID"]
 
 
+def _get_description(name: str) -> List[Dict]:
+	"""
+	Returns the parsed description of the compound with the given name, using the :class:`~.MemoryCache`.
+
+	:param name:
+	"""
+
+	def lookup() -> List[Dict]:
+		return parse_description(rest_get_description(name, PubChemNamespace.name))
+
+	return _memoize(_request_key("description", name, PubChemNamespace.name), lookup)
+
+
 def rest_get_description(
 		identifier: Union[str, int, Sequence[Union[str, int]]],
 		namespace: Union[PubChemNamespace, str] = PubChemNamespace.name,
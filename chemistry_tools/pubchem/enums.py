@@ -41,8 +41,8 @@ class PubChemNamespace(StrEnum):
 	Name = NAME = name = "name", "Compound Name"
 	SMILES = Smiles = smiles = "smiles", "SMILES String"
 	INCHIKEY = Inchikey = inchikey = "inchikey", "InChI Key"
+	INCHI = Inchi = inchi = "inchi", "InChI. Always sent in the body of a POST request."
 
-	# INCHI = Inchi = inchi = "inchi"# TODO: requires argument
 	# Formula = FORMULA = formula = "formula"
 	# SDF = Sdf = sdf = "sdf"
 
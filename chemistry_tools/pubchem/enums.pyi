@@ -31,6 +31,7 @@ class PubChemNamespace(StrEnum):
 	Name = NAME = name = "name"
 	SMILES = Smiles = smiles = "smiles"
 	INCHIKEY = Inchikey = inchikey = "inchikey"
+	INCHI = Inchi = inchi = "inchi"
 
 	def __new__(cls, value: str, doc: str): ...
 
@@ -27,9 +27,11 @@ Functions for access the complete set of data held by PubChem for a compound.
 from typing import Dict, List, Sequence, Union
 
 # this package
+from chemistry_tools.pubchem.batching import map_batches, split_identifiers
 from chemistry_tools.pubchem.enums import PubChemNamespace
 from chemistry_tools.pubchem.properties import _parse_record_property
 from chemistry_tools.pubchem.pug_rest import do_rest_get
+from chemistry_tools.pubchem.records import _lookup
 
 __all__ = ["parse_full_record", "rest_get_full_record"]
 
@@ -84,6 +86,7 @@ def rest_get_full_record(
 		identifier: Union[str, int, Sequence[Union[str, int]]],
 		namespace: Union[PubChemNamespace, str] = PubChemNamespace.name,
 		record_type: str = "2d",
+		max_workers: int = 1,
 		**kwargs,
 		) -> Dict:
 	r"""
@@ -94,11 +97,34 @@ def rest_get_full_record(
 		supplying either a comma-separated string or a list.
 	:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
 	:param record_type:
+	:param max_workers: The number of requests to make at once,
+		if the identifiers are split between several requests.
 	:param \*\*kwargs: Optional arguments that ``json.loads`` takes.
 
 	:raises ValueError: If the response body does not contain valid JSON.
 
 	:return: Parsed JSON data
+
+	.. versionchanged:: 1.2.0
+
+		Long lists of CIDs are split between several requests, and lists of identifiers in other namespaces
+		are looked up one at a time, with the records combined into a single ``PC_Compounds`` list.
+		Added the ``max_workers`` argument.
+
+		Without ``kwargs``, the record of each compound is stored in the :class:`~.RecordStore`,
+		and only CIDs which are not in the store are requested.
 	"""
 
-	return do_rest_get(namespace, identifier, record_type=record_type).json(**kwargs)
+	def fetch(batch: Union[str, List[str]]) -> List[Dict]:
+		return do_rest_get(namespace, batch, record_type=record_type).json(**kwargs)["PC_Compounds"]
+
+	if kwargs:
+		# The arguments to json.loads may give records which cannot be stored.
+		return {"PC_Compounds": map_batches(fetch, split_identifiers(identifier, namespace), max_workers)}
+
+	records = _lookup(f"record/{record_type}", identifier, namespace, fetch, _record_cid, max_workers)
+	return {"PC_Compounds": records}
+
+
+def _record_cid(compound: Dict) -> int:
+	return compound["id"]["id"]["cid"]
@@ -22,12 +22,14 @@ Lookup properties for compound by name or CAS number.
 #
 
 # stdlib
-from typing import List, Sequence, Union
+from typing import Any, Dict, List, Sequence, Union
 
 # this package
+from chemistry_tools.pubchem.batching import map_batches, split_identifiers
 from chemistry_tools.pubchem.compound import Compound
 from chemistry_tools.pubchem.description import parse_description, rest_get_description
 from chemistry_tools.pubchem.enums import PubChemNamespace
+from chemistry_tools.pubchem.memory_cache import _memoize, _request_key
 
 __all__ = ["get_compounds"]
 
@@ -38,6 +40,7 @@ __all__ = ["get_compounds"]
 def get_compounds(
 		identifier: Union[str, int, Sequence[Union[str, int]]],
 		namespace: Union[PubChemNamespace, str] = PubChemNamespace.name,
+		max_workers: int = 1,
 		) -> List[Compound]:
 	"""
 	Returns a list of Compound objects for compounds that match the search criteria.
@@ -48,9 +51,33 @@ def get_compounds(
 		When using the CID namespace data for multiple compounds can be retrieved at once by
 		supplying either a comma-separated string or a list.
 	:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
+	:param max_workers: The number of requests to make at once,
+		if the identifiers are split between several requests.
+
+	.. versionchanged:: 1.2.0
+
+		Long lists of CIDs are split between several requests, and lists of identifiers in other namespaces
+		are looked up one at a time. Added the ``max_workers`` argument.
+
+		The parsed descriptions are kept in the :class:`~.MemoryCache`.
+	"""
+
+	def fetch(batch: Union[str, List[str]]) -> List[Dict]:
+		return parse_description(rest_get_description(batch, namespace))
+
+	def lookup() -> List[Dict]:
+		return map_batches(fetch, split_identifiers(identifier, namespace), max_workers)
+
+	records = _memoize(_request_key("description", identifier, namespace), lookup)
+	return [Compound(record["Title"], record["CID"], record["Description"]) for record in records]
+
+
+def _compounds_from_description(data: Dict[str, Any]) -> List[Compound]:
 	"""
+	Create :class:`~.Compound` objects from the output of the ``description`` endpoint of the REST API.
 
-	data = rest_get_description(identifier, namespace)
+	:param data:
+	"""
 
 	compounds = []
 
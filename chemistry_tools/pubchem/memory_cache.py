@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+#
+#  memory_cache.py
+"""
+In-memory cache of parsed results from the PubChem REST API.
+
+Even when a response is in the on-disk cache, or the :class:`~.RecordStore`,
+reading it requires reading from disk, decoding the JSON and parsing the result.
+The :class:`~.MemoryCache` keeps the parsed results of recent requests in memory,
+keyed by the request (the endpoint, namespace, identifiers and any properties),
+so requests for frequently used compounds are answered without any of those steps.
+
+The results of :func:`~.get_properties`, :func:`~.get_synonyms`, :func:`~.get_compounds`,
+:func:`~.get_description` (and related functions) and the full record of a :class:`~.Compound` are cached.
+The cache is emptied by :func:`chemistry_tools.cache.clear_cache`.
+
+Each call receives its own copy of the cached result, so results may be modified without affecting later calls.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import copy
+import datetime
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Sequence, Tuple, TypeVar, Union
+
+# this package
+from chemistry_tools.cache import register_clear_callback
+from chemistry_tools.pubchem.enums import PubChemNamespace
+from chemistry_tools.pubchem.utils import _force_sequence_or_csv
+
+__all__ = ["MemoryCache", "get_memory_cache", "set_memory_cache"]
+
+_T = TypeVar("_T")
+
+
+def _sizeof(obj: Any) -> int:
+	"""
+	Estimate the memory used by ``obj`` and the objects it contains.
+
+	:param obj:
+	"""
+
+	seen = set()
+	stack = [obj]
+	size = 0
+
+	while stack:
+		obj = stack.pop()
+
+		if id(obj) in seen:
+			continue
+
+		seen.add(id(obj))
+		size += sys.getsizeof(obj)
+
+		if isinstance(obj, dict):
+			stack.extend(obj.keys())
+			stack.extend(obj.values())
+		elif isinstance(obj, (list, tuple, set, frozenset)):
+			stack.extend(obj)
+		elif hasattr(obj, "__dict__"):
+			stack.append(vars(obj))
+
+	return size
+
+
+class MemoryCache:
+	"""
+	Least recently used cache of parsed results, limited by an estimate of the memory they use.
+
+	:param max_size: The maximum memory used by the cached results, in bytes.
+	:param max_age: The maximum time to keep results for.
+	"""
+
+	def __init__(
+			self,
+			max_size: int = 64 * 1024 * 1024,
+			max_age: datetime.timedelta = datetime.timedelta(hours=1),
+			):
+		self.max_size = max_size
+		self.max_age = max_age
+
+		#: The estimated memory used by the cached results, in bytes.
+		self.size = 0
+
+		#: The number of results found in the cache.
+		self.hits = 0
+
+		#: The number of results not found in the cache.
+		self.misses = 0
+
+		self._lock = threading.Lock()
+		self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({len(self)} results, {self.size} bytes)>"
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def __contains__(self, key: Hashable) -> bool:
+		with self._lock:
+			return key in self._entries and self._entries[key][2] > time.monotonic()
+
+	def get(self, key: Hashable, function: Callable[[], _T]) -> _T:
+		"""
+		Returns a copy of the result cached under ``key``, or calls ``function`` and caches a copy of its result.
+
+		:param key:
+		:param function: Function which makes the request and parses the result.
+			If it raises an exception nothing is cached.
+		"""
+
+		with self._lock:
+			hit = False
+
+			if key in self._entries:
+				value, size, expires = self._entries[key]
+
+				if expires > time.monotonic():
+					self._entries.move_to_end(key)
+					self.hits += 1
+					hit = True
+				else:
+					del self._entries[key]
+					self.size -= size
+
+			if not hit:
+				self.misses += 1
+
+		if hit:
+			# The cached result is never given out, so it cannot be modified by the caller.
+			return copy.deepcopy(value)
+
+		value = function()
+		self.set(key, value)
+		return value
+
+	def set(self, key: Hashable, value: Any) -> None:  # noqa: A003
+		"""
+		Cache a copy of a result.
+
+		:param key:
+		:param value:
+		"""
+
+		value = copy.deepcopy(value)
+		size = _sizeof(value)
+		expires = time.monotonic() + self.max_age.total_seconds()
+
+		with self._lock:
+			if key in self._entries:
+				self.size -= self._entries.pop(key)[1]
+
+			if size > self.max_size:
+				return
+
+			self._entries[key] = (value, size, expires)
+			self.size += size
+
+			while self.size > self.max_size:
+				self.size -= self._entries.popitem(last=False)[1][1]
+
+	def clear(self) -> None:
+		"""
+		Remove all results from the cache.
+		"""
+
+		with self._lock:
+			self._entries.clear()
+			self.size = 0
+
+
+_memory_cache: Optional[MemoryCache] = MemoryCache()
+
+
+def get_memory_cache() -> Optional[MemoryCache]:
+	"""
+	Returns the :class:`~.MemoryCache` used by the functions in :mod:`chemistry_tools.pubchem`,
+	or :py:obj:`None` if the cache is disabled.
+	"""  # noqa: D400
+
+	return _memory_cache
+
+
+def set_memory_cache(cache: Optional[MemoryCache]) -> None:
+	"""
+	Set the :class:`~.MemoryCache` used by the functions in :mod:`chemistry_tools.pubchem`.
+
+	:param cache: The cache to use, or :py:obj:`None` to disable the cache.
+	"""
+
+	global _memory_cache
+
+	_memory_cache = cache
+
+
+def _clear_memory_cache() -> None:
+	if _memory_cache is not None:
+		_memory_cache.clear()
+
+
+register_clear_callback(_clear_memory_cache)
+
+
+def _request_key(
+		endpoint: str,
+		identifier: Union[str, int, Sequence[Union[str, int]]],
+		namespace: Union[PubChemNamespace, str],
+		*args: Hashable,
+		) -> Tuple[Hashable, ...]:
+	"""
+	Returns a key for the memory cache which is the same for equivalent requests.
+
+	:param endpoint:
+	:param identifier:
+	:param namespace:
+	:param args: Other arguments which change the result, such as the properties requested.
+	"""
+
+	if namespace == PubChemNamespace.cid:
+		identifiers = tuple(_force_sequence_or_csv(identifier, "identifier"))
+	elif isinstance(identifier, (str, int)):
+		identifiers = (str(identifier), )
+	else:
+		identifiers = tuple(str(value) for value in identifier)
+
+	return (endpoint, str(namespace), identifiers, *args)
+
+
+def _memoize(key: Hashable, function: Callable[[], _T]) -> _T:
+	"""
+	Returns the result cached under ``key`` in the current :class:`~.MemoryCache`,
+	or calls ``function`` and caches its result.
+
+	:param key:
+	:param function:
+	"""  # noqa: D400
+
+	cache = get_memory_cache()
+
+	if cache is None:
+		return function()
+
+	return cache.get(key, function)
@@ -47,7 +47,8 @@ Functions and classes to access properties of compounds in the PubChem database.
 
 # stdlib
 import warnings
-from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 
 # 3rd party
 from pandas import DataFrame  # type: ignore[import-untyped]
@@ -56,8 +57,11 @@ from pandas import DataFrame  # type: ignore[import-untyped]
 from chemistry_tools.formulae import Formula
 
 # this package
+from .batching import map_batches, split_identifiers
 from .enums import PubChemFormats, PubChemNamespace
+from .memory_cache import _memoize, _request_key
 from .pug_rest import do_rest_get
+from .records import _parse_cids, get_record_store
 from .utils import _force_sequence_or_csv
 
 __all__ = [
@@ -401,6 +405,7 @@ def get_properties(
 		properties: Union[Sequence[str], str] = '',
 		namespace: Union[PubChemNamespace, str] = PubChemNamespace.name,
 		as_dataframe: bool = False,
+		max_workers: int = 1,
 		) -> Union[List[Dict[str, Any]], DataFrame]:
 	"""
 	Returns the requested properties for the compound with the given identifier.
@@ -416,23 +421,121 @@ def get_properties(
 
 	:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
 	:param as_dataframe: Automatically extract the properties into a pandas :class:`~pandas.DataFrame`.
+	:param max_workers: The number of requests to make at once,
+		if the identifiers are split between several requests.
 
 	:raises ValueError: If the response body does not contain valid JSON.
 	:raises NotFoundError: If the compound with the requested identifier was not found in PubChem.
 
 	:return: List of dictionaries mapping properties to values
+
+	.. versionchanged:: 1.2.0
+
+		Long lists of CIDs are split between several requests, and lists of identifiers in other namespaces
+		are looked up one at a time. Added the ``max_workers`` argument.
+
+		The properties of each compound are stored in the :class:`~.RecordStore`,
+		and only the properties which are not in the store are requested, for the CIDs which lack them.
+		The parsed results are kept in the :class:`~.MemoryCache`.
+	"""
+
+	properties = _requested_properties(properties)
+
+	def lookup() -> List[Dict]:
+		rows = _lookup_properties(identifier, namespace, properties, max_workers)
+		return parse_properties({"PropertyTable": {"Properties": rows}})
+
+	compounds = _memoize(_request_key("property", identifier, namespace, tuple(properties)), lookup)
+	return _select_properties(compounds, properties, as_dataframe)
+
+
+def _lookup_properties(
+		identifier: Union[str, int, Sequence[Union[str, int]]],
+		namespace: Union[PubChemNamespace, str],
+		properties: List[str],
+		max_workers: int = 1,
+		) -> List[Dict[str, Any]]:
 	"""
+	Returns the raw property data for the given identifiers, using the :class:`~.RecordStore` where possible.
+
+	:param identifier: Identifiers (e.g. name, CID) for the compounds to look up.
+	:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
+	:param properties: The properties to retrieve, from :func:`~.force_valid_properties`.
+	:param max_workers: The number of requests to make at once.
+
+	:returns: The entries of the ``PropertyTable``, in the order of the identifiers.
+	"""
+
+	store = get_record_store()
+
+	def fetch(batch: Union[str, List[str]], properties: Sequence[str]) -> List[Dict]:
+		rows = rest_get_properties_json(batch, namespace, properties)["PropertyTable"]["Properties"]
+
+		# PubChem omits properties which do not apply to a compound (such as XLogP for metals).
+		# Record them as missing so they are not requested again.
+		return [{**dict.fromkeys(properties), **row} for row in rows]
+
+	def fetch_properties(
+			identifier: Union[str, int, Sequence[Union[str, int]]],
+			properties: Sequence[str],
+			) -> List[Dict]:
+		batches = split_identifiers(identifier, namespace)
+		return map_batches(partial(fetch, properties=properties), batches, max_workers)
+
+	if store is None:
+		return fetch_properties(identifier, properties)
 
+	cids = _parse_cids(identifier, namespace)
+
+	if cids is None:
+		rows = fetch_properties(identifier, properties)
+		store.update("property", {row["CID"]: row for row in rows})
+		return rows
+
+	found = store.get("property", cids)
+
+	# Group the CIDs by the properties they lack, and request each group's missing properties.
+	missing: Dict[Tuple[str, ...], List[int]] = {}
+
+	for cid in dict.fromkeys(cids):
+		if cid in found and all(prop in found[cid] for prop in properties):
+			continue
+		elif store.fetch_all_properties:
+			missing.setdefault(tuple(valid_properties), []).append(cid)
+		else:
+			missing_properties = tuple(prop for prop in properties if prop not in found.get(cid, {}))
+			missing.setdefault(missing_properties, []).append(cid)
+
+	for missing_properties, missing_cids in missing.items():
+		rows = fetch_properties(missing_cids, missing_properties)
+		found.update(store.update("property", {row["CID"]: row for row in rows}))
+
+	return [found[cid] for cid in cids if cid in found]
+
+
+def _requested_properties(properties: Union[Sequence[str], str]) -> List[str]:
 	if isinstance(properties, str) and properties.lower() == "all":
 		properties = list(valid_properties.keys())
 
-	properties = force_valid_properties(properties)
+	return force_valid_properties(properties)
 
-	data = rest_get_properties_json(identifier, namespace, properties)
+
+def _select_properties(
+		compounds: Iterable[Dict[str, Any]],
+		properties: Sequence[str],
+		as_dataframe: bool = False,
+		) -> Union[List[Dict[str, Any]], DataFrame]:
+	"""
+	Extract the requested properties from the output of :func:`~.parse_properties`.
+
+	:param compounds:
+	:param properties:
+	:param as_dataframe:
+	"""
 
 	results = []
 
-	for compound in parse_properties(data):
+	for compound in compounds:
 		parsed_data = {"CID": compound["CID"]}
 
 		for prop in properties:
@@ -469,14 +572,14 @@ def get_property(
 
 	:return: The requested property. Type depends on the property requested.
 
+	.. versionchanged:: 1.2.0  The property is requested through the :class:`~.RecordStore`.
+
 	.. latex:clearpage::
 	"""
 
 	property_ = force_valid_properties(property)[0]
 
-	data = rest_get_properties_json(identifier, namespace, [property_])
-
-	return parse_properties(data)[0][property_]
+	return get_properties(identifier, [property_], namespace)[0][property_]
 
 
 def parse_properties(property_data: Dict) -> List[Dict]:
@@ -494,6 +597,7 @@ def parse_properties(property_data: Dict) -> List[Dict]:
 	for entry in property_data["PropertyTable"]["Properties"]:
 
 		cid = entry["CID"]
+		entry = {var: value for var, value in entry.items() if value is not None}
 
 		if cid not in compounds:
 			compounds[cid] = {var: None for var in fields}
@@ -46,19 +46,28 @@ Functions for interacting with PubChem PUG_REST API.
 
 # stdlib
 import time
-from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from urllib.parse import quote
 
 # 3rd party
 import requests
+from apeye.requests_url import RequestsURL
 
 # this package
+from chemistry_tools.cache import backoff, get_session
 from chemistry_tools.pubchem import API_BASE
 from chemistry_tools.pubchem.enums import PubChemFormats, PubChemNamespace
 from chemistry_tools.pubchem.errors import HTTP_ERROR_CODES, PubChemHTTPError
-from chemistry_tools.pubchem.utils import _force_sequence_or_csv, _make_base_url
+from chemistry_tools.pubchem.utils import _force_sequence_or_csv
+from chemistry_tools.single_flight import SingleFlight
 
-__all__ = ["get_full_json", "async_get", "request", "do_rest_get"]
+__all__ = ["get_full_json", "async_get", "request", "do_rest_get", "POST_THRESHOLD"]
+
+#: Identifiers longer than this, as a comma-separated string, are sent in the body of a ``POST`` request
+#: rather than in the URL.
+#:
+#: .. versionadded:: 1.2.0
+POST_THRESHOLD = 1000
 
 
 def do_rest_get(
@@ -83,32 +92,18 @@ def do_rest_get(
 	:param record_type:
 	:param png_width:
 	:param png_height:
-	"""
-
-	# domain = description, synonyms, or property followed by a comma-separated list of desired properties
-
-	if not PubChemNamespace.is_valid_value(namespace):
-		raise ValueError(f"'{namespace}' is not a valid value for 'namespace'")
-
-	if not PubChemFormats.is_valid_value(format_):
-		raise ValueError(f"'{format_}' is not a valid value for 'format_'")
 
-	parsed_identifier: List[str]
+	.. versionchanged:: 1.2.0
 
-	if namespace == PubChemNamespace.cid:
-		parsed_identifier = _force_sequence_or_csv(identifier, "identifier")
-	else:
-		parsed_identifier = [str(identifier)]
+		Requests which fail because the server is busy are retried several times
+		(see :data:`chemistry_tools.cache.backoff`). Requests whose connection failed are still retried once.
+	"""
 
-	query_params = {}
+	# domain = description, synonyms, or property followed by a comma-separated list of desired properties
 
-	if str(format_).upper() == str(PubChemFormats.PNG):
-		query_params["image_size"] = f"{png_width}x{png_height}"
+	parsed_identifier, query_params = _prepare_rest_get(namespace, identifier, format_, png_width, png_height)
 
-	try:
-		r = do_cached_request(namespace, parsed_identifier, format_, domain, record_type, query_params)
-	except requests.exceptions.ConnectionError:
-		r = do_cached_request(namespace, parsed_identifier, format_, domain, record_type, query_params)
+	r = do_cached_request(namespace, parsed_identifier, format_, domain, record_type, query_params)
 
 	if r.status_code in HTTP_ERROR_CODES:
 		raise PubChemHTTPError(r)
@@ -127,6 +122,9 @@ def do_cached_request(
 	r"""
 	Responsible for performing cached requests.
 
+	The identifiers are sent in the body of a ``POST`` request, rather than in the URL, if they are
+	longer than :data:`~.POST_THRESHOLD` or contain characters (such as ``/``) which cannot be sent in the URL.
+
 	:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
 	:param identifier: Identifiers (e.g. name, CID) for the compounds to look up.
 		When using the CID namespace data for multiple compounds can be retrieved at once by
@@ -135,15 +133,111 @@ def do_cached_request(
 	:param domain:
 	:param record_type:
 	:param query_params:
+
+	.. versionchanged:: 1.2.0
+
+		Added support for ``POST`` requests.
+		Identical requests made at the same time from several threads are combined into one
+		(see :mod:`chemistry_tools.single_flight`).
+		Requests which fail because the server is busy or the connection failed are retried
+		by :data:`chemistry_tools.cache.backoff`.
+		Requests made within :func:`chemistry_tools.cache.connection_pool` use its session.
+	"""
+
+	path, data = _rest_request(namespace, identifier, format_, domain, record_type, query_params)
+	return _send(API_BASE / path, query_params, data)
+
+
+#: Combines identical requests from different threads.
+_in_flight = SingleFlight()
+
+
+def _send(url: RequestsURL, params: Dict[str, str], data: Optional[Dict[str, str]] = None) -> requests.Response:
+	"""
+	Send a ``GET`` request, or a ``POST`` request if ``data`` is given,
+	combining it with any identical request already in progress and retrying it if the server is busy.
+
+	:param url:
+	:param params: The query parameters.
+	:param data: The form data.
+	"""  # noqa: D400
+
+	key = (str(url), tuple(sorted(params.items())), tuple(sorted((data or {}).items())), data is None)
+	session = get_session(default=url.session)
+
+	if data is None:
+		return _in_flight.do(key, lambda: backoff.call(lambda: session.get(str(url), params=params)))
+	else:
+		return _in_flight.do(key, lambda: backoff.call(lambda: session.post(str(url), data=data, params=params)))
+
+
+def _prepare_rest_get(
+		namespace: Union[PubChemNamespace, str],
+		identifier: Union[str, int, Sequence[Union[str, int]]],
+		format_: Union[PubChemFormats, str],
+		png_width: int,
+		png_height: int,
+		) -> Tuple[List[str], Dict[str, str]]:
 	"""
+	Validate the arguments to :func:`~.do_rest_get`.
+
+	:returns: The parsed identifiers, and the query parameters for the request.
+	"""
+
+	if not PubChemNamespace.is_valid_value(namespace):
+		raise ValueError(f"'{namespace}' is not a valid value for 'namespace'")
+
+	if not PubChemFormats.is_valid_value(format_):
+		raise ValueError(f"'{format_}' is not a valid value for 'format_'")
+
+	parsed_identifier: List[str]
+
+	if namespace == PubChemNamespace.cid:
+		parsed_identifier = _force_sequence_or_csv(identifier, "identifier")
+	else:
+		parsed_identifier = [str(identifier)]
+
+	query_params = {}
+
+	if str(format_).upper() == str(PubChemFormats.PNG):
+		query_params["image_size"] = f"{png_width}x{png_height}"
+
+	return parsed_identifier, query_params
+
+
+def _use_post(identifier: str) -> bool:
+	# Characters which cannot be sent in the URL path, even when percent-encoded,
+	# such as the slashes in InChI and SMILES strings.
+	return len(identifier) > POST_THRESHOLD or any(char in identifier for char in "/\\#?")
+
+
+def _rest_request(
+		namespace: Union[PubChemNamespace, str],
+		identifier: Iterable[str],
+		format_: Union[PubChemFormats, str],
+		domain: Optional[str],
+		record_type: str,
+		query_params: Dict,
+		) -> Tuple[str, Optional[Dict[str, str]]]:
+	"""
+	Returns the path of a request to the PUG REST API, relative to :data:`~.API_BASE`,
+	and the form data to ``POST`` (or :py:obj:`None` if the identifiers are sent in the path).
+
+	As with :func:`~.do_cached_request`, ``query_params`` is updated with the ``record_type`` if required.
+	"""  # noqa: D400
+
+	joined_identifier = ','.join(_force_sequence_or_csv(identifier, "identifier"))
 
 	if domain:
-		r = (_make_base_url(namespace, identifier) / f"{domain}/{format_}").get(params=query_params)
+		operation = f"{domain}/{format_}"
 	else:
 		query_params["record_type"] = record_type
-		r = (_make_base_url(namespace, identifier) / str(format_)).get(params=query_params)
+		operation = str(format_)
 
-	return r
+	if _use_post(joined_identifier):
+		return f"compound/{namespace}/{operation}", {str(namespace): joined_identifier}
+	else:
+		return f"compound/{namespace}/{joined_identifier}/{operation}", None
 
 
 def get_full_json(cid: Union[str, int]) -> str:
@@ -219,6 +313,12 @@ def request(
 	:param output:
 	:param searchtype:
 	:param \*\*kwargs: Keyword parameters passed along with the GET request.
+
+	.. versionchanged:: 1.2.0
+
+		Identical requests made at the same time from several threads are combined into one.
+		Requests which fail because the server is busy or the connection failed are retried
+		by :data:`chemistry_tools.cache.backoff`.
 	"""
 
 	# If identifier is a list, join with commas into string
@@ -235,7 +335,12 @@ def request(
 	# namespace in ['listkey', 'formula']
 	# searchtype == 'xref'
 
-	urlid = quote(identifier.encode("utf8"))
+	data: Optional[Dict[str, str]] = None
+
+	if _use_post(identifier):
+		data = {str(namespace): identifier}
+	else:
+		urlid = quote(identifier.encode("utf8"))
 
 	comps: Iterator[str] = filter(None, ("compound", searchtype, namespace, urlid, operation, output))
 	apiurl = API_BASE / '/'.join(comps)
@@ -248,7 +353,8 @@ def request(
 	# print(f'Request URL: {apiurl}')
 	# print(f'Request data: {params}')
 
-	response = apiurl.get(params=params)
+	response = _send(apiurl, params, data)
+
 	if response.status_code in HTTP_ERROR_CODES:
 		raise PubChemHTTPError(response)
 
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+#
+#  records.py
+"""
+Per-compound cache of records from the PubChem REST API.
+
+The HTTP cache stores each response under the URL it was requested from,
+so after fetching the properties of CIDs 1 to 500, a request for CIDs 1 to 10 (or 250 to 750) is not in the cache.
+The :class:`~.RecordStore` instead stores the records from each response separately for each CID.
+:func:`~.get_properties`, :func:`~.get_synonyms` and :func:`~.rest_get_full_record` answer what they can
+from the store and request only the CIDs which are not in it.
+
+The store is used when looking up compounds by CID. Records fetched using other identifiers (such as names)
+are added to the store, to answer later requests by CID.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+# this package
+from chemistry_tools.cache import register_clear_callback
+from chemistry_tools.pubchem.batching import map_batches, split_identifiers
+from chemistry_tools.pubchem.enums import PubChemNamespace
+from chemistry_tools.pubchem.utils import _force_sequence_or_csv
+
+__all__ = ["RecordStore", "get_record_store", "set_record_store"]
+
+# The maximum number of parameters in an SQLite query, in older versions of SQLite.
+_MAX_PARAMETERS = 900
+
+
+class RecordStore:
+	"""
+	Persistent store of PubChem records, keyed by CID, stored in an SQLite database.
+
+	Each record is stored with a ``kind``, describing the request it came from
+	(for example ``'synonyms'``, or ``'record/2d'``). The properties of each compound are stored as one record
+	of kind ``'property'``, to which newly requested properties are added.
+
+	:param filename: The database file. Defaults to ``records.sqlite`` in the
+		:data:`chemistry_tools.cache.cache_dir`. Use ``':memory:'`` for a store which is not saved.
+	:param expires_after: The maximum time to keep records for.
+	:param fetch_all_properties: When any requested property of a compound is not in the store,
+		request every property in :data:`~.valid_properties` rather than only the missing ones,
+		so later requests for other properties are answered from the store.
+
+	The store may be used from several threads and processes at once.
+	It can be used as a context manager, which closes the database on exit.
+	"""
+
+	def __init__(
+			self,
+			filename: Union[str, "os.PathLike[str]", None] = None,
+			expires_after: datetime.timedelta = datetime.timedelta(days=28),
+			fetch_all_properties: bool = False,
+			):
+		if filename is None:
+			# this package
+			from chemistry_tools.cache import cache_dir
+
+			cache_dir.maybe_make(parents=True)
+			filename = cache_dir / "records.sqlite"
+
+		self.filename = os.fspath(filename)
+		self.expires_after = expires_after
+		self.fetch_all_properties = fetch_all_properties
+
+		self._lock = threading.Lock()
+		self._connection = sqlite3.connect(self.filename, timeout=30, check_same_thread=False)
+
+		with self._lock, self._connection:
+			self._connection.execute(
+					"CREATE TABLE IF NOT EXISTS records ("
+					"kind TEXT NOT NULL, cid INTEGER NOT NULL, record TEXT NOT NULL, fetched REAL NOT NULL, "
+					"PRIMARY KEY (kind, cid))"
+					)
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({self.filename!r})>"
+
+	def __len__(self) -> int:
+		with self._lock:
+			return self._connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+	def __enter__(self) -> "RecordStore":
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> None:  # noqa: MAN001
+		self.close()
+
+	def close(self) -> None:
+		"""
+		Close the database.
+		"""
+
+		with self._lock:
+			self._connection.close()
+
+	def clear(self) -> None:
+		"""
+		Remove all records from the store.
+		"""
+
+		with self._lock, self._connection:
+			self._connection.execute("DELETE FROM records")
+
+	def get(self, kind: str, cids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+		"""
+		Returns the stored records of the given kind for the given CIDs.
+
+		:param kind:
+		:param cids:
+
+		:returns: A mapping of CIDs to records. CIDs which are not in the store (or whose records have expired)
+			are omitted.
+		"""
+
+		cids = list(dict.fromkeys(map(int, cids)))
+		oldest = time.time() - self.expires_after.total_seconds()
+		found = {}
+
+		with self._lock:
+			for start in range(0, len(cids), _MAX_PARAMETERS):
+				chunk = cids[start:start + _MAX_PARAMETERS]
+				rows = self._connection.execute(
+						f"SELECT cid, record FROM records WHERE kind = ? AND fetched >= ? "
+						f"AND cid IN ({','.join('?' * len(chunk))})",
+						(kind, oldest, *chunk),
+						)
+
+				for cid, record in rows:
+					found[cid] = json.loads(record)
+
+		return found
+
+	def set(self, kind: str, records: Mapping[int, Dict[str, Any]]) -> None:  # noqa: A003
+		"""
+		Store records of the given kind.
+
+		:param kind:
+		:param records: A mapping of CIDs to records, which must be serialisable to JSON.
+		"""
+
+		now = time.time()
+		rows = [(kind, int(cid), json.dumps(record), now) for cid, record in records.items()]
+
+		with self._lock, self._connection:
+			self._connection.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)", rows)
+
+	def update(self, kind: str, records: Mapping[int, Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+		"""
+		Merge records of the given kind into those already in the store.
+
+		The keys of each new record are added to the stored record for that CID, replacing any existing values.
+		The merged record keeps the time the stored record was first fetched,
+		so values are not kept for longer than ``expires_after``.
+
+		:param kind:
+		:param records: A mapping of CIDs to records, which must be serialisable to JSON.
+
+		:returns: The merged records.
+		"""
+
+		now = time.time()
+		oldest = now - self.expires_after.total_seconds()
+		merged = {}
+
+		with self._lock:
+			# Lock the database against other processes between reading and writing the records.
+			self._connection.execute("BEGIN IMMEDIATE")
+
+			try:
+				for cid, record in records.items():
+					row = self._connection.execute(
+							"SELECT record, fetched FROM records WHERE kind = ? AND cid = ? AND fetched >= ?",
+							(kind, int(cid), oldest),
+							).fetchone()
+
+					if row is None:
+						merged[int(cid)], fetched = dict(record), now
+					else:
+						merged[int(cid)], fetched = {**json.loads(row[0]), **record}, row[1]
+
+					self._connection.execute(
+							"INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)",
+							(kind, int(cid), json.dumps(merged[int(cid)]), fetched),
+							)
+
+			except BaseException:
+				self._connection.rollback()
+				raise
+			else:
+				self._connection.commit()
+
+		return merged
+
+
+_record_store: Optional[RecordStore] = None
+_record_store_enabled = True
+_record_store_is_default = False
+
+
+def get_record_store() -> Optional[RecordStore]:
+	"""
+	Returns the :class:`~.RecordStore` used by the functions in :mod:`chemistry_tools.pubchem`,
+	or :py:obj:`None` if the store is disabled.
+
+	The default store is created when first needed, in the :data:`chemistry_tools.cache.cache_dir`.
+	"""  # noqa: D400
+
+	global _record_store, _record_store_is_default
+
+	if _record_store is None and _record_store_enabled:
+		_record_store = RecordStore()
+		_record_store_is_default = True
+
+	return _record_store
+
+
+def set_record_store(store: Optional[RecordStore]) -> None:
+	"""
+	Set the :class:`~.RecordStore` used by the functions in :mod:`chemistry_tools.pubchem`.
+
+	:param store: The store to use, or :py:obj:`None` to disable the store.
+	"""
+
+	global _record_store, _record_store_enabled, _record_store_is_default
+
+	_record_store = store
+	_record_store_enabled = store is not None
+	_record_store_is_default = False
+
+
+def _clear_record_store() -> None:
+	global _record_store
+
+	if _record_store is None:
+		return
+
+	_record_store.clear()
+
+	if _record_store_is_default:
+		_record_store.close()
+		_record_store = None
+
+
+register_clear_callback(_clear_record_store)
+
+
+def _parse_cids(
+		identifier: Union[str, int, Sequence[Union[str, int]]],
+		namespace: Union[PubChemNamespace, str],
+		) -> Optional[List[int]]:
+	"""
+	Returns the CIDs to look up in the :class:`~.RecordStore`.
+
+	:param identifier:
+	:param namespace:
+
+	:returns: The CIDs, or :py:obj:`None` if ``namespace`` is not ``cid`` or any of the CIDs are invalid
+		(which are sent to PubChem as given, for it to report the error).
+	"""
+
+	if namespace != PubChemNamespace.cid:
+		return None
+
+	cids = _force_sequence_or_csv(identifier, "identifier")
+
+	if all(cid.isdigit() for cid in cids):
+		return [int(cid) for cid in cids]
+	else:
+		return None
+
+
+def _lookup(
+		kind: str,
+		identifier: Union[str, int, Sequence[Union[str, int]]],
+		namespace: Union[PubChemNamespace, str],
+		fetch: Callable[[Union[str, List[str]]], List[Dict[str, Any]]],
+		cid_of: Callable[[Dict[str, Any]], int],
+		max_workers: int = 1,
+		) -> List[Dict[str, Any]]:
+	"""
+	Returns the raw records for the given identifiers, using the :class:`~.RecordStore` where possible.
+
+	:param kind: The kind of record.
+	:param identifier: Identifiers (e.g. name, CID) for the compounds to look up.
+	:param namespace: The type of identifier to look up. Valid values are in :class:`~.PubChemNamespace`.
+	:param fetch: Function which requests a batch of identifiers, returning the records from the response.
+	:param cid_of: Function which returns the CID of a record.
+	:param max_workers: The number of requests to make at once.
+
+	:returns: The records, in the order of the identifiers.
+	"""
+
+	store = get_record_store()
+
+	if store is None:
+		return map_batches(fetch, split_identifiers(identifier, namespace), max_workers)
+
+	cids = _parse_cids(identifier, namespace)
+
+	if cids is None:
+		records = map_batches(fetch, split_identifiers(identifier, namespace), max_workers)
+		store.set(kind, {cid_of(record): record for record in records})
+		return records
+
+	found = store.get(kind, cids)
+	missing = [cid for cid in dict.fromkeys(cids) if cid not in found]
+
+	if missing:
+		fetched = {
+				cid_of(record): record
+				for record in map_batches(fetch, split_identifiers(missing, namespace), max_workers)
+				}
+		store.set(kind, fetched)
+		found.update(fetched)
+
+	return [found[cid] for cid in cids if cid in found]
@@ -24,11 +24,14 @@ Functions for obtaining the synonyms of a compound from the PubChem database.
 #
 
 # stdlib
+from operator import itemgetter
 from typing import Dict, List, Sequence, Union
 
 # this package
 from chemistry_tools.pubchem.enums import PubChemNamespace
+from chemistry_tools.pubchem.memory_cache import _memoize, _request_key
 from chemistry_tools.pubchem.pug_rest import do_rest_get
+from chemistry_tools.pubchem.records import _lookup
 
 __all__ = ["Synonyms", "get_synonyms", "rest_get_synonyms"]
 
@@ -83,6 +86,7 @@ class Synonyms(List[str]):
 def get_synonyms(
 		identifier: Union[str, int, Sequence[Union[str, int]]],
 		namespace: Union[PubChemNamespace, str] = PubChemNamespace.name,
+		max_workers: int = 1,
 		) -> List[Dict]:
 	"""
 	Returns a list of synonyms for the compound with the given identifier.
@@ -93,11 +97,37 @@ def get_synonyms(
 		supplying either a comma-separated string or a list.
 	:param namespace: The type of identifier to look up.
 		Valid values are in :class:`~.PubChemNamespace`.
+	:param max_workers: The number of requests to make at once,
+		if the identifiers are split between several requests.
 
 	:return: List of dictionaries containing the CID and a list of synonyms for the compounds.
+
+	.. versionchanged:: 1.2.0
+
+		Long lists of CIDs are split between several requests, and lists of identifiers in other namespaces
+		are looked up one at a time. Added the ``max_workers`` argument.
+
+		The synonyms of each compound are stored in the :class:`~.RecordStore`,
+		and only CIDs which are not in the store are requested.
+		The parsed results are kept in the :class:`~.MemoryCache`.
+	"""
+
+	def fetch(batch: Union[str, List[str]]) -> List[Dict]:
+		return rest_get_synonyms(batch, namespace)["InformationList"]["Information"]
+
+	def lookup() -> List[Dict]:
+		rows = _lookup("synonyms", identifier, namespace, fetch, itemgetter("CID"), max_workers)
+		return _parse_synonyms({"InformationList": {"Information": rows}})
+
+	return list(_memoize(_request_key("synonyms", identifier, namespace), lookup))
+
+
+def _parse_synonyms(data: Dict) -> List[Dict]:
 	"""
+	Parse raw data from the ``synonyms`` endpoint of the REST API.
 
-	data = rest_get_synonyms(identifier, namespace)
+	:param data:
+	"""
 
 	results = []
 
@@ -0,0 +1,635 @@
+#!/usr/bin/env python3
+#
+#  rate_limit.py
+"""
+Limit the rate of requests to PubChem and other web APIs.
+
+:data:`chemistry_tools.cache.cached_requests` and :class:`chemistry_tools.pubchem.aio.AsyncPubChem`
+draw from the same :class:`~.TokenBucket`, :data:`chemistry_tools.cache.bucket`,
+so together they send no more than 5 requests per second however many threads or tasks are making requests.
+
+PubChem reports how heavily each user is loading its servers in the ``X-Throttling-Control`` header
+of every response, and answers with ``503 Service Unavailable`` when it is too busy.
+:data:`chemistry_tools.cache.bucket` is an :class:`~.AdaptiveTokenBucket`, which slows down when PubChem reports
+a high load, and speeds back up (to at most 5 requests per second) when the load falls.
+Requests which fail because the server is busy, or because the connection failed,
+are retried by :class:`~.Backoff` after an increasing, randomised delay, or after the time given in the
+``Retry-After`` header of the response.
+
+Each process has its own :data:`chemistry_tools.cache.bucket`, so several worker processes together can exceed
+PubChem's limit. A :class:`~.SharedTokenBucket` keeps its tokens in an SQLite database,
+so every process using the same database file draws from one budget of requests.
+Set it as the rate limiter in each worker when it starts:
+
+.. code-block:: python
+
+	from chemistry_tools.cache import set_rate_limiter
+	from chemistry_tools.rate_limit import SharedTokenBucket
+
+	set_rate_limiter(SharedTokenBucket())
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import asyncio
+import datetime
+import email.utils
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator, NamedTuple, Optional, Tuple, Union
+
+# 3rd party
+import requests
+from apeye import rate_limiter
+from cachecontrol import CacheControlAdapter  # nodep
+
+__all__ = [
+		"TokenBucket",
+		"RateLimitAdapter",
+		"AdaptiveTokenBucket",
+		"SharedTokenBucket",
+		"Backoff",
+		"RETRY_STATUS_CODES",
+		"ThrottlingStatus",
+		"parse_retry_after",
+		"parse_throttling_control",
+		]
+
+_Timeout = Union[float, Tuple[float, float], None]
+
+#: Status codes of responses which are retried by :class:`~.Backoff`.
+#:
+#: .. versionadded:: 1.2.0
+RETRY_STATUS_CODES = (429, 503)
+
+
+class TokenBucket:
+	"""
+	Limits the rate of requests.
+
+	Tokens are added to the bucket at ``rate`` per second, up to a maximum of ``capacity``.
+	Each request takes a token, waiting for one to be added if the bucket is empty.
+	With the default capacity of ``1`` requests are spaced at least ``1 / rate`` seconds apart,
+	as with the limiter used by :data:`chemistry_tools.cache.cached_requests`.
+
+	Callers are served in the order they arrive. The bucket may be shared between event loops and threads.
+
+	:param rate: The number of tokens added per second.
+	:param capacity: The maximum number of tokens the bucket can hold, and so the largest burst of requests.
+	"""
+
+	def __init__(self, rate: float = 5, capacity: float = 1):
+		if rate <= 0:
+			raise ValueError("'rate' must be greater than zero")
+		if capacity < 1:
+			raise ValueError("'capacity' must be at least 1")
+
+		#: The number of tokens added per second.
+		self.rate = rate
+
+		#: The maximum number of tokens the bucket can hold.
+		self.capacity = capacity
+
+		self._tokens = float(capacity)
+		self._updated = self._clock()
+		self._lock = threading.Lock()
+
+	#: The clock used to add tokens to the bucket.
+	_clock = staticmethod(time.monotonic)
+
+	def reserve(self) -> float:
+		"""
+		Take a token from the bucket.
+
+		If the bucket is empty the token is borrowed from the future,
+		so callers which reserve later have to wait longer.
+
+		:returns: The time in seconds to wait before using the token.
+		"""
+
+		with self._locked():
+			self._tokens -= 1
+
+			if self._tokens >= 0:
+				return 0.0
+			else:
+				return -self._tokens / self.rate
+
+	@contextmanager
+	def _locked(self) -> Iterator[None]:
+		"""
+		Lock the bucket, and add the tokens due since it was last used.
+		"""
+
+		with self._lock:
+			self._refill()
+			yield
+
+	def _refill(self) -> None:
+		# Must be called with the lock held.
+		now = self._clock()
+		elapsed = max(0.0, now - self._updated)  # In case the clock has gone backwards.
+		self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+		self._updated = now
+
+	def observe(self, response: requests.Response) -> None:
+		"""
+		Called with each response received from the server. Does nothing.
+
+		Overridden by :class:`~.AdaptiveTokenBucket` to adjust the rate.
+
+		:param response:
+		"""
+
+	async def acquire(self) -> None:
+		"""
+		Wait for a token, without blocking the event loop.
+		"""
+
+		delay = self.reserve()
+		if delay > 0:
+			await asyncio.sleep(delay)
+
+	def wait(self) -> None:
+		"""
+		Wait for a token, blocking the current thread.
+		"""
+
+		delay = self.reserve()
+		if delay > 0:
+			time.sleep(delay)
+
+
+class RateLimitAdapter(rate_limiter.RateLimitAdapter):
+	r"""
+	:class:`apeye.rate_limiter.RateLimitAdapter` which takes a token from a :class:`~.TokenBucket`
+	before sending each request.
+
+	Unlike the original, the limit is respected when the session is used from several threads at once.
+	Responses served from the cache do not count towards the limit.
+	Responses from the server are passed to :meth:`TokenBucket.observe() <.TokenBucket.observe>`.
+
+	:param bucket:
+	:param timeout: The default time in seconds to wait for the server, for requests which do not give a timeout.
+		May also be a ``(connect timeout, read timeout)`` tuple. If :py:obj:`None` requests wait indefinitely.
+	:param \*\*kwargs: Keyword arguments passed to :class:`cachecontrol.adapter.CacheControlAdapter`,
+		including the ``pool_maxsize`` and ``pool_block`` arguments of :class:`requests.adapters.HTTPAdapter`.
+	"""  # noqa: D400
+
+	def __init__(self, bucket: Optional[TokenBucket] = None, timeout: _Timeout = None, **kwargs):
+		super().__init__(**kwargs)
+
+		#: The rate limiter.
+		self.bucket = bucket or TokenBucket()
+
+		#: The default time in seconds to wait for the server.
+		self.timeout = timeout
+
+	def rate_limited_send(self, *args, **kwargs) -> requests.Response:
+		"""
+		Wait for the rate limiter, then send the request.
+		"""
+
+		if kwargs.get("timeout") is None:
+			kwargs["timeout"] = self.timeout
+
+		self.bucket.wait()
+		response = super(CacheControlAdapter, self).send(*args, **kwargs)
+		self.bucket.observe(response)
+		return response
+
+
+class ThrottlingStatus(NamedTuple):
+	"""
+	The load on PubChem's servers, from the ``X-Throttling-Control`` header.
+
+	PubChem reports the number of requests made by the user, the server time used by those requests,
+	and the overall load on the service, each as a status and a percentage of the limit.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	#: The worst of the reported statuses: ``'Green'``, ``'Yellow'``, ``'Red'`` or ``'Black'``.
+	status: str
+
+	#: The highest of the reported percentages.
+	load: int
+
+
+_THROTTLING_STATUSES = ["Green", "Yellow", "Red", "Black"]
+_THROTTLING_PART = re.compile(r"status:\s*(Green|Yellow|Red|Black)\s*\((\d+)%\)", flags=re.IGNORECASE)
+
+
+def parse_throttling_control(header: Optional[str]) -> Optional[ThrottlingStatus]:
+	"""
+	Parse the ``X-Throttling-Control`` header of a response from PubChem.
+
+	For example::
+
+		Request Count status: Green (0%), Request Time status: Yellow (62%), Service status: Green (20%)
+
+	:param header:
+
+	:returns: The status, or :py:obj:`None` if the header is missing or not understood.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	parts = _THROTTLING_PART.findall(header or '')
+
+	if not parts:
+		return None
+
+	statuses = [status.capitalize() for status, _ in parts]
+	return ThrottlingStatus(
+			status=max(statuses, key=_THROTTLING_STATUSES.index),
+			load=max(int(load) for _, load in parts),
+			)
+
+
+def parse_retry_after(response: requests.Response) -> Optional[float]:
+	"""
+	Returns the time in seconds to wait before retrying a request, from the ``Retry-After`` header of its response.
+
+	:param response:
+
+	:returns: The time to wait, or :py:obj:`None` if the header is missing or invalid.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	value = response.headers.get("Retry-After", '').strip()
+
+	if value.isdigit():
+		return float(value)
+
+	try:
+		retry_at = email.utils.parsedate_to_datetime(value)
+	except (TypeError, ValueError, IndexError):
+		return None
+
+	if retry_at is None:  # pragma: no cover  (before Python 3.10)
+		return None
+
+	if retry_at.tzinfo is None:
+		retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+
+	return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+class AdaptiveTokenBucket(TokenBucket):
+	"""
+	:class:`~.TokenBucket` which adjusts its rate to the load reported by PubChem.
+
+	The rate is halved when PubChem reports a ``Red`` or ``Black`` status, and reduced by a quarter
+	for a ``Yellow`` status. While the status is ``Green`` with a load below 50%
+	the rate increases by a tenth of ``rate`` for each response, back up to the original ``rate``.
+	When the server responds with ``429 Too Many Requests`` or ``503 Service Unavailable``,
+	the rate is halved and no tokens are given out until the time in the ``Retry-After`` header has passed.
+
+	:param rate: The maximum number of tokens added per second.
+	:param capacity: The maximum number of tokens the bucket can hold, and so the largest burst of requests.
+	:param min_rate: The rate is never reduced below this. Defaults to a tenth of ``rate``.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	def __init__(self, rate: float = 5, capacity: float = 1, min_rate: Optional[float] = None):
+		super().__init__(rate, capacity)
+
+		#: The rate the bucket returns to while the load on the server is low.
+		self.max_rate = rate
+
+		#: The rate is never reduced below this.
+		self.min_rate = rate / 10 if min_rate is None else min_rate
+
+		if not 0 < self.min_rate <= rate:
+			raise ValueError("'min_rate' must be greater than zero and no greater than 'rate'")
+
+	def _adjust_rate(self, factor: float = 1, increase: float = 0) -> None:
+		# The tokens due at the old rate are added before changing it.
+		with self._locked():
+			self.rate = min(self.max_rate, max(self.min_rate, self.rate * factor + increase))
+
+	def throttle(self, status: ThrottlingStatus) -> None:
+		"""
+		Adjust the rate to the load reported by PubChem.
+
+		:param status:
+		"""
+
+		if status.status in {"Red", "Black"}:
+			self._adjust_rate(factor=0.5)
+		elif status.status == "Yellow":
+			self._adjust_rate(factor=0.75)
+		elif status.load < 50:
+			self._adjust_rate(increase=self.max_rate / 10)
+
+	def pause(self, seconds: float) -> None:
+		"""
+		Give out no more tokens for the given time.
+
+		:param seconds:
+		"""
+
+		with self._locked():
+			self._tokens = min(self._tokens, -seconds * self.rate)
+
+	def observe(self, response: requests.Response) -> None:
+		"""
+		Adjust the rate to the ``X-Throttling-Control`` and ``Retry-After`` headers of a response from the server.
+
+		:param response:
+		"""
+
+		if response.status_code in RETRY_STATUS_CODES:
+			self._adjust_rate(factor=0.5)
+			self.pause(parse_retry_after(response) or 0)
+			return
+
+		status = parse_throttling_control(response.headers.get("X-Throttling-Control"))
+
+		if status is not None:
+			self.throttle(status)
+
+
+# The SharedTokenBuckets in the default location, which are reopened after clear_cache() deletes the database.
+_default_buckets: "weakref.WeakSet[SharedTokenBucket]" = weakref.WeakSet()
+
+
+def _register_default_bucket(bucket: "SharedTokenBucket") -> None:
+	# this package
+	from chemistry_tools.cache import register_clear_callback
+
+	register_clear_callback(_close_default_buckets)
+	_default_buckets.add(bucket)
+
+
+def _close_default_buckets() -> None:
+	for bucket in list(_default_buckets):
+		with bucket._lock:
+			if bucket._connection is not None:
+				bucket._connection.close()
+				bucket._connection = None
+
+
+class SharedTokenBucket(AdaptiveTokenBucket):
+	"""
+	:class:`~.AdaptiveTokenBucket` whose tokens are shared between processes, through an SQLite database.
+
+	Buckets with the same ``name`` in the same database share their tokens and their rate,
+	so a slowdown requested by PubChem in one process applies to all of them.
+
+	:param filename: The database file. Defaults to ``rate_limit.sqlite`` in the
+		:data:`chemistry_tools.cache.cache_dir`, which is shared by all processes run by the same user,
+		and is recreated after :func:`chemistry_tools.cache.clear_cache` deletes it.
+	:param rate: The maximum number of tokens added per second.
+	:param capacity: The maximum number of tokens the bucket can hold, and so the largest burst of requests.
+	:param min_rate: The rate is never reduced below this. Defaults to a tenth of ``rate``.
+	:param name: The name of the bucket within the database.
+
+	The bucket can be used as a context manager, which closes the database on exit.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	# The time in seconds since the epoch is the same in every process.
+	_clock = staticmethod(time.time)
+
+	def __init__(
+			self,
+			filename: Union[str, "os.PathLike[str]", None] = None,
+			rate: float = 5,
+			capacity: float = 1,
+			min_rate: Optional[float] = None,
+			name: str = "pubchem",
+			):
+		super().__init__(rate, capacity, min_rate)
+
+		self._is_default = filename is None
+
+		if filename is None:
+			# this package
+			from chemistry_tools.cache import cache_dir
+
+			cache_dir.maybe_make(parents=True)
+			filename = cache_dir / "rate_limit.sqlite"
+			_register_default_bucket(self)
+
+		self.filename = os.fspath(filename)
+		self.name = name
+
+		self._connection: Optional[sqlite3.Connection] = None
+
+		with self._lock:
+			self._connect()
+
+	def _connect(self) -> sqlite3.Connection:
+		# Must be called with the lock held.
+		# Opens the database when first used, and again after clear_cache() deletes the default database.
+		if self._connection is None:
+			if self._is_default:
+				os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+
+			self._connection = sqlite3.connect(self.filename, timeout=30, check_same_thread=False)
+
+			with self._connection:
+				# The state of the bucket is cheap to lose, so don't wait for each write to reach the disk.
+				self._connection.execute("PRAGMA synchronous=OFF")
+				self._connection.execute(
+						"CREATE TABLE IF NOT EXISTS buckets ("
+						"name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, rate REAL NOT NULL)"
+						)
+				self._connection.execute(
+						"INSERT OR IGNORE INTO buckets VALUES (?, ?, ?, ?)",
+						(self.name, self._tokens, self._updated, self.rate),
+						)
+
+		return self._connection
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({self.filename!r}, name={self.name!r})>"
+
+	def __enter__(self) -> "SharedTokenBucket":
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> None:  # noqa: MAN001
+		self.close()
+
+	def close(self) -> None:
+		"""
+		Close the database.
+		"""
+
+		_default_buckets.discard(self)
+
+		with self._lock:
+			self._connect().close()
+
+	async def acquire(self) -> None:
+		"""
+		Wait for a token, without blocking the event loop.
+
+		The database is read and updated in the loop's default executor,
+		as it may have to wait for another process to release its lock on the database.
+		"""
+
+		delay = await asyncio.get_running_loop().run_in_executor(None, self.reserve)
+		if delay > 0:
+			await asyncio.sleep(delay)
+
+	@contextmanager
+	def _locked(self) -> Iterator[None]:
+		with self._lock:
+			connection = self._connect()
+
+			# Lock the database against other processes while the bucket is read and updated.
+			connection.execute("BEGIN IMMEDIATE")
+
+			try:
+				query = "SELECT tokens, updated, rate FROM buckets WHERE name = ?"
+				self._tokens, self._updated, self.rate = connection.execute(query, (self.name, )).fetchone()
+				self._refill()
+
+				yield
+
+				connection.execute(
+						"UPDATE buckets SET tokens = ?, updated = ?, rate = ? WHERE name = ?",
+						(self._tokens, self._updated, self.rate, self.name),
+						)
+			except BaseException:
+				connection.rollback()
+				raise
+			else:
+				connection.commit()
+
+
+class Backoff:
+	"""
+	Retries requests which failed because the server was busy or the connection failed.
+
+	Before each retry the request waits for the time in the ``Retry-After`` header of the response, if given,
+	or otherwise for a random time of up to ``base * 2 ** attempt`` seconds ("full jitter"),
+	so many clients which failed at once do not retry at once.
+
+	:param retries: The maximum number of times to retry a request.
+	:param base: The maximum delay before the first retry, in seconds.
+	:param maximum: The maximum delay before any retry, in seconds.
+	:param connection_retries: The maximum number of those retries which may follow a connection error.
+		Few are allowed by default, as a connection which failed (e.g. when offline) is unlikely to succeed
+		a few seconds later, while a busy server soon will.
+
+	.. versionadded:: 1.2.0
+	"""
+
+	def __init__(self, retries: int = 5, base: float = 1, maximum: float = 60, connection_retries: int = 1):
+		if retries < 0:
+			raise ValueError("'retries' cannot be negative")
+		if connection_retries < 0:
+			raise ValueError("'connection_retries' cannot be negative")
+
+		#: The maximum number of times to retry a request.
+		self.retries = retries
+
+		#: The maximum number of times to retry a request after a connection error.
+		self.connection_retries = connection_retries
+
+		#: The maximum delay before the first retry, in seconds.
+		self.base = base
+
+		#: The maximum delay before any retry, in seconds.
+		self.maximum = maximum
+
+	def delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+		"""
+		Returns the time to wait before retrying a request.
+
+		:param attempt: The number of times the request has been retried so far.
+		:param response: The response to the failed request, if any.
+		"""
+
+		retry_after = None if response is None else parse_retry_after(response)
+
+		if retry_after is not None:
+			# Spread the retries of clients which were all told to wait the same time.
+			return min(self.maximum, retry_after) + random.uniform(0, self.base)
+
+		return random.uniform(0, min(self.maximum, self.base * 2**attempt))
+
+	def call(self, send: Callable[[], requests.Response]) -> requests.Response:
+		"""
+		Call ``send``, retrying if it raises a :exc:`requests.exceptions.ConnectionError`
+		or returns a response with a status code in :data:`~.RETRY_STATUS_CODES`.
+
+		:param send: Function which sends the request.
+
+		:returns: The first successful response, or the last response if all the retries failed.
+		"""  # noqa: D400
+
+		attempt = connection_attempt = 0
+
+		while True:
+			try:
+				response = send()
+			except requests.exceptions.ConnectionError:
+				if attempt >= self.retries or connection_attempt >= self.connection_retries:
+					raise
+				connection_attempt += 1
+				delay = self.delay(attempt)
+			else:
+				if response.status_code not in RETRY_STATUS_CODES or attempt >= self.retries:
+					return response
+				delay = self.delay(attempt, response)
+
+			time.sleep(delay)
+			attempt += 1
+
+	async def call_async(self, send: Callable[[], Awaitable[requests.Response]]) -> requests.Response:
+		"""
+		Await ``send()``, retrying as with :meth:`~.Backoff.call`.
+
+		:param send: Coroutine function which sends the request.
+		"""
+
+		attempt = connection_attempt = 0
+
+		while True:
+			try:
+				response = await send()
+			except requests.exceptions.ConnectionError:
+				if attempt >= self.retries or connection_attempt >= self.connection_retries:
+					raise
+				connection_attempt += 1
+				delay = self.delay(attempt)
+			else:
+				if response.status_code not in RETRY_STATUS_CODES or attempt >= self.retries:
+					return response
+				delay = self.delay(attempt, response)
+
+			await asyncio.sleep(delay)
+			attempt += 1
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+#
+#  single_flight.py
+"""
+Combine identical requests made at the same time.
+
+When several threads (or asyncio tasks) request the same data at once, only the first request is sent.
+The others wait for it to finish and receive the same response, or the same exception.
+This saves both time and the rate limit when, for example, the workers of a web service
+all look up a popular compound at the same moment.
+
+:func:`chemistry_tools.pubchem.pug_rest.do_rest_get` and :class:`chemistry_tools.pubchem.aio.AsyncPubChem`
+combine their requests in this way.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+__all__ = ["SingleFlight"]
+
+_T = TypeVar("_T")
+
+
+class _Call:
+	"""
+	A call in progress, which other threads may wait for.
+	"""
+
+	def __init__(self):
+		self.done = threading.Event()
+		self.result: Any = None
+		self.exception: Optional[BaseException] = None
+
+	def wait(self) -> Any:
+		self.done.wait()
+
+		if self.exception is not None:
+			raise self.exception
+
+		return self.result
+
+
+class SingleFlight:
+	"""
+	Ensures only one call with a given key is in progress at once,
+	with any concurrent calls with the same key waiting for its result.
+
+	Once the call has finished its result is not kept, so later calls with the same key run again.
+	"""  # noqa: D400
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._calls: Dict[Hashable, _Call] = {}
+		self._tasks: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], "asyncio.Future[Any]"] = {}
+
+	def __len__(self) -> int:
+		"""
+		Returns the number of calls in progress.
+		"""
+
+		return len(self._calls) + len(self._tasks)
+
+	def do(self, key: Hashable, function: Callable[[], _T]) -> _T:
+		"""
+		Call ``function``, unless a call with the same key is already in progress in another thread,
+		in which case wait for that call and return its result (or raise its exception).
+
+		:param key: Identifies equivalent calls.
+		:param function:
+		"""  # noqa: D400
+
+		with self._lock:
+			call = self._calls.get(key)
+
+			if call is not None:
+				waiting = True
+			else:
+				waiting = False
+				call = self._calls[key] = _Call()
+
+		if waiting:
+			return call.wait()
+
+		try:
+			call.result = function()
+		except BaseException as e:
+			call.exception = e
+			raise
+		finally:
+			with self._lock:
+				del self._calls[key]
+
+			call.done.set()
+
+		return call.result
+
+	async def do_async(self, key: Hashable, function: Callable[[], Awaitable[_T]]) -> _T:
+		"""
+		Await ``function()``, unless a call with the same key is already in progress in the event loop,
+		in which case wait for that call and return its result (or raise its exception).
+
+		The call is not cancelled if one of the tasks waiting for it is cancelled.
+
+		:param key: Identifies equivalent calls.
+		:param function: Coroutine function to call.
+		"""  # noqa: D400
+
+		loop_key = (asyncio.get_running_loop(), key)
+		task = self._tasks.get(loop_key)
+
+		if task is None:
+			task = self._tasks[loop_key] = asyncio.ensure_future(function())
+			task.add_done_callback(lambda _: self._tasks.pop(loop_key, None))
+
+		return await asyncio.shield(task)
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 #
-#  spectrum_similarity.py
+#  __init__.py
 """
 Mass spectrum similarity calculations.
 """
@@ -50,17 +50,20 @@ Mass spectrum similarity calculations.
 #
 
 # stdlib
-from typing import TYPE_CHECKING, Mapping, Optional, Sequence, Tuple, Union
+from typing import TYPE_CHECKING, Dict, Iterable, Mapping, Optional, Sequence, Tuple, Union
 
 # 3rd party
 import numpy
 import pandas  # type: ignore[import-untyped]
 
+# this package
+from .spectrum import Spectrum, as_spectrum
+
 if TYPE_CHECKING:
 	# 3rd party
 	from matplotlib.axes import Axes
 
-__all__ = ["spectrum_similarity", "normalize", "create_array", "SpectrumSimilarity"]
+__all__ = ["spectrum_similarity", "normalize", "create_array", "SpectrumSimilarity", "Spectrum"]
 
 
 class SpectrumSimilarity:
@@ -68,20 +71,27 @@ class SpectrumSimilarity:
 	Calculate the similarity score for two mass spectra.
 
 	:param spec_top: Array containing the experimental spectrum's peak list with the *m/z* values in the
-		first column and corresponding intensities in the second
+		first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
 	:param spec_bottom: Array containing the reference spectrum's peak list with the *m/z* values in the
-		first column and corresponding intensities in the second
+		first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
 	:param b: numeric value specifying the baseline threshold for peak identification.
 		Expressed as a percent of the maximum intensity.
 	:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
 
 	.. versionadded:: 1.0.0
 
+	.. versionchanged:: 1.2.0
+
+		``spec_top`` and ``spec_bottom`` may be :class:`~.Spectrum` objects,
+		in which case their cached preprocessing is reused.
+
 	.. TODO:
 		x_threshold: numeric value specifying
 		t: numeric value specifying the tolerance used to align the *m/z* values of the two spectra.
 	"""
 
+	top_spectrum: Spectrum
+	bottom_spectrum: Spectrum
 	top_df: pandas.DataFrame
 	_top_df_plot: pandas.DataFrame  # includes peaks below ``b``
 	bottom_df: pandas.DataFrame
@@ -91,8 +101,8 @@ class SpectrumSimilarity:
 
 	def __init__(
 			self,
-			spec_top: numpy.ndarray,
-			spec_bottom: numpy.ndarray,
+			spec_top: Union[numpy.ndarray, Spectrum],
+			spec_bottom: Union[numpy.ndarray, Spectrum],
 			# t: float = 0.25,
 			b: float = 1,
 			xlim: Tuple[int, int] = (50, 1200),  # x_threshold: float = 0,
@@ -104,9 +114,12 @@ class SpectrumSimilarity:
 		self.b = b
 		self.xlim = xlim
 
+		self.top_spectrum = as_spectrum(spec_top)
+		self.bottom_spectrum = as_spectrum(spec_bottom)
+
 		# format spectra and normalize intensitites
-		self.top_df, self._top_df_plot = self._build_dataframe(spec_top)
-		self.bottom_df, self._bottom_df_plot = self._build_dataframe(spec_bottom)
+		self.top_df, self._top_df_plot = self._build_dataframe(self.top_spectrum)
+		self.bottom_df, self._bottom_df_plot = self._build_dataframe(self.bottom_spectrum)
 
 		# align the m/z axis of the two spectra, the bottom spectrum is used as the reference
 
@@ -156,6 +169,22 @@ class SpectrumSimilarity:
 
 		return similarity_score, reverse_similarity_score
 
+	def scores(self, metrics: Optional[Iterable[str]] = None, **kwargs) -> Dict[str, float]:
+		r"""
+		Returns the requested similarity scores, calculated from a single alignment of the two spectra.
+
+		:param metrics: The scores to calculate. Defaults to all scores in :data:`~.scoring.METRICS`.
+		:param \*\*kwargs: Additional keyword arguments passed to :func:`~.score_alignment`.
+
+		.. versionadded:: 1.2.0
+		"""
+
+		# this package
+		from chemistry_tools.spectrum_similarity.scoring import align, score_alignment
+
+		aligned = align(self.top_spectrum, self.bottom_spectrum, b=self.b, xlim=self.xlim)
+		return {metric: value[0].item() for metric, value in score_alignment(aligned, metrics, **kwargs).items()}
+
 	def plot(
 			self,
 			top_label: Optional[str] = None,
@@ -269,14 +298,13 @@ class SpectrumSimilarity:
 		with pandas.option_context("display.max_rows", None, "display.max_columns", None):
 			print(self.alignment)
 
-	def _build_dataframe(self, spectrum: numpy.ndarray) -> Tuple[pandas.DataFrame, pandas.DataFrame]:
-		# format spectra and normalize intensitites
-		tmp = pandas.DataFrame(data=spectrum, columns=["mz", "intensity"])
-		tmp["normalized"] = tmp.apply(normalize, args=(max(tmp["intensity"]), ), axis=1)
-		tmp = tmp[tmp["mz"].between(self.xlim[0], self.xlim[1])]
-		plot = tmp[["mz", "normalized"]].copy()  # data frame for plotting spectrum
-		plot.columns = ["mz", "intensity"]
-		out = plot[plot["intensity"] >= self.b]  # data frame for similarity score calculation
+	def _build_dataframe(self, spectrum: Spectrum) -> Tuple[pandas.DataFrame, pandas.DataFrame]:
+		# The normalization, clipping and thresholding are cached by the Spectrum
+		mz, intensity = spectrum.clip(self.xlim)
+		plot = pandas.DataFrame({"mz": mz, "intensity": intensity})  # data frame for plotting spectrum
+
+		mz, intensity = spectrum.filter(self.b, self.xlim)
+		out = pandas.DataFrame({"mz": mz, "intensity": intensity})  # data frame for similarity score calculation
 
 		return out, plot
 
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+#
+#  centroiding.py
+"""
+Peak picking and centroiding of profile mode mass spectra.
+
+:class:`~.SpectrumSimilarity` and the other tools in :mod:`chemistry_tools.spectrum_similarity`
+expect centroided peak lists, with a single *m/z* value for each peak. Profile mode spectra
+record the intensity at many closely spaced *m/z* values across each peak. The functions in this module
+find the local maxima of the (optionally smoothed) profile and report the intensity-weighted mean *m/z*
+of the points between the minima either side of each maximum.
+
+Many scans are centroided together by :func:`~.centroid_batch`, without looping over the scans in Python.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+from typing import Sequence
+
+# 3rd party
+import numpy
+
+# this package
+from chemistry_tools.spectrum_similarity.preprocessing import PeakBatch
+
+__all__ = ["centroid", "centroid_batch", "smooth"]
+
+
+def _cumsum0(values: numpy.ndarray) -> numpy.ndarray:
+	return numpy.concatenate(([0.0], numpy.cumsum(values)))
+
+
+def smooth(batch: PeakBatch, window: int = 3) -> numpy.ndarray:
+	"""
+	Smooth the intensities of each scan in the batch with a moving average.
+
+	The average is taken over ``window`` points centred on each point,
+	truncated at the start and end of each scan so scans do not affect one another.
+
+	:param batch:
+	:param window: The number of points to average over. Should be odd.
+
+	:returns: The smoothed intensities.
+	"""
+
+	if window < 1:
+		raise ValueError("'window' must be at least 1")
+
+	owner = batch.owner
+	index = numpy.arange(len(batch.intensity))
+	half = window // 2
+
+	lo = numpy.maximum(index - half, batch.offsets[:-1][owner])
+	hi = numpy.minimum(index + half + 1, batch.offsets[1:][owner])
+
+	totals = _cumsum0(batch.intensity)
+	return (totals[hi] - totals[lo]) / (hi - lo)
+
+
+def centroid_batch(
+		batch: PeakBatch,
+		smoothing: int = 0,
+		min_intensity: float = 0,
+		) -> PeakBatch:
+	"""
+	Centroid each profile mode scan in the batch.
+
+	:param batch: The profile mode scans, with the points of each scan in ascending order of *m/z*.
+	:param smoothing: The number of points to smooth the profile over before finding the maxima.
+		If ``0`` or ``1`` no smoothing is performed. Smoothing is only used to locate the peaks;
+		the centroids are calculated from the raw intensities.
+	:param min_intensity: The minimum intensity of a peak's apex for it to be reported.
+
+	:returns: A batch of the centroided peak lists.
+		The intensity of each peak is the raw intensity at its apex.
+	"""
+
+	n_points = len(batch.intensity)
+
+	if not n_points:
+		return PeakBatch(batch.mz, batch.intensity, numpy.zeros_like(batch.offsets), batch.precursor_mz)
+
+	profile = smooth(batch, smoothing) if smoothing > 1 else batch.intensity
+
+	# Neighbouring values, with points outside the scan treated as -inf.
+	first = numpy.zeros(n_points, dtype=bool)
+	last = numpy.zeros(n_points, dtype=bool)
+	non_empty = numpy.diff(batch.offsets) > 0
+	first[batch.offsets[:-1][non_empty]] = True
+	last[batch.offsets[1:][non_empty] - 1] = True
+
+	previous = numpy.where(first, -numpy.inf, numpy.roll(profile, 1))
+	following = numpy.where(last, -numpy.inf, numpy.roll(profile, -1))
+
+	# Points on a plateau are compared with the first different point after it,
+	# so a flat topped (e.g. saturated) peak is a single peak, and not a valley.
+	run_starts = profile != previous
+	run_ends = numpy.append(numpy.flatnonzero(run_starts)[1:], n_points) - 1
+	beyond = following[run_ends][numpy.cumsum(run_starts) - 1]
+
+	maxima = numpy.flatnonzero((profile > previous) & (profile > beyond) & (batch.intensity >= min_intensity))
+
+	# Each peak extends to the nearest minimum (or the end of the scan) on each side.
+	valleys = numpy.flatnonzero(
+			first | last | ((profile <= numpy.where(first, numpy.inf, previous))
+							& (profile < numpy.where(last, numpy.inf, beyond)))
+			)
+	# The valleys are searched for strictly before and after the apex, as an apex at the edge of a scan
+	# is itself a valley. Such a peak extends from that edge of the scan.
+	before = numpy.searchsorted(valleys, maxima, side="left") - 1
+	after = numpy.minimum(numpy.searchsorted(valleys, maxima, side="right"), len(valleys) - 1)
+	left = numpy.where(first[maxima], maxima, valleys[before])
+	right = numpy.where(last[maxima], maxima, valleys[after]) + 1
+
+	weights = _cumsum0(batch.intensity)
+	weighted_mz = _cumsum0(batch.mz * batch.intensity)
+	total = weights[right] - weights[left]
+
+	mz = numpy.divide(
+			weighted_mz[right] - weighted_mz[left],
+			total,
+			out=batch.mz[maxima].copy(),
+			where=total > 0,
+			)
+
+	counts = numpy.bincount(batch.owner[maxima], minlength=len(batch))
+	return PeakBatch(
+			mz,
+			batch.intensity[maxima],
+			numpy.concatenate(([0], numpy.cumsum(counts))),
+			batch.precursor_mz,
+			)
+
+
+def centroid(
+		mz: Sequence[float],
+		intensities: Sequence[float],
+		smoothing: int = 0,
+		min_intensity: float = 0,
+		) -> numpy.ndarray:
+	"""
+	Centroid a profile mode spectrum.
+
+	:param mz: List of *m/z* values, in ascending order.
+	:param intensities: List of intensities.
+	:param smoothing: The number of points to smooth the profile over before finding the maxima.
+		If ``0`` or ``1`` no smoothing is performed.
+	:param min_intensity: The minimum intensity of a peak's apex for it to be reported.
+
+	:returns: Array containing the centroided peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, as returned by :func:`~.create_array`.
+	"""
+
+	mz = numpy.asarray(mz, dtype=numpy.float64)
+	intensity = numpy.asarray(intensities, dtype=numpy.float64)
+
+	if mz.shape != intensity.shape:
+		raise ValueError("'mz' and 'intensities' must be the same length")
+
+	batch = PeakBatch(mz, intensity, [0, len(mz)], [numpy.nan])
+	centroided = centroid_batch(batch, smoothing=smoothing, min_intensity=min_intensity)
+	return numpy.column_stack((centroided.mz, centroided.intensity))
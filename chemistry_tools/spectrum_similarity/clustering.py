@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+#
+#  clustering.py
+"""
+Cluster redundant tandem mass spectra and build consensus spectra.
+
+Spectra are read in a single pass, in ascending order of precursor *m/z*, and split into buckets
+wherever consecutive precursors differ by more than the tolerance. Only spectra in the same bucket
+can have matching precursors, so each bucket is clustered independently (and optionally in parallel)
+and then discarded, keeping the memory used proportional to the size of the largest bucket.
+
+Within a bucket each spectrum is compared with the spectra whose precursor *m/z* lies within the tolerance,
+using the same cosine similarity as :class:`~.SpectrumSimilarity`. Pairs scoring at least the
+threshold are joined with a union-find structure, giving single-linkage clusters.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# 3rd party
+import numpy
+
+# this package
+from chemistry_tools.spectrum_similarity.search import SpectralLibrary, _array_names, _Query, _score_range
+from chemistry_tools.spectrum_similarity.spectrum import Spectrum, as_spectrum
+
+__all__ = ["SpectrumCluster", "cluster_spectra", "consensus_spectrum"]
+
+
+class SpectrumCluster(NamedTuple):
+	"""
+	A group of similar spectra.
+	"""
+
+	#: The positions of the member spectra in the input, in ascending order.
+	members: List[int]
+
+	#: The consensus spectrum of the members.
+	consensus: Spectrum
+
+
+class _DisjointSet:
+	"""
+	Union-find structure over the integers ``0`` to ``size - 1``.
+
+	:param size:
+	"""
+
+	def __init__(self, size: int):
+		self.parent = list(range(size))
+		self.size = [1] * size
+
+	def find(self, item: int) -> int:
+		parent = self.parent
+
+		while parent[item] != item:
+			parent[item] = parent[parent[item]]
+			item = parent[item]
+
+		return item
+
+	def union(self, a: int, b: int) -> None:
+		a, b = self.find(a), self.find(b)
+
+		if a == b:
+			return
+
+		if self.size[a] < self.size[b]:
+			a, b = b, a
+
+		self.parent[b] = a
+		self.size[a] += self.size[b]
+
+	def groups(self) -> List[List[int]]:
+		"""
+		Returns the members of each set, ordered by their smallest member.
+		"""
+
+		groups: Dict[int, List[int]] = {}
+
+		for item in range(len(self.parent)):
+			groups.setdefault(self.find(item), []).append(item)
+
+		return list(groups.values())
+
+
+def _tolerance_delta(  # noqa: MAN002
+		precursor_mz: Union[float, numpy.ndarray],
+		tolerance: float,
+		tolerance_unit: str,
+		):
+	if tolerance_unit == "ppm":
+		return precursor_mz * tolerance * 1e-6
+	elif tolerance_unit == "Da":
+		return tolerance
+	else:
+		raise ValueError(f"Unknown tolerance unit {tolerance_unit!r}. Must be 'ppm' or 'Da'.")
+
+
+def _peaks(library: SpectralLibrary, positions: Union[int, numpy.ndarray]) -> Tuple[numpy.ndarray, numpy.ndarray]:
+	positions = numpy.atleast_1d(positions)
+	peaks = numpy.concatenate([
+			numpy.arange(library.offsets[pos], library.offsets[pos + 1]) for pos in positions
+			]).astype(numpy.int64)
+	return library.mz[peaks], library.intensity[peaks]
+
+
+def consensus_spectrum(
+		spectra: Iterable[Union[numpy.ndarray, Spectrum]],
+		b: float = 1,
+		xlim: Tuple[int, int] = (50, 1200),
+		min_fraction: float = 0.0,
+		) -> Spectrum:
+	"""
+	Combine several spectra into a single consensus spectrum.
+
+	Each peak's intensity is the mean of its normalised intensity in the spectra
+	(counting spectra without the peak as zero), and the precursor *m/z* is the median of the spectra's precursors.
+
+	:param spectra: Arrays containing each spectrum's peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, or :class:`~.Spectrum` objects.
+	:param b: numeric value specifying the baseline threshold for peak identification.
+		Expressed as a percent of the maximum intensity.
+	:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+	:param min_fraction: The fraction of the spectra a peak must be present in to be included.
+	"""
+
+	library = SpectralLibrary(spectra, b=b, xlim=xlim)
+	return _consensus(library, numpy.arange(len(library)), min_fraction)
+
+
+def _consensus(library: SpectralLibrary, positions: numpy.ndarray, min_fraction: float) -> Spectrum:
+	mz, intensity = _peaks(library, positions)
+
+	if library.precursor_mz is None:
+		precursor_mz = None
+	else:
+		precursors = library.precursor_mz[positions]
+		precursors = precursors[~numpy.isnan(precursors)]
+		precursor_mz = float(numpy.median(precursors)) if len(precursors) else None
+
+	if len(positions) == 1:
+		return Spectrum(mz, intensity, precursor_mz)
+
+	unique_mz, inverse = numpy.unique(mz, return_inverse=True)
+	counts = numpy.bincount(inverse, minlength=len(unique_mz))
+	mean_intensity = numpy.bincount(inverse, weights=intensity, minlength=len(unique_mz)) / len(positions)
+
+	keep = counts >= min_fraction * len(positions)
+	return Spectrum(unique_mz[keep], mean_intensity[keep], precursor_mz)
+
+
+def _cluster_bucket(
+		indices: List[int],
+		spectra: List[Spectrum],
+		threshold: float,
+		tolerance: float,
+		tolerance_unit: str,
+		b: float,
+		xlim: Tuple[int, int],
+		min_fraction: float,
+		) -> List[SpectrumCluster]:
+	"""
+	Cluster the spectra in one bucket.
+
+	:param indices: The positions of the spectra in the input.
+	:param spectra:
+	"""
+
+	library = SpectralLibrary(spectra, b=b, xlim=xlim)
+	precursors = library.precursor_mz
+	assert precursors is not None
+
+	arrays = {name: getattr(library, name) for name in _array_names}
+
+	stops = numpy.searchsorted(
+			precursors,
+			precursors + _tolerance_delta(precursors, tolerance, tolerance_unit),
+			side="right",
+			)
+
+	disjoint_set = _DisjointSet(len(library))
+
+	for position in range(len(library)):
+		start, stop = position + 1, int(stops[position])
+		if start >= stop or not library.norms[position]:
+			continue
+
+		lo, hi = library.offsets[position], library.offsets[position + 1]
+		query = _Query(library.mz[lo:hi], library.intensity[lo:hi], library.norms[position], None, False)
+
+		forward, _ = _score_range(query, arrays, start, stop)
+		for neighbour in numpy.flatnonzero(forward >= threshold):
+			disjoint_set.union(position, start + int(neighbour))
+
+	clusters = []
+
+	for group in disjoint_set.groups():
+		positions = numpy.array(group, dtype=numpy.int64)
+		members = sorted(indices[idx] for idx in library.order[positions])
+		clusters.append(SpectrumCluster(members, _consensus(library, positions, min_fraction)))
+
+	clusters.sort(key=lambda cluster: cluster.members[0])
+	return clusters
+
+
+def _buckets(
+		spectra: Iterable[Union[numpy.ndarray, Spectrum]],
+		tolerance: float,
+		tolerance_unit: str,
+		max_bucket_size: int,
+		) -> Iterator[Tuple[List[int], List[Spectrum]]]:
+	indices: List[int] = []
+	bucket: List[Spectrum] = []
+	previous = -numpy.inf
+
+	for idx, spectrum in enumerate(spectra):
+		spectrum = as_spectrum(spectrum)
+		precursor_mz = spectrum.precursor_mz
+
+		if precursor_mz is None:
+			raise ValueError(f"Spectrum {idx} does not have a precursor m/z.")
+		if precursor_mz < previous:
+			raise ValueError("The spectra must be in ascending order of precursor m/z.")
+
+		if bucket and (
+				precursor_mz - previous > _tolerance_delta(previous, tolerance, tolerance_unit)
+				or len(bucket) >= max_bucket_size
+				):
+			yield indices, bucket
+			indices, bucket = [], []
+
+		indices.append(idx)
+		bucket.append(spectrum)
+		previous = precursor_mz
+
+	if bucket:
+		yield indices, bucket
+
+
+def cluster_spectra(
+		spectra: Iterable[Union[numpy.ndarray, Spectrum]],
+		threshold: float = 0.8,
+		tolerance: float = 10,
+		tolerance_unit: str = "ppm",
+		b: float = 1,
+		xlim: Tuple[int, int] = (50, 1200),
+		min_fraction: float = 0.0,
+		max_bucket_size: int = 100_000,
+		processes: Optional[int] = 1,
+		) -> Iterator[SpectrumCluster]:
+	"""
+	Cluster spectra with similar precursor *m/z* values and peak lists.
+
+	:param spectra: :class:`~.Spectrum` objects with precursor *m/z* values, in ascending order of precursor *m/z*.
+		May be a generator, in which case the spectra are read as they are needed.
+	:param threshold: The minimum cosine similarity for two spectra to be placed in the same cluster.
+	:param tolerance: The maximum difference between the precursor *m/z* values of spectra in the same cluster.
+	:param tolerance_unit: The unit of ``tolerance``. Either ``'ppm'`` or ``'Da'``.
+	:param b: numeric value specifying the baseline threshold for peak identification.
+		Expressed as a percent of the maximum intensity.
+	:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+	:param min_fraction: The fraction of a cluster's spectra a peak must be present in
+		to be included in the consensus spectrum.
+	:param max_bucket_size: The maximum number of spectra to cluster at once.
+		Larger buckets are split, which bounds the memory used but may separate similar spectra at the split.
+	:param processes: The number of worker processes to cluster buckets in.
+		If :py:obj:`None` the number of CPUs is used. If ``1`` the buckets are clustered in this process.
+
+	:returns: An iterator over the clusters, in the order the buckets are completed.
+		Every input spectrum belongs to exactly one cluster.
+	"""
+
+	buckets = _buckets(spectra, tolerance, tolerance_unit, max_bucket_size)
+	options = (threshold, tolerance, tolerance_unit, b, xlim, min_fraction)
+
+	if processes == 1:
+		for indices, bucket in buckets:
+			yield from _cluster_bucket(indices, bucket, *options)
+		return
+
+	processes = processes or os.cpu_count() or 1
+
+	with ProcessPoolExecutor(max_workers=processes) as executor:
+		# Limit the number of buckets waiting to be clustered, so the input is not read into memory all at once.
+		pending: Deque[Future] = deque()
+
+		for indices, bucket in buckets:
+			pending.append(executor.submit(_cluster_bucket, indices, bucket, *options))
+			if len(pending) >= 2 * processes:
+				yield from pending.popleft().result()
+
+		while pending:
+			yield from pending.popleft().result()
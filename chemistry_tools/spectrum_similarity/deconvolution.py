@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+#
+#  deconvolution.py
+"""
+Isotope cluster detection and charge state deconvolution of peak lists.
+
+Peaks are linked into isotope envelopes where their *m/z* values differ by :data:`~.ISOTOPE_SPACING`/*z*
+(within a tolerance) for a charge *z*. The envelopes for every charge are found for all peaks at once with NumPy,
+and overlapping envelopes are resolved in favour of the longest (and then the most intense),
+so each peak is assigned to at most one cluster.
+
+Clusters can optionally be scored against the isotope pattern of an averagine molecule of the same mass
+(:func:`~.averagine_pattern`), calculated from the isotope abundances used by :mod:`chemistry_tools.formulae`.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+from functools import lru_cache
+from typing import NamedTuple, Union
+
+# 3rd party
+import numpy
+
+# this package
+from chemistry_tools.spectrum_similarity.preprocessing import ISOTOPE_SPACING
+from chemistry_tools.spectrum_similarity.spectrum import Spectrum, as_spectrum
+
+__all__ = ["IsotopeClusters", "deconvolute", "averagine_pattern", "PROTON_MASS", "AVERAGINE"]
+
+#: The mass of a proton.
+PROTON_MASS = 1.00727646688
+
+#: The elemental composition of averagine, the average amino acid residue, per 111.1254 Da.
+#: From Senko *et al.*, J. Am. Soc. Mass Spectrom. 1995, 6, 229-233.
+AVERAGINE = {"C": 4.9384, "H": 7.7583, "N": 1.3577, "O": 1.4773, "S": 0.0417}
+
+_averagine_mass = 111.1254
+
+# The resolution of the table of averagine patterns, in Da.
+_averagine_step = 10.0
+
+
+class IsotopeClusters(NamedTuple):
+	"""
+	The isotope clusters found in a peak list, in ascending order of monoisotopic *m/z*.
+	"""
+
+	#: The *m/z* of the first peak of each cluster.
+	monoisotopic_mz: numpy.ndarray
+
+	#: The charge of each cluster.
+	charge: numpy.ndarray
+
+	#: The neutral monoisotopic mass of each cluster, assuming the charges are due to protons.
+	monoisotopic_mass: numpy.ndarray
+
+	#: The total intensity of the peaks in each cluster.
+	intensity: numpy.ndarray
+
+	#: The number of peaks in each cluster.
+	n_peaks: numpy.ndarray
+
+	#: The cosine similarity of each cluster to the averagine isotope pattern, or ``NaN`` if not scored.
+	score: numpy.ndarray
+
+	#: For each peak of the input (in ascending order of *m/z*), the index of its cluster, or ``-1``.
+	assignment: numpy.ndarray
+
+
+def _element_distribution(element: str, count: int, n_isotopes: int) -> numpy.ndarray:
+	"""
+	Returns the abundances of ``count`` atoms of ``element`` with 0, 1, 2 ... extra neutrons.
+	"""
+
+	# this package
+	from chemistry_tools.elements import isotope_data
+
+	isotopes = {number: abundance for number, (_, abundance) in isotope_data[element].items() if number and abundance}
+	lightest = min(isotopes)
+
+	single = numpy.zeros(n_isotopes)
+	for number, abundance in isotopes.items():
+		if number - lightest < n_isotopes:
+			single[number - lightest] += abundance
+
+	# Raise the single atom distribution to the power ``count`` by repeated squaring.
+	result = numpy.zeros(n_isotopes)
+	result[0] = 1.0
+
+	while count:
+		if count & 1:
+			result = numpy.convolve(result, single)[:n_isotopes]
+		single = numpy.convolve(single, single)[:n_isotopes]
+		count >>= 1
+
+	return result
+
+
+def averagine_pattern(mass: float, n_isotopes: int = 8) -> numpy.ndarray:
+	"""
+	Returns the isotope pattern of an averagine molecule with the given mass.
+
+	:param mass: The neutral monoisotopic mass.
+	:param n_isotopes: The number of isotope peaks to calculate.
+
+	:returns: The relative abundance of the monoisotopic peak and each subsequent isotope peak,
+		with the most abundant having a value of ``1``.
+	"""
+
+	# this package
+	from chemistry_tools.formulae import Formula
+
+	units = max(mass, 0) / _averagine_mass
+	formula = Formula({element: int(round(units * count)) for element, count in AVERAGINE.items()})
+
+	pattern = numpy.zeros(n_isotopes)
+	pattern[0] = 1.0
+
+	for element, count in formula.items():
+		if count:
+			pattern = numpy.convolve(pattern, _element_distribution(element, count, n_isotopes))[:n_isotopes]
+
+	return pattern / pattern.max()
+
+
+@lru_cache(maxsize=1024)
+def _tabulated_pattern(step: int, n_isotopes: int) -> numpy.ndarray:
+	return averagine_pattern(step * _averagine_step, n_isotopes)
+
+
+def _next_peaks(mz: numpy.ndarray, spacing: float, tolerance: float) -> numpy.ndarray:
+	"""
+	Returns the index of the peak closest to ``spacing`` above each peak, within ``tolerance`` ppm, or ``-1``.
+	"""
+
+	target = mz + spacing
+	pos = numpy.searchsorted(mz, target)
+
+	best = numpy.full(len(mz), -1, dtype=numpy.int64)
+	best_error = numpy.full(len(mz), numpy.inf)
+
+	for candidate in (pos - 1, pos):
+		valid = (candidate >= 0) & (candidate < len(mz))
+		candidate = numpy.clip(candidate, 0, len(mz) - 1)
+		error = numpy.where(valid, numpy.abs(mz[candidate] - target), numpy.inf)
+
+		better = (error <= target * tolerance * 1e-6) & (error < best_error)
+		best[better] = candidate[better]
+		best_error[better] = error[better]
+
+	return best
+
+
+def _score_averagine(
+		members: numpy.ndarray,
+		intensity: numpy.ndarray,
+		mass: numpy.ndarray,
+		) -> numpy.ndarray:
+	"""
+	Returns the cosine similarity of each candidate cluster's intensities to the averagine pattern.
+
+	:param members: The peaks of each candidate, padded with ``-1``.
+	:param intensity: The intensity of every peak.
+	:param mass: The neutral monoisotopic mass of each candidate.
+	"""
+
+	n_isotopes = members.shape[1]
+	present = members >= 0
+	observed = numpy.where(present, intensity[numpy.clip(members, 0, None)], 0.0)
+
+	steps = numpy.rint(numpy.maximum(mass, 0) / _averagine_step).astype(numpy.int64)
+	unique_steps, inverse = numpy.unique(steps, return_inverse=True)
+	table = numpy.array([_tabulated_pattern(int(step), n_isotopes) for step in unique_steps]).reshape(-1, n_isotopes)
+	expected = numpy.where(present, table[inverse], 0.0)
+
+	dot = (observed * expected).sum(axis=1)
+	norms = numpy.sqrt((observed**2).sum(axis=1) * (expected**2).sum(axis=1))
+	return numpy.divide(dot, norms, out=numpy.zeros(len(dot)), where=norms > 0)
+
+
+def deconvolute(
+		spectrum: Union[numpy.ndarray, Spectrum],
+		max_charge: int = 4,
+		tolerance: float = 10,
+		min_peaks: int = 2,
+		max_isotopes: int = 8,
+		averagine: bool = False,
+		min_score: float = 0.0,
+		) -> IsotopeClusters:
+	"""
+	Find the isotope clusters in a peak list and determine their charge states.
+
+	:param spectrum: Array containing the spectrum's peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+	:param max_charge: The maximum charge to consider.
+	:param tolerance: The maximum difference, in ppm, between the *m/z* of a peak and the expected *m/z*
+		of the next peak of the envelope.
+	:param min_peaks: The minimum number of peaks in a cluster.
+	:param max_isotopes: The maximum number of peaks in a cluster.
+	:param averagine: Whether to score the clusters against the averagine isotope pattern.
+	:param min_score: The minimum averagine score of a cluster, if ``averagine`` is :py:obj:`True`.
+	"""
+
+	if max_charge < 1:
+		raise ValueError("'max_charge' must be at least 1")
+	if not 1 <= min_peaks <= max_isotopes:
+		raise ValueError("'min_peaks' must be between 1 and 'max_isotopes'")
+
+	spectrum = as_spectrum(spectrum)
+	mz, intensity = spectrum.mz, spectrum.intensity
+	n_peaks = len(mz)
+
+	charges = numpy.arange(1, max_charge + 1)
+	next_peaks = numpy.array([_next_peaks(mz, ISOTOPE_SPACING / z, tolerance) for z in charges])
+	next_peaks = next_peaks.reshape(max_charge, n_peaks)
+
+	assignment = numpy.full(n_peaks, -1, dtype=numpy.int64)
+	n_clusters = 0
+	first_peaks, cluster_charges, cluster_scores = [], [], []
+
+	# Each round, every candidate envelope which is the best candidate for all of its peaks is accepted.
+	# The remaining peaks are then searched again, until no more envelopes can be found.
+	while True:
+		free = assignment < 0
+
+		members = numpy.full((max_charge, n_peaks, max_isotopes), -1, dtype=numpy.int64)
+		members[:, :, 0] = numpy.where(free, numpy.arange(n_peaks), -1)
+
+		for isotope in range(1, max_isotopes):
+			previous = members[:, :, isotope - 1]
+			following = numpy.take_along_axis(next_peaks, numpy.clip(previous, 0, None), axis=1)
+			valid = (previous >= 0) & (following >= 0) & free[numpy.clip(following, 0, None)]
+			members[:, :, isotope] = numpy.where(valid, following, -1)
+
+		lengths = (members >= 0).sum(axis=2)
+		charge_idx, start = numpy.nonzero(lengths >= min_peaks)
+
+		candidates = members[charge_idx, start]
+		lengths = lengths[charge_idx, start]
+		charge = charges[charge_idx]
+		present = candidates >= 0
+		total = numpy.where(present, intensity[numpy.clip(candidates, 0, None)], 0.0).sum(axis=1)
+
+		if averagine:
+			score = _score_averagine(candidates, intensity, (mz[start] - PROTON_MASS) * charge)
+			keep = score >= min_score
+			candidates, present, lengths, charge, total, score = (
+				candidates[keep], present[keep], lengths[keep], charge[keep], total[keep], score[keep]
+				)
+		else:
+			score = numpy.full(len(candidates), numpy.nan)
+
+		if not len(candidates):
+			break
+
+		# Longest first, then most intense, then lowest charge.
+		order = numpy.lexsort((charge, -total, -lengths))
+		rank = numpy.empty(len(order), dtype=numpy.int64)
+		rank[order] = numpy.arange(len(order))
+
+		best = numpy.full(n_peaks, len(order), dtype=numpy.int64)
+		numpy.minimum.at(best, candidates[present], numpy.broadcast_to(rank[:, None], candidates.shape)[present])
+		accepted = ((~present) | (best[numpy.clip(candidates, 0, None)] == rank[:, None])).all(axis=1)
+
+		cluster_ids = n_clusters + numpy.arange(accepted.sum())
+		assignment[candidates[accepted][present[accepted]]] = numpy.repeat(cluster_ids, lengths[accepted])
+		n_clusters += len(cluster_ids)
+
+		first_peaks.append(candidates[accepted, 0])
+		cluster_charges.append(charge[accepted])
+		cluster_scores.append(score[accepted])
+
+	if not n_clusters:
+		empty, empty_int = numpy.empty(0), numpy.empty(0, dtype=numpy.int64)
+		return IsotopeClusters(empty, empty_int, empty, empty, empty_int, empty, assignment)
+
+	first_peak = numpy.concatenate(first_peaks)
+
+	# Renumber the clusters in ascending order of m/z.
+	order = numpy.argsort(mz[first_peak], kind="stable")
+	renumber = numpy.empty(n_clusters, dtype=numpy.int64)
+	renumber[order] = numpy.arange(n_clusters)
+
+	assigned = assignment >= 0
+	assignment[assigned] = renumber[assignment[assigned]]
+
+	monoisotopic_mz = mz[first_peak][order]
+	charge = numpy.concatenate(cluster_charges)[order]
+
+	return IsotopeClusters(
+			monoisotopic_mz=monoisotopic_mz,
+			charge=charge,
+			monoisotopic_mass=(monoisotopic_mz - PROTON_MASS) * charge,
+			intensity=numpy.bincount(assignment[assigned], weights=intensity[assigned], minlength=n_clusters),
+			n_peaks=numpy.bincount(assignment[assigned], minlength=n_clusters),
+			score=numpy.concatenate(cluster_scores)[order],
+			assignment=assignment,
+			)
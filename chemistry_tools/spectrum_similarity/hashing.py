@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+#
+#  hashing.py
+"""
+Content-based hashes of mass spectra, and a persistent cache of similarity scores keyed by those hashes.
+
+Like the `SPLASH <https://splash.fiehnlab.ucdavis.edu/>`_, the hash is calculated from the peaks
+sorted by *m/z*, with the *m/z* values and relative intensities rounded to a fixed number of decimal places.
+The hash therefore does not depend on the order of the peaks, the absolute intensity scale,
+or floating point noise smaller than the rounding.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import hashlib
+import json
+import os
+import sqlite3
+import weakref
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+# 3rd party
+import numpy
+
+# this package
+from chemistry_tools.spectrum_similarity.spectrum import Spectrum, as_spectrum
+
+__all__ = ["spectrum_hash", "find_duplicates", "SimilarityCache"]
+
+_hash_version = 1
+
+
+# The SimilarityCaches in the default location, which are reopened after clear_cache() deletes the database.
+_default_caches: "weakref.WeakSet[SimilarityCache]" = weakref.WeakSet()
+
+
+def _register_default_cache(cache: "SimilarityCache") -> None:
+	# this package
+	from chemistry_tools.cache import register_clear_callback
+
+	register_clear_callback(_clear_default_caches)
+	_default_caches.add(cache)
+
+
+def _clear_default_caches() -> None:
+	for cache in list(_default_caches):
+		if cache._connection is not None:
+			cache.clear()
+			cache._connection.close()
+			cache._connection = None
+
+
+def spectrum_hash(
+		spectrum: Union[numpy.ndarray, Spectrum],
+		mz_decimals: int = 4,
+		intensity_decimals: int = 1,
+		) -> str:
+	"""
+	Returns a hash of the spectrum's peak list.
+
+	:param spectrum: Array containing the spectrum's peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+	:param mz_decimals: The number of decimal places to round the *m/z* values to.
+	:param intensity_decimals: The number of decimal places to round the intensities
+		(as a percentage of the most intense peak) to.
+
+	:returns: A 40 character hexadecimal string.
+	"""
+
+	spectrum = as_spectrum(spectrum)
+
+	# Adding zero turns any negative zeros produced by rounding into positive zeros.
+	mz = numpy.round(spectrum.mz, mz_decimals) + 0.0
+	intensity = numpy.round(spectrum.normalized, intensity_decimals) + 0.0
+
+	# Sort ties in m/z by intensity, so the hash doesn't depend on the order of the input.
+	order = numpy.lexsort((-intensity, mz))
+
+	peaks = ' '.join(
+			f"{m:.{mz_decimals}f}:{i:.{intensity_decimals}f}" for m, i in zip(mz[order], intensity[order])
+			)
+
+	return hashlib.sha256(f"{_hash_version} {peaks}".encode("UTF-8")).hexdigest()[:40]
+
+
+def _exact_hash(spectrum: Spectrum) -> str:
+	# Hash of the unrounded peaks, as spectra with the same spectrum_hash() may still have different scores.
+	peaks = numpy.stack([spectrum.mz, spectrum.intensity]) + 0.0
+	return hashlib.sha256(f"{_hash_version} ".encode("UTF-8") + peaks.astype("<f8").tobytes()).hexdigest()[:40]
+
+
+def find_duplicates(spectra: Iterable[Union[numpy.ndarray, Spectrum]], **kwargs) -> List[List[int]]:
+	r"""
+	Find spectra with identical peak lists.
+
+	:param spectra: Arrays containing each spectrum's peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, or :class:`~.Spectrum` objects.
+	:param \*\*kwargs: Additional keyword arguments passed to :func:`~.spectrum_hash`.
+
+	:returns: The indices of the spectra in each group of two or more identical spectra.
+	"""
+
+	groups: Dict[str, List[int]] = {}
+
+	for idx, spectrum in enumerate(spectra):
+		groups.setdefault(spectrum_hash(spectrum, **kwargs), []).append(idx)
+
+	return [group for group in groups.values() if len(group) > 1]
+
+
+class SimilarityCache:
+	"""
+	Persistent cache of similarity scores, stored in an SQLite database.
+
+	Scores are keyed by the hashes of the two spectra (in order, as the reverse score is not symmetric)
+	and the parameters they were calculated with.
+
+	:param filename: The database file. Defaults to ``similarity.sqlite`` in the
+		:data:`chemistry_tools.cache.cache_dir`, in which case the cache is emptied by
+		:func:`chemistry_tools.cache.clear_cache`. Use ``':memory:'`` for a cache which is not saved.
+
+	The cache can be used as a context manager, which closes the database on exit.
+	"""
+
+	def __init__(self, filename: Union[str, "os.PathLike[str]", None] = None):
+		self._is_default = filename is None
+
+		if filename is None:
+			# this package
+			from chemistry_tools.cache import cache_dir
+
+			cache_dir.maybe_make(parents=True)
+			filename = cache_dir / "similarity.sqlite"
+			_register_default_cache(self)
+
+		self.filename = os.fspath(filename)
+		self._connection: Optional[sqlite3.Connection] = None
+		self._closed = False
+		self._connect()
+
+	def _connect(self) -> sqlite3.Connection:
+		# Opens the database when first used, and again after clear_cache() deletes the default database.
+		if self._closed:
+			raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+
+		if self._connection is None:
+			if self._is_default:
+				os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+
+			self._connection = sqlite3.connect(self.filename)
+
+			with self._connection:
+				self._connection.execute(
+						"CREATE TABLE IF NOT EXISTS scores ("
+						"hash_a TEXT NOT NULL, hash_b TEXT NOT NULL, parameters TEXT NOT NULL, "
+						"score REAL NOT NULL, reverse_score REAL NOT NULL, "
+						"PRIMARY KEY (hash_a, hash_b, parameters))"
+						)
+
+		return self._connection
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({self.filename!r})>"
+
+	def __len__(self) -> int:
+		return self._connect().execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+	def __enter__(self) -> "SimilarityCache":
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> None:  # noqa: MAN001
+		self.close()
+
+	def close(self) -> None:
+		"""
+		Close the database.
+		"""
+
+		_default_caches.discard(self)
+		self._closed = True
+
+		if self._connection is not None:
+			self._connection.close()
+			self._connection = None
+
+	def clear(self) -> None:
+		"""
+		Remove all scores from the cache.
+		"""
+
+		with self._connect() as connection:
+			connection.execute("DELETE FROM scores")
+
+	@staticmethod
+	def _parameters(parameters: Optional[Mapping[str, Any]]) -> str:
+		return json.dumps(dict(parameters or {}), sort_keys=True)
+
+	def get(
+			self,
+			hash_a: str,
+			hash_b: str,
+			parameters: Optional[Mapping[str, Any]] = None,
+			) -> Optional[Tuple[float, float]]:
+		"""
+		Returns the cached similarity and reverse similarity scores for a pair of spectra,
+		or :py:obj:`None` if they are not in the cache.
+
+		:param hash_a: The hash of the first spectrum.
+		:param hash_b: The hash of the second spectrum.
+		:param parameters: The parameters the scores were calculated with.
+			Must be serialisable to JSON.
+		"""  # noqa: D400
+
+		row = self._connect().execute(
+				"SELECT score, reverse_score FROM scores WHERE hash_a = ? AND hash_b = ? AND parameters = ?",
+				(hash_a, hash_b, self._parameters(parameters)),
+				).fetchone()
+
+		return None if row is None else (row[0], row[1])
+
+	def set(  # noqa: A003  # pylint: disable=redefined-builtin
+			self,
+			hash_a: str,
+			hash_b: str,
+			scores: Tuple[float, float],
+			parameters: Optional[Mapping[str, Any]] = None,
+			) -> None:
+		"""
+		Store the similarity and reverse similarity scores for a pair of spectra.
+
+		:param hash_a: The hash of the first spectrum.
+		:param hash_b: The hash of the second spectrum.
+		:param scores: The similarity and reverse similarity scores.
+		:param parameters: The parameters the scores were calculated with.
+			Must be serialisable to JSON.
+		"""
+
+		with self._connect() as connection:
+			connection.execute(
+					"INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+					(hash_a, hash_b, self._parameters(parameters), float(scores[0]), float(scores[1])),
+					)
+
+	def score(
+			self,
+			spec_top: Union[numpy.ndarray, Spectrum],
+			spec_bottom: Union[numpy.ndarray, Spectrum],
+			b: float = 1,
+			xlim: Tuple[int, int] = (50, 1200),
+			) -> Tuple[float, float]:
+		"""
+		Returns the similarity scores of two spectra, as given by :meth:`.SpectrumSimilarity.score`.
+
+		The scores are looked up in the cache, and only calculated (and then stored) if not found.
+		As the scores are calculated from the exact peaks they are cached under a hash of the unrounded peaks,
+		not under :func:`~.spectrum_hash`, which is the same for spectra differing by less than its rounding.
+
+		:param spec_top: Array containing the experimental spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		:param spec_bottom: Array containing the reference spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		:param b: numeric value specifying the baseline threshold for peak identification.
+			Expressed as a percent of the maximum intensity.
+		:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+		"""
+
+		# this package
+		from chemistry_tools.spectrum_similarity import SpectrumSimilarity
+
+		spec_top, spec_bottom = as_spectrum(spec_top), as_spectrum(spec_bottom)
+		hash_a, hash_b = _exact_hash(spec_top), _exact_hash(spec_bottom)
+		parameters = {"b": b, "xlim": list(xlim)}
+
+		scores = self.get(hash_a, hash_b, parameters)
+
+		if scores is None:
+			similarity, reverse_similarity = SpectrumSimilarity(spec_top, spec_bottom, b=b, xlim=xlim).score()
+			scores = float(similarity), float(reverse_similarity)
+			self.set(hash_a, hash_b, scores, parameters)
+
+		return scores
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+#
+#  lsh.py
+"""
+Approximate nearest-neighbour search of spectral libraries using locality-sensitive hashing.
+
+Each spectrum is binned on the *m/z* axis and projected onto random hyperplanes,
+giving a sketch whose bits agree between two spectra with a probability
+that increases with their cosine similarity.
+The sketch is split into several hash tables; library spectra sharing a hash with the query
+in any table are shortlisted, and the shortlist is rescored exactly with the same cosine
+similarity as :func:`~.search.search_library`.
+
+More tables increase the recall at the cost of larger shortlists, and more bits per table decrease the
+size of the shortlist at the cost of recall. :func:`~.measure_recall` compares the approximate and exact
+searches for a set of queries, so the trade-off can be tuned for a given library.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import math
+from typing import List, NamedTuple, Sequence, Union
+
+# 3rd party
+import numpy
+
+# this package
+from chemistry_tools.spectrum_similarity.search import (
+		SearchHit,
+		SearchMode,
+		SpectralLibrary,
+		_array_names,
+		_merge_hits,
+		_prepare_query,
+		_score_positions,
+		search_library
+		)
+from chemistry_tools.spectrum_similarity.spectrum import Spectrum
+
+__all__ = ["ApproximateIndex", "RecallReport", "measure_recall"]
+
+
+class ApproximateIndex:
+	"""
+	A locality-sensitive hashing index over a :class:`~.SpectralLibrary`.
+
+	:param library:
+	:param n_tables: The number of hash tables.
+	:param bits: The number of bits in each table's hash. At most 63.
+	:param bin_width: The width of the *m/z* bins the spectra are divided into before hashing.
+	:param seed: Seed for the random projections, so an index can be rebuilt identically.
+	:param chunk_size: The number of library spectra to hash at once. Limits the memory used while building the index.
+	"""
+
+	def __init__(
+			self,
+			library: SpectralLibrary,
+			n_tables: int = 8,
+			bits: int = 16,
+			bin_width: float = 1.0,
+			seed: int = 0,
+			chunk_size: int = 10_000,
+			):
+
+		if not 0 < bits < 64:
+			raise ValueError("'bits' must be between 1 and 63")
+
+		if n_tables < 1:
+			raise ValueError("'n_tables' must be at least 1")
+
+		self.library = library
+		self.n_tables = n_tables
+		self.bits = bits
+		self.bin_width = bin_width
+
+		n_bins = int(math.ceil((library.xlim[1] - library.xlim[0]) / bin_width)) + 1
+		rng = numpy.random.default_rng(seed)
+		self._projection = rng.standard_normal((n_bins, n_tables * bits)).astype(numpy.float32)
+
+		keys = numpy.empty((len(library), n_tables), dtype=numpy.uint64)
+		for start in range(0, len(library), chunk_size):
+			stop = min(start + chunk_size, len(library))
+			keys[start:stop] = self._hash_range(start, stop)
+
+		#: For each table, the positions of the library spectra sorted by their hash.
+		self._order = numpy.argsort(keys, axis=0, kind="stable")
+
+		#: For each table, the sorted hashes.
+		self._keys = numpy.take_along_axis(keys, self._order, axis=0)
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({len(self.library)} spectra, {self.n_tables}x{self.bits} bits)>"
+
+	def _bins(self, mz: numpy.ndarray) -> numpy.ndarray:
+		bins = numpy.floor((mz - self.library.xlim[0]) / self.bin_width).astype(numpy.int64)
+		return numpy.clip(bins, 0, len(self._projection) - 1)
+
+	def _to_keys(self, projections: numpy.ndarray) -> numpy.ndarray:
+		# Pack the signs of the projections into one integer per table.
+		signs = (projections > 0).reshape(len(projections), self.n_tables, self.bits).astype(numpy.uint64)
+		weights = numpy.left_shift(numpy.uint64(1), numpy.arange(self.bits, dtype=numpy.uint64))
+		return (signs * weights).sum(axis=2, dtype=numpy.uint64)
+
+	def _hash_range(self, start: int, stop: int) -> numpy.ndarray:
+		library = self.library
+		offsets = library.offsets[start:stop + 1]
+		lo, hi = offsets[0], offsets[-1]
+
+		weighted = self._projection[self._bins(library.mz[lo:hi])] * library.intensity[lo:hi, None]
+		projections = numpy.zeros((stop - start, self._projection.shape[1]), dtype=numpy.float32)
+
+		# Sum the projections of each spectrum's peaks. Empty spectra are skipped by reduceat.
+		non_empty = numpy.flatnonzero(numpy.diff(offsets))
+		if len(non_empty):
+			projections[non_empty] = numpy.add.reduceat(weighted, offsets[non_empty] - lo, axis=0)
+
+		return self._to_keys(projections)
+
+	def _hash_query(self, mz: numpy.ndarray, intensity: numpy.ndarray) -> numpy.ndarray:
+		projection = (self._projection[self._bins(mz)] * intensity[:, None]).sum(axis=0, keepdims=True)
+		return self._to_keys(projection)[0]
+
+	def candidates(self, query: Union[numpy.ndarray, Spectrum]) -> numpy.ndarray:
+		"""
+		Returns the stored positions of the library spectra which share a hash with ``query`` in any table.
+
+		:param query: Array containing the query spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		"""
+
+		prepared = _prepare_query(query, self.library, SearchMode.OPEN, 0, "ppm", None)
+		return self._candidates(prepared.mz, prepared.intensity)
+
+	def _candidates(self, mz: numpy.ndarray, intensity: numpy.ndarray) -> numpy.ndarray:
+		query_keys = self._hash_query(mz, intensity)
+		found = []
+
+		for table, key in enumerate(query_keys):
+			table_keys = self._keys[:, table]
+			start = numpy.searchsorted(table_keys, key, side="left")
+			stop = numpy.searchsorted(table_keys, key, side="right")
+			found.append(self._order[start:stop, table])
+
+		return numpy.unique(numpy.concatenate(found)) if found else numpy.empty(0, dtype=numpy.int64)
+
+	def search(self, query: Union[numpy.ndarray, Spectrum], top_k: int = 10) -> List[SearchHit]:
+		"""
+		Search the library for the spectra most similar to ``query``,
+		rescoring the shortlisted candidates with the exact cosine similarity.
+
+		:param query: Array containing the query spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		:param top_k: The maximum number of hits to return.
+
+		:returns: The best matches among the candidates, highest scoring first.
+		"""  # noqa: D400
+
+		library = self.library
+		prepared = _prepare_query(query, library, SearchMode.OPEN, 0, "ppm", None)
+		positions = self._candidates(prepared.mz, prepared.intensity)
+
+		arrays = {name: getattr(library, name) for name in _array_names}
+		forward, reverse = _score_positions(prepared, arrays, positions)
+
+		hits = [(int(pos), float(f), float(r)) for pos, f, r in zip(positions, forward, reverse)]
+		return _merge_hits(library, prepared, hits, [], top_k)
+
+
+class RecallReport(NamedTuple):
+	"""
+	Comparison of an approximate search with an exact search.
+	"""
+
+	#: The fraction of the exact search's hits (with a non-zero score) also found by the approximate search.
+	recall: float
+
+	#: The mean fraction of the library shortlisted for exact rescoring.
+	candidate_fraction: float
+
+	#: The number of queries.
+	n_queries: int
+
+
+def measure_recall(
+		index: ApproximateIndex,
+		queries: Sequence[Union[numpy.ndarray, Spectrum]],
+		top_k: int = 10,
+		) -> RecallReport:
+	"""
+	Measure the recall of an approximate search against the exact search.
+
+	:param index:
+	:param queries: Arrays containing each query spectrum's peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, or :class:`~.Spectrum` objects.
+	:param top_k: The number of hits to compare for each query.
+	"""
+
+	found = expected = 0
+	candidate_fraction = 0.0
+
+	for query in queries:
+		exact = {hit.index for hit in search_library(query, index.library, top_k=top_k) if hit.score > 0}
+		approximate = {hit.index for hit in index.search(query, top_k=top_k)}
+
+		expected += len(exact)
+		found += len(exact & approximate)
+		candidate_fraction += len(index.candidates(query)) / max(len(index.library), 1)
+
+	return RecallReport(
+			recall=found / expected if expected else 1.0,
+			candidate_fraction=candidate_fraction / len(queries) if queries else 0.0,
+			n_queries=len(queries),
+			)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+#
+#  plotting.py
+"""
+Render many head to tail plots of spectrum matches to files.
+
+:meth:`SpectrumSimilarity.plot() <.SpectrumSimilarity.plot>` creates a new figure through :mod:`matplotlib.pyplot`
+each time it is called. When writing thousands of plots for a report it is much faster
+(and avoids pyplot keeping every figure alive) to draw one figure on an Agg canvas,
+and replace only the peaks and labels between files. :class:`~.HeadToTailRenderer` does that,
+and :func:`~.render_plots` spreads the work over a pool of processes, each with its own renderer.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+# 3rd party
+import numpy
+
+# this package
+from chemistry_tools.spectrum_similarity.spectrum import Spectrum, as_spectrum
+
+__all__ = ["PlotJob", "HeadToTailRenderer", "render_plots"]
+
+_PathLike = Union[str, "os.PathLike[str]"]
+
+
+class PlotJob(NamedTuple):
+	"""
+	A head to tail plot to be rendered to a file.
+	"""
+
+	#: The experimental spectrum, drawn above the axis.
+	spec_top: Union[numpy.ndarray, Spectrum]
+
+	#: The reference spectrum, drawn below the axis.
+	spec_bottom: Union[numpy.ndarray, Spectrum]
+
+	#: The file to write. The format is determined from the extension (e.g. ``.png`` or ``.svg``).
+	filename: _PathLike
+
+	#: Label for the top spectrum.
+	top_label: Optional[str] = None
+
+	#: Label for the bottom spectrum.
+	bottom_label: Optional[str] = None
+
+
+class HeadToTailRenderer:
+	"""
+	Renders head to tail plots, in the style of :meth:`SpectrumSimilarity.plot() <.SpectrumSimilarity.plot>`,
+	reusing a single figure.
+
+	:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+	:param b: numeric value specifying the baseline threshold for peak identification.
+		Expressed as a percent of the maximum intensity. Only used if ``filter`` is :py:obj:`True`.
+	:param filter: Whether peaks below ``b`` should be omitted.
+	:param figsize: The size of the figure, in inches.
+	:param dpi: The resolution of raster images, in dots per inch.
+	"""  # noqa: D400
+
+	def __init__(
+			self,
+			xlim: Tuple[int, int] = (50, 1200),
+			b: float = 1,
+			filter: bool = False,  # noqa: A002  # pylint: disable=redefined-builtin
+			figsize: Tuple[float, float] = (6.4, 4.8),
+			dpi: float = 100,
+			):
+
+		# 3rd party
+		from matplotlib.backends.backend_agg import FigureCanvasAgg  # nodep
+		from matplotlib.figure import Figure  # nodep
+
+		self.xlim = xlim
+		self.b = b
+		self.filter = filter
+
+		self.figure = Figure(figsize=figsize, dpi=dpi)
+		self.canvas = FigureCanvasAgg(self.figure)
+		ax = self.ax = self.figure.add_subplot()
+
+		self._top = ax.vlines([], 0, [], color="blue")
+		self._bottom = ax.vlines([], 0, [], color="red")
+
+		ax.set_ylim(-125, 125)
+		ax.set_xlim(xlim[0], xlim[1])
+		ax.axhline(color="black", linewidth=0.5)
+		ax.set_ylabel("Intensity (%)")
+		ax.set_xlabel("m/z", style="italic", family="serif")
+
+		h_centre = xlim[0] + (xlim[1] - xlim[0]) // 2
+		self._top_label = ax.text(h_centre, 110, '', horizontalalignment="center", verticalalignment="center")
+		self._bottom_label = ax.text(h_centre, -110, '', horizontalalignment="center", verticalalignment="center")
+
+	def _peaks(self, spectrum: Union[numpy.ndarray, Spectrum]) -> Tuple[numpy.ndarray, numpy.ndarray]:
+		spectrum = as_spectrum(spectrum)
+
+		if self.filter:
+			return spectrum.filter(self.b, self.xlim)
+		else:
+			return spectrum.clip(self.xlim)
+
+	@staticmethod
+	def _segments(mz: numpy.ndarray, intensity: numpy.ndarray) -> numpy.ndarray:
+		segments = numpy.zeros((len(mz), 2, 2))
+		segments[:, :, 0] = mz[:, None]
+		segments[:, 1, 1] = intensity
+		return segments
+
+	def draw(
+			self,
+			spec_top: Union[numpy.ndarray, Spectrum],
+			spec_bottom: Union[numpy.ndarray, Spectrum],
+			top_label: Optional[str] = None,
+			bottom_label: Optional[str] = None,
+			) -> None:
+		"""
+		Update the figure to show the given spectra.
+
+		:param spec_top: Array containing the experimental spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		:param spec_bottom: Array containing the reference spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		:param top_label: string to label the top spectrum.
+		:param bottom_label: string to label the bottom spectrum.
+		"""
+
+		mz, intensity = self._peaks(spec_top)
+		self._top.set_segments(self._segments(mz, intensity))
+
+		mz, intensity = self._peaks(spec_bottom)
+		self._bottom.set_segments(self._segments(mz, -intensity))
+
+		self._top_label.set_text(top_label or '')
+		self._bottom_label.set_text(bottom_label or '')
+
+	def render(
+			self,
+			spec_top: Union[numpy.ndarray, Spectrum],
+			spec_bottom: Union[numpy.ndarray, Spectrum],
+			filename: _PathLike,
+			top_label: Optional[str] = None,
+			bottom_label: Optional[str] = None,
+			) -> None:
+		"""
+		Draw the given spectra and write the plot to a file.
+
+		:param spec_top: Array containing the experimental spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		:param spec_bottom: Array containing the reference spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		:param filename: The file to write. The format is determined from the extension (e.g. ``.png`` or ``.svg``).
+		:param top_label: string to label the top spectrum.
+		:param bottom_label: string to label the bottom spectrum.
+		"""
+
+		self.draw(spec_top, spec_bottom, top_label, bottom_label)
+		self.figure.savefig(os.fspath(filename))
+
+	def render_many(self, jobs: Iterable[PlotJob]) -> List[str]:
+		"""
+		Render several plots.
+
+		:param jobs:
+
+		:returns: The files written.
+		"""
+
+		written = []
+
+		for job in jobs:
+			self.render(*job)
+			written.append(os.fspath(job.filename))
+
+		return written
+
+
+_worker_renderer: Optional[HeadToTailRenderer] = None
+
+
+def _create_renderer(kwargs: Dict[str, Any]) -> None:
+	global _worker_renderer
+	_worker_renderer = HeadToTailRenderer(**kwargs)
+
+
+def _render_chunk(jobs: List[PlotJob]) -> List[str]:
+	assert _worker_renderer is not None
+	return _worker_renderer.render_many(jobs)
+
+
+def render_plots(
+		jobs: Sequence[PlotJob],
+		processes: Optional[int] = 1,
+		chunk_size: int = 100,
+		**kwargs,
+		) -> List[str]:
+	r"""
+	Render head to tail plots to files.
+
+	:param jobs:
+	:param processes: The number of worker processes to render plots in.
+		If :py:obj:`None` the number of CPUs is used. If ``1`` the plots are rendered in this process.
+	:param chunk_size: The number of plots sent to a worker process at once.
+	:param \*\*kwargs: Keyword arguments passed to :class:`~.HeadToTailRenderer`.
+
+	:returns: The files written, in the same order as ``jobs``.
+	"""
+
+	jobs = [PlotJob(*job) for job in jobs]
+
+	if processes == 1:
+		return HeadToTailRenderer(**kwargs).render_many(jobs)
+
+	chunks = [jobs[start:start + chunk_size] for start in range(0, len(jobs), chunk_size)]
+	written: List[str] = []
+
+	with ProcessPoolExecutor(
+			max_workers=processes or os.cpu_count(),
+			initializer=_create_renderer,
+			initargs=(kwargs, ),
+			) as executor:
+		for chunk in executor.map(_render_chunk, chunks):
+			written.extend(chunk)
+
+	return written
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+#
+#  preprocessing.py
+"""
+Vectorised preprocessing of batches of mass spectra.
+
+The peaks of every spectrum in a batch are stored end to end in a :class:`~.PeakBatch`,
+and each preprocessing step operates on all of them at once with NumPy,
+rather than looping over the spectra in Python.
+Steps are combined into a :class:`~.Pipeline`, which preprocesses a whole library in one call
+and caches the result on each :class:`~.Spectrum`.
+
+.. code-block:: python
+
+	pipeline = Pipeline([
+		RemovePrecursor(tolerance=1.5),
+		NoiseFilter(factor=3),
+		TopN(6, window=50),
+		TransformIntensity("sqrt"),
+		MinPeaks(5),
+		])
+
+	library = SpectralLibrary(pipeline(spectra))
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+# 3rd party
+import numpy
+from enum_tools import StrEnum, document_enum
+
+# this package
+from chemistry_tools.spectrum_similarity.spectrum import Spectrum, as_spectrum
+
+__all__ = [
+		"PeakBatch",
+		"Pipeline",
+		"IntensityTransform",
+		"ClipMZ",
+		"TopN",
+		"RemovePrecursor",
+		"TransformIntensity",
+		"NoiseFilter",
+		"MinPeaks",
+		"Deisotope",
+		"estimate_noise",
+		"ISOTOPE_SPACING",
+		]
+
+#: The difference in mass between carbon-13 and carbon-12, which separates the peaks of an isotope envelope.
+ISOTOPE_SPACING = 1.0033548
+
+
+class PeakBatch:
+	"""
+	The peak lists of several spectra, stored end to end.
+
+	:param mz: The *m/z* values of every peak, in ascending order within each spectrum.
+	:param intensity: The intensities corresponding to ``mz``.
+	:param offsets: The start of each spectrum's peaks in ``mz`` and ``intensity``.
+		Has one more element than the number of spectra.
+	:param precursor_mz: The precursor *m/z* of each spectrum, or ``NaN`` where not known.
+	"""
+
+	#: The *m/z* values of every peak, in ascending order within each spectrum.
+	mz: numpy.ndarray
+
+	#: The intensities corresponding to :attr:`mz`.
+	intensity: numpy.ndarray
+
+	#: The start of each spectrum's peaks in :attr:`mz` and :attr:`intensity`.
+	offsets: numpy.ndarray
+
+	#: The precursor *m/z* of each spectrum, or ``NaN`` where not known.
+	precursor_mz: numpy.ndarray
+
+	def __init__(
+			self,
+			mz: numpy.ndarray,
+			intensity: numpy.ndarray,
+			offsets: numpy.ndarray,
+			precursor_mz: numpy.ndarray,
+			):
+		self.mz = numpy.asarray(mz, dtype=numpy.float64)
+		self.intensity = numpy.asarray(intensity, dtype=numpy.float64)
+		self.offsets = numpy.asarray(offsets, dtype=numpy.int64)
+		self.precursor_mz = numpy.asarray(precursor_mz, dtype=numpy.float64)
+
+	@classmethod
+	def from_spectra(cls, spectra: Iterable[Union[numpy.ndarray, Spectrum]]) -> "PeakBatch":
+		"""
+		Construct a :class:`~.PeakBatch` from a sequence of spectra.
+
+		:param spectra: Arrays containing each spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or :class:`~.Spectrum` objects.
+		"""
+
+		spectra = [as_spectrum(spectrum) for spectrum in spectra]
+		lengths = [len(spectrum) for spectrum in spectra]
+
+		if spectra:
+			mz = numpy.concatenate([spectrum.mz for spectrum in spectra])
+			intensity = numpy.concatenate([spectrum.intensity for spectrum in spectra])
+		else:
+			mz = intensity = numpy.empty(0, dtype=numpy.float64)
+
+		return cls(
+				mz,
+				intensity,
+				numpy.concatenate(([0], numpy.cumsum(lengths, dtype=numpy.int64))),
+				[numpy.nan if spectrum.precursor_mz is None else spectrum.precursor_mz for spectrum in spectra],
+				)
+
+	def to_spectra(self) -> List[Spectrum]:
+		"""
+		Returns the spectra in the batch as :class:`~.Spectrum` objects.
+		"""
+
+		spectra = []
+
+		for idx, precursor_mz in enumerate(self.precursor_mz):
+			start, stop = self.offsets[idx], self.offsets[idx + 1]
+			spectra.append(
+					Spectrum(
+							self.mz[start:stop],
+							self.intensity[start:stop],
+							None if numpy.isnan(precursor_mz) else precursor_mz,
+							)
+					)
+
+		return spectra
+
+	def __len__(self) -> int:
+		return len(self.offsets) - 1
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({len(self)} spectra, {len(self.mz)} peaks)>"
+
+	@property
+	def owner(self) -> numpy.ndarray:
+		"""
+		The index of the spectrum each peak belongs to.
+		"""
+
+		return numpy.repeat(numpy.arange(len(self), dtype=numpy.int64), numpy.diff(self.offsets))
+
+	def select(self, mask: numpy.ndarray) -> "PeakBatch":
+		"""
+		Returns a new batch containing only the peaks where ``mask`` is :py:obj:`True`.
+
+		:param mask: Boolean array with one element per peak.
+		"""
+
+		counts = numpy.bincount(self.owner[mask], minlength=len(self))
+		return PeakBatch(
+				self.mz[mask],
+				self.intensity[mask],
+				numpy.concatenate(([0], numpy.cumsum(counts))),
+				self.precursor_mz,
+				)
+
+
+def _rank_within(groups: numpy.ndarray, intensity: numpy.ndarray) -> numpy.ndarray:
+	"""
+	Returns the rank of each peak by decreasing intensity within its group (counting from zero).
+
+	:param groups: An integer group label for each peak. Peaks of the same group must be contiguous.
+	:param intensity:
+	"""
+
+	order = numpy.lexsort((-intensity, groups))
+	sorted_groups = groups[order]
+
+	starts = numpy.flatnonzero(numpy.concatenate(([True], sorted_groups[1:] != sorted_groups[:-1])))
+	group_start = numpy.repeat(starts, numpy.diff(numpy.append(starts, len(order))))
+
+	ranks = numpy.empty(len(order), dtype=numpy.int64)
+	ranks[order] = numpy.arange(len(order)) - group_start
+	return ranks
+
+
+def estimate_noise(batch: PeakBatch) -> numpy.ndarray:
+	"""
+	Estimate the noise level of each spectrum in the batch as the median intensity of its peaks.
+
+	:param batch:
+
+	:returns: The noise level of each spectrum, or ``NaN`` for spectra without any peaks.
+	"""
+
+	counts = numpy.diff(batch.offsets)
+	sorted_intensity = batch.intensity[numpy.lexsort((batch.intensity, batch.owner))]
+
+	noise = numpy.full(len(batch), numpy.nan)
+	has_peaks = counts > 0
+	starts, counts = batch.offsets[:-1][has_peaks], counts[has_peaks]
+
+	lower = sorted_intensity[starts + (counts - 1) // 2]
+	upper = sorted_intensity[starts + counts // 2]
+	noise[has_peaks] = (lower + upper) / 2
+	return noise
+
+
+class ClipMZ(NamedTuple):
+	"""
+	Remove peaks outside an *m/z* range.
+	"""
+
+	#: tuple of length 2, defining the beginning and ending values of the x-axis.
+	xlim: Tuple[float, float] = (50, 1200)
+
+	def __call__(self, batch: PeakBatch) -> PeakBatch:  # noqa: D102
+		return batch.select((batch.mz >= self.xlim[0]) & (batch.mz <= self.xlim[1]))
+
+
+class TopN(NamedTuple):
+	"""
+	Keep only the most intense peaks of each spectrum, or of each *m/z* window of each spectrum.
+	"""
+
+	#: The number of peaks to keep.
+	n: int
+
+	#: The width of the *m/z* windows. If :py:obj:`None` the ``n`` most intense peaks of the whole spectrum are kept.
+	window: Optional[float] = None
+
+	def __call__(self, batch: PeakBatch) -> PeakBatch:  # noqa: D102
+		groups = batch.owner
+
+		if self.window is not None:
+			# Number the windows consecutively across the batch.
+			bins = numpy.floor(batch.mz / self.window).astype(numpy.int64)
+			new_group = numpy.concatenate(([True], (groups[1:] != groups[:-1]) | (bins[1:] != bins[:-1])))
+			groups = numpy.cumsum(new_group)
+
+		return batch.select(_rank_within(groups, batch.intensity) < self.n)
+
+
+class RemovePrecursor(NamedTuple):
+	"""
+	Remove the peaks near each spectrum's precursor *m/z*.
+
+	Spectra without a precursor *m/z* are unchanged.
+	"""
+
+	#: The maximum difference from the precursor *m/z* for peaks to be removed.
+	tolerance: float = 1.5
+
+	#: The unit of :attr:`tolerance`. Either ``'ppm'`` or ``'Da'``.
+	tolerance_unit: str = "Da"
+
+	def __call__(self, batch: PeakBatch) -> PeakBatch:  # noqa: D102
+		precursor_mz = batch.precursor_mz[batch.owner]
+
+		if self.tolerance_unit == "ppm":
+			delta = precursor_mz * self.tolerance * 1e-6
+		elif self.tolerance_unit == "Da":
+			delta = self.tolerance
+		else:
+			raise ValueError(f"Unknown tolerance unit {self.tolerance_unit!r}. Must be 'ppm' or 'Da'.")
+
+		# Comparisons with NaN are False, so spectra without a precursor keep all their peaks.
+		return batch.select(~(numpy.abs(batch.mz - precursor_mz) <= delta))
+
+
+@document_enum
+class IntensityTransform(StrEnum):
+	"""
+	Transformations which can be applied to the intensities of spectra.
+	"""
+
+	SQRT = "sqrt"  # doc: The square root of the intensity. Reduces the dominance of the most intense peaks.
+	LOG = "log"  # doc: The natural logarithm of one plus the intensity.
+
+
+class TransformIntensity(NamedTuple):
+	"""
+	Transform the intensity of each peak.
+	"""
+
+	#: The transformation to apply.
+	method: Union[str, IntensityTransform] = IntensityTransform.SQRT
+
+	def __call__(self, batch: PeakBatch) -> PeakBatch:  # noqa: D102
+		method = IntensityTransform(self.method)
+
+		if method == IntensityTransform.SQRT:
+			intensity = numpy.sqrt(batch.intensity)
+		else:
+			intensity = numpy.log1p(batch.intensity)
+
+		return PeakBatch(batch.mz, intensity, batch.offsets, batch.precursor_mz)
+
+
+class NoiseFilter(NamedTuple):
+	"""
+	Remove peaks less intense than a multiple of each spectrum's noise level, as given by :func:`~.estimate_noise`.
+	"""
+
+	#: The multiple of the noise level peaks must be at least as intense as.
+	factor: float = 2.0
+
+	def __call__(self, batch: PeakBatch) -> PeakBatch:  # noqa: D102
+		noise = estimate_noise(batch)
+		return batch.select(batch.intensity >= self.factor * noise[batch.owner])
+
+
+class MinPeaks(NamedTuple):
+	"""
+	Remove all peaks from spectra with fewer than a minimum number of peaks.
+
+	The spectra are left in the batch with no peaks, so the batch stays aligned with its input.
+	"""
+
+	#: The minimum number of peaks.
+	n: int
+
+	def __call__(self, batch: PeakBatch) -> PeakBatch:  # noqa: D102
+		return batch.select(numpy.diff(batch.offsets)[batch.owner] >= self.n)
+
+
+class Deisotope(NamedTuple):
+	"""
+	Remove peaks which appear to be heavier isotopes of a more intense peak.
+
+	A peak is removed if there is a more intense peak in the same spectrum
+	:data:`~.ISOTOPE_SPACING`/*z* lower in *m/z*, for any charge *z* up to :attr:`max_charge`.
+	"""
+
+	#: The maximum difference in *m/z* from the expected position of an isotope peak.
+	tolerance: float = 0.01
+
+	#: The maximum charge to consider.
+	max_charge: int = 1
+
+	def __call__(self, batch: PeakBatch) -> PeakBatch:  # noqa: D102
+		if not len(batch.mz):
+			return batch
+
+		# Separate the spectra on a single axis, so one binary search covers the whole batch.
+		span = numpy.ceil(batch.mz.max()) + 10 * (ISOTOPE_SPACING + self.tolerance)
+		owner = batch.owner
+		key = batch.mz + owner * span
+		isotope = numpy.zeros(len(key), dtype=bool)
+
+		for charge in range(1, self.max_charge + 1):
+			target = key - ISOTOPE_SPACING / charge
+			pos = numpy.searchsorted(key, target)
+
+			# Check the peaks either side of the expected position.
+			for candidate in (pos - 1, pos):
+				valid = (candidate >= 0) & (candidate < len(key))
+				candidate = numpy.clip(candidate, 0, len(key) - 1)
+				isotope |= (
+						valid & (owner[candidate] == owner)
+						& (numpy.abs(key[candidate] - target) <= self.tolerance)
+						& (batch.intensity[candidate] > batch.intensity)
+						)
+
+		return batch.select(~isotope)
+
+
+class Pipeline:
+	"""
+	A sequence of preprocessing steps, applied in order.
+
+	Each step is a callable taking and returning a :class:`~.PeakBatch`.
+	The steps provided in this module are hashable, which allows the results to be cached.
+
+	:param steps:
+	"""
+
+	steps: Tuple[Callable[[PeakBatch], PeakBatch], ...]
+
+	def __init__(self, steps: Iterable[Callable[[PeakBatch], PeakBatch]]):
+		self.steps = tuple(steps)
+
+	def __repr__(self) -> str:
+		return f"{type(self).__name__}({list(self.steps)!r})"
+
+	def __eq__(self, other) -> bool:  # noqa: MAN001
+		if isinstance(other, Pipeline):
+			return self.steps == other.steps
+		return NotImplemented
+
+	def __hash__(self) -> int:
+		return hash(self.steps)
+
+	def process(self, batch: PeakBatch) -> PeakBatch:
+		"""
+		Apply the steps to a batch of spectra.
+
+		:param batch:
+		"""
+
+		for step in self.steps:
+			batch = step(batch)
+
+		return batch
+
+	def __call__(self, spectra: Sequence[Union[numpy.ndarray, Spectrum]]) -> List[Spectrum]:
+		"""
+		Preprocess a sequence of spectra.
+
+		The spectra not already processed with this pipeline are processed in a single batch,
+		and the output is cached on each input :class:`~.Spectrum`.
+
+		:param spectra: Arrays containing each spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or :class:`~.Spectrum` objects.
+
+		:returns: The processed spectra, in the same order as ``spectra``.
+		"""
+
+		spectra = [as_spectrum(spectrum) for spectrum in spectra]
+		key = ("pipeline", self)
+
+		try:
+			pending = [idx for idx, spectrum in enumerate(spectra) if key not in spectrum._cache]
+		except TypeError:  # The pipeline contains unhashable steps
+			key = None
+			pending = list(range(len(spectra)))
+
+		if pending:
+			processed = self.process(PeakBatch.from_spectra([spectra[idx] for idx in pending])).to_spectra()
+
+			if key is None:
+				return processed
+
+			for idx, spectrum in zip(pending, processed):
+				spectra[idx]._cache[key] = spectrum
+
+		return [spectrum._cache[key] for spectrum in spectra]
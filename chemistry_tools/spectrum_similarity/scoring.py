@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+#
+#  scoring.py
+r"""
+Similarity scores computed from a single alignment of two mass spectra.
+
+The peaks of the two spectra are aligned once, and any number of scores are then calculated
+from the aligned intensities using array operations.
+Many pairs of spectra can be aligned and scored at once, as an :class:`~.AlignedPairs` may
+hold the alignments of any number of pairs.
+
+The following scores are available:
+
+.. list-table::
+	:header-rows: 1
+	:widths: 20 80
+
+	* - Name
+	  - Description
+	* - ``cosine``
+	  - The cosine similarity, as given by :meth:`SpectrumSimilarity.score()[0] <.SpectrumSimilarity.score>`.
+	* - ``reverse_cosine``
+	  - The reverse cosine similarity, considering only peaks present in the bottom (reference) spectrum,
+	    as given by :meth:`SpectrumSimilarity.score()[1] <.SpectrumSimilarity.score>`.
+	* - ``weighted_dot``
+	  - The cosine similarity of the intensities weighted by :math:`(m/z)^a \cdot I^b`.
+	* - ``nist_composite``
+	  - The composite score of Stein and Scott (1994), combining the squared weighted cosine similarity
+	    with the ratios of the intensities of adjacent matched peaks.
+	* - ``entropy``
+	  - The spectral entropy similarity of Li *et al.* (2021).
+	* - ``matched_peaks``
+	  - The number of peaks present in both spectra.
+	* - ``matched_fraction``
+	  - The fraction of peaks in the top (experimental) spectrum which are also present in the bottom spectrum.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import math
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Tuple, Union
+
+# 3rd party
+import numpy
+
+# this package
+from chemistry_tools.spectrum_similarity.spectrum import Spectrum, as_spectrum
+
+__all__ = ["AlignedPairs", "METRICS", "align", "align_batch", "score_alignment", "score_pairs"]
+
+#: The names of the available scores.
+METRICS = (
+		"cosine",
+		"reverse_cosine",
+		"weighted_dot",
+		"nist_composite",
+		"entropy",
+		"matched_peaks",
+		"matched_fraction",
+		)
+
+
+class AlignedPairs(NamedTuple):
+	"""
+	The aligned peaks of one or more pairs of spectra.
+
+	Each row gives an *m/z* value present in either spectrum of a pair,
+	with an intensity of zero where the peak is absent from one of the spectra.
+	The rows of each pair are contiguous and sorted by *m/z*.
+	"""
+
+	#: The aligned *m/z* values.
+	mz: numpy.ndarray
+
+	#: The normalised intensities of the top (experimental) spectrum at each *m/z* value.
+	intensity_top: numpy.ndarray
+
+	#: The normalised intensities of the bottom (reference) spectrum at each *m/z* value.
+	intensity_bottom: numpy.ndarray
+
+	#: Whether each *m/z* value is present in the top spectrum.
+	in_top: numpy.ndarray
+
+	#: Whether each *m/z* value is present in the bottom spectrum.
+	in_bottom: numpy.ndarray
+
+	#: The index of the pair each row belongs to.
+	owner: numpy.ndarray
+
+	#: The number of pairs.
+	n_pairs: int
+
+
+def align_batch(
+		pairs: Iterable[Tuple[Union[numpy.ndarray, Spectrum], Union[numpy.ndarray, Spectrum]]],
+		b: float = 1,
+		xlim: Tuple[int, int] = (50, 1200),
+		) -> AlignedPairs:
+	"""
+	Align the peaks of each pair of spectra on their *m/z* values.
+
+	:param pairs: Pairs of ``(top, bottom)`` spectra, either as arrays in the format returned by
+		:func:`~.create_array` or as :class:`~.Spectrum` objects.
+	:param b: numeric value specifying the baseline threshold for peak identification.
+		Expressed as a percent of the maximum intensity.
+	:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+	"""
+
+	tops, bottoms = [], []
+
+	for top, bottom in pairs:
+		tops.append(as_spectrum(top).filter(b, xlim))
+		bottoms.append(as_spectrum(bottom).filter(b, xlim))
+
+	n_pairs = len(tops)
+	top_mz, top_intensity, top_owner = _flatten(tops)
+	bottom_mz, bottom_intensity, bottom_owner = _flatten(bottoms)
+
+	# Find the unique (pair, m/z) combinations across both spectra of each pair.
+	owner = numpy.concatenate((top_owner, bottom_owner))
+	mz = numpy.concatenate((top_mz, bottom_mz))
+	order = numpy.lexsort((mz, owner))
+
+	sorted_owner, sorted_mz = owner[order], mz[order]
+	is_new = numpy.ones(len(order), dtype=bool)
+	is_new[1:] = (sorted_owner[1:] != sorted_owner[:-1]) | (sorted_mz[1:] != sorted_mz[:-1])
+
+	row = numpy.empty(len(order), dtype=numpy.int64)
+	row[order] = numpy.cumsum(is_new) - 1
+	n_rows = int(is_new.sum())
+
+	top_rows, bottom_rows = row[:len(top_mz)], row[len(top_mz):]
+
+	aligned_top = numpy.zeros(n_rows)
+	aligned_top[top_rows] = top_intensity
+	aligned_bottom = numpy.zeros(n_rows)
+	aligned_bottom[bottom_rows] = bottom_intensity
+
+	in_top = numpy.zeros(n_rows, dtype=bool)
+	in_top[top_rows] = True
+	in_bottom = numpy.zeros(n_rows, dtype=bool)
+	in_bottom[bottom_rows] = True
+
+	return AlignedPairs(
+			mz=sorted_mz[is_new],
+			intensity_top=aligned_top,
+			intensity_bottom=aligned_bottom,
+			in_top=in_top,
+			in_bottom=in_bottom,
+			owner=sorted_owner[is_new],
+			n_pairs=n_pairs,
+			)
+
+
+def _flatten(peaks: Sequence[Tuple[numpy.ndarray, numpy.ndarray]]) -> Tuple[numpy.ndarray, ...]:
+	lengths = [len(mz) for mz, _ in peaks]
+	owner = numpy.repeat(numpy.arange(len(peaks), dtype=numpy.int64), lengths)
+
+	if not peaks:
+		return numpy.empty(0), numpy.empty(0), owner
+
+	return numpy.concatenate([mz for mz, _ in peaks]), numpy.concatenate([i for _, i in peaks]), owner
+
+
+def align(
+		spec_top: Union[numpy.ndarray, Spectrum],
+		spec_bottom: Union[numpy.ndarray, Spectrum],
+		b: float = 1,
+		xlim: Tuple[int, int] = (50, 1200),
+		) -> AlignedPairs:
+	"""
+	Align the peaks of two spectra on their *m/z* values.
+
+	:param spec_top: Array containing the experimental spectrum's peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+	:param spec_bottom: Array containing the reference spectrum's peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+	:param b: numeric value specifying the baseline threshold for peak identification.
+		Expressed as a percent of the maximum intensity.
+	:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+	"""
+
+	return align_batch([(spec_top, spec_bottom)], b=b, xlim=xlim)
+
+
+def _sum(aligned: AlignedPairs, values: numpy.ndarray) -> numpy.ndarray:
+	# Sum ``values`` for each pair.
+	return numpy.bincount(aligned.owner, weights=values, minlength=aligned.n_pairs)
+
+
+def _ratio(numerator: numpy.ndarray, denominator: numpy.ndarray) -> numpy.ndarray:
+	# Divide, returning zero where the denominator is zero.
+	out = numpy.zeros_like(numerator, dtype=numpy.float64)
+	numpy.divide(numerator, denominator, out=out, where=denominator != 0)
+	return out
+
+
+def _cosine(aligned: AlignedPairs, u: numpy.ndarray, v: numpy.ndarray) -> numpy.ndarray:
+	return _ratio(_sum(aligned, u * v), numpy.sqrt(_sum(aligned, u * u) * _sum(aligned, v * v)))
+
+
+def _entropy(aligned: AlignedPairs, p: numpy.ndarray) -> numpy.ndarray:
+	# Shannon entropy of each pair's probability distribution ``p``.
+	log_p = numpy.zeros_like(p)
+	numpy.log(p, out=log_p, where=p > 0)
+	return -_sum(aligned, p * log_p)
+
+
+def _to_probabilities(aligned: AlignedPairs, intensity: numpy.ndarray, weighting: bool) -> numpy.ndarray:
+	p = _ratio(intensity, _sum(aligned, intensity)[aligned.owner])
+
+	if weighting:
+		# Low entropy spectra are weighted towards their minor peaks (Li et al., 2021)
+		entropy = _entropy(aligned, p)
+		weight = numpy.where(entropy < 3, 0.25 + 0.25 * entropy, 1.0)
+		p = p**weight[aligned.owner]
+		p = _ratio(p, _sum(aligned, p)[aligned.owner])
+
+	return p
+
+
+def score_alignment(
+		aligned: AlignedPairs,
+		metrics: Optional[Iterable[str]] = None,
+		mz_power: float = 3,
+		intensity_power: float = 0.6,
+		entropy_weighting: bool = True,
+		) -> Dict[str, numpy.ndarray]:
+	"""
+	Calculate similarity scores from aligned peaks.
+
+	:param aligned: The aligned peaks, as returned by :func:`~.align` or :func:`~.align_batch`.
+	:param metrics: The scores to calculate. Defaults to all scores in :data:`~.METRICS`.
+	:param mz_power: The power to raise the *m/z* values to
+		for the ``weighted_dot`` and ``nist_composite`` scores.
+	:param intensity_power: The power to raise the intensities to
+		for the ``weighted_dot`` and ``nist_composite`` scores.
+	:param entropy_weighting: Whether to weight low entropy spectra for the ``entropy`` score.
+
+	:returns: A mapping of score names to arrays giving the score of each pair.
+	"""
+
+	if metrics is None:
+		metrics = METRICS
+	else:
+		metrics = list(metrics)
+		for metric in metrics:
+			if metric not in METRICS:
+				raise ValueError(f"Unknown metric {metric!r}")
+
+	u, v = aligned.intensity_top, aligned.intensity_bottom
+	matched = aligned.in_top & aligned.in_bottom
+	results: Dict[str, numpy.ndarray] = {}
+	weighted: Optional[Tuple[numpy.ndarray, numpy.ndarray]] = None
+
+	for metric in metrics:
+		if metric == "cosine":
+			results[metric] = _cosine(aligned, u, v)
+
+		elif metric == "reverse_cosine":
+			results[metric] = _cosine(aligned, numpy.where(aligned.in_bottom, u, 0), v)
+
+		elif metric in {"weighted_dot", "nist_composite"}:
+			if weighted is None:
+				mz_weight = aligned.mz**mz_power
+				weighted = (mz_weight * u**intensity_power, mz_weight * v**intensity_power)
+
+			if metric == "weighted_dot":
+				results[metric] = _cosine(aligned, *weighted)
+			else:
+				results[metric] = _nist_composite(aligned, weighted[0], weighted[1], matched)
+
+		elif metric == "entropy":
+			p = _to_probabilities(aligned, u, entropy_weighting)
+			q = _to_probabilities(aligned, v, entropy_weighting)
+			mixed_entropy = _entropy(aligned, (p + q) / 2)
+			similarity = 1 - (2 * mixed_entropy - _entropy(aligned, p) - _entropy(aligned, q)) / math.log(4)
+			non_empty = (_sum(aligned, aligned.in_top) > 0) & (_sum(aligned, aligned.in_bottom) > 0)
+			results[metric] = numpy.where(non_empty, numpy.clip(similarity, 0, 1), 0.0)
+
+		elif metric == "matched_peaks":
+			results[metric] = _sum(aligned, matched).astype(numpy.int64)
+
+		elif metric == "matched_fraction":
+			results[metric] = _ratio(_sum(aligned, matched), _sum(aligned, aligned.in_top))
+
+	return results
+
+
+def _nist_composite(
+		aligned: AlignedPairs,
+		weighted_top: numpy.ndarray,
+		weighted_bottom: numpy.ndarray,
+		matched: numpy.ndarray,
+		) -> numpy.ndarray:
+	# Composite score from Stein, S. E.; Scott, D. R. J. Am. Soc. Mass Spectrom. 1994, 5 (9), 859–866.
+
+	dot = _cosine(aligned, weighted_top, weighted_bottom)**2
+
+	# Ratios of the intensities of adjacent matched peaks; the m/z weighting cancels out.
+	owner = aligned.owner[matched]
+	top, bottom = weighted_top[matched], weighted_bottom[matched]
+	adjacent = owner[1:] == owner[:-1]
+
+	ratio = _ratio(bottom[1:] * top[:-1], bottom[:-1] * top[1:])
+	ratio = numpy.where(ratio > 1, _ratio(numpy.ones_like(ratio), ratio), ratio)
+
+	# The ratio term is averaged over the adjacent pairs, so identical spectra score 1.
+	n_matched = numpy.bincount(owner, minlength=aligned.n_pairs)
+	ratio_sum = numpy.bincount(owner[1:][adjacent], weights=ratio[adjacent], minlength=aligned.n_pairs)
+	ratio_score = _ratio(ratio_sum, numpy.maximum(n_matched - 1, 0))
+
+	n_top = _sum(aligned, aligned.in_top)
+	return _ratio(n_top * dot + n_matched * ratio_score, n_top + n_matched)
+
+
+def score_pairs(
+		pairs: Iterable[Tuple[Union[numpy.ndarray, Spectrum], Union[numpy.ndarray, Spectrum]]],
+		metrics: Optional[Iterable[str]] = None,
+		b: float = 1,
+		xlim: Tuple[int, int] = (50, 1200),
+		**kwargs,
+		) -> Dict[str, numpy.ndarray]:
+	r"""
+	Align each pair of spectra and calculate their similarity scores.
+
+	:param pairs: Pairs of ``(top, bottom)`` spectra, either as arrays in the format returned by
+		:func:`~.create_array` or as :class:`~.Spectrum` objects.
+	:param metrics: The scores to calculate. Defaults to all scores in :data:`~.METRICS`.
+	:param b: numeric value specifying the baseline threshold for peak identification.
+		Expressed as a percent of the maximum intensity.
+	:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+	:param \*\*kwargs: Additional keyword arguments passed to :func:`~.score_alignment`.
+
+	:returns: A mapping of score names to arrays giving the score of each pair.
+	"""
+
+	return score_alignment(align_batch(pairs, b=b, xlim=xlim), metrics, **kwargs)
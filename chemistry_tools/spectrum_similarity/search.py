@@ -0,0 +1,663 @@
+#!/usr/bin/env python3
+#
+#  search.py
+"""
+Search mass spectra against a library of reference spectra.
+
+If the library and query spectra have precursor *m/z* values, the search can be restricted to
+library spectra whose precursor lies within a tolerance of the query's precursor (see :class:`~.SearchMode`).
+The library is stored sorted by precursor *m/z*, so the candidates are found with a binary search
+before any peaks are compared, and the cost of a search depends on the number of candidates
+rather than the size of the library.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+# 3rd party
+import numpy
+from enum_tools import StrEnum, document_enum
+
+# this package
+from chemistry_tools.spectrum_similarity.spectrum import Spectrum, as_spectrum
+
+__all__ = ["SearchHit", "SearchMode", "SpectralLibrary", "SharedLibrary", "search_library", "parallel_search"]
+
+_array_names = ("mz", "intensity", "owner", "offsets", "norms")
+
+_Triple = Tuple[int, float, float]
+
+
+class SearchHit(NamedTuple):
+	"""
+	A single match between a query spectrum and a library spectrum.
+	"""
+
+	#: The index of the matching spectrum in the library.
+	index: int
+
+	#: The name of the matching spectrum, if the library has names.
+	name: Optional[str]
+
+	#: The similarity score, as given by :meth:`SpectrumSimilarity.score()[0] <.SpectrumSimilarity.score>`.
+	score: float
+
+	#: The reverse similarity score, as given by :meth:`SpectrumSimilarity.score()[1] <.SpectrumSimilarity.score>`.
+	reverse_score: float
+
+
+@document_enum
+class SearchMode(StrEnum):
+	"""
+	Strategies for selecting the library spectra to compare a query against.
+	"""
+
+	OPEN = "open"  # doc: Compare the query against every spectrum in the library.
+	PRECURSOR = "precursor"  # doc: Compare the query against library spectra within the precursor tolerance.
+	HYBRID = "hybrid"  # doc: As ``PRECURSOR``, then the rest of the library if fewer than ``top_k`` of those match.
+
+
+class SpectralLibrary:
+	"""
+	A collection of reference spectra, preprocessed into flat arrays for fast searching.
+
+	The peaks of every spectrum are stored end to end in :attr:`mz` and :attr:`intensity`,
+	with :attr:`offsets` giving the start of each spectrum's peaks.
+	If the spectra have precursor *m/z* values they are stored in ascending order of precursor *m/z*,
+	with :attr:`order` mapping each stored position back to the index of the spectrum in ``spectra``.
+
+	:param spectra: Arrays containing each spectrum's peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, or :class:`~.Spectrum` objects.
+	:param names: Optional names for the spectra.
+	:param b: numeric value specifying the baseline threshold for peak identification.
+		Expressed as a percent of the maximum intensity.
+	:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+	:param precursor_mz: The precursor *m/z* of each spectrum.
+		If not given, the :attr:`Spectrum.precursor_mz <.spectrum.Spectrum.precursor_mz>` values are used.
+
+	.. versionchanged:: 1.2.0  Added the ``precursor_mz`` argument.
+	"""
+
+	#: The *m/z* values of every peak in the library.
+	mz: numpy.ndarray
+
+	#: The normalised intensities of every peak in the library.
+	intensity: numpy.ndarray
+
+	#: The stored position of the spectrum each peak belongs to.
+	owner: numpy.ndarray
+
+	#: The start of each spectrum's peaks in :attr:`mz` and :attr:`intensity`. Has one more element than the library.
+	offsets: numpy.ndarray
+
+	#: The L2 norm of each spectrum's intensities.
+	norms: numpy.ndarray
+
+	#: The index in ``spectra`` of the spectrum stored at each position.
+	order: numpy.ndarray
+
+	#: The precursor *m/z* of each stored spectrum, in ascending order, or :py:obj:`None` if not available.
+	#: Spectra without a precursor *m/z* have a value of ``NaN`` and are stored last.
+	precursor_mz: Optional[numpy.ndarray]
+
+	def __init__(
+			self,
+			spectra: Iterable[Union[numpy.ndarray, Spectrum]],
+			names: Optional[Sequence[str]] = None,
+			b: float = 1,
+			xlim: Tuple[int, int] = (50, 1200),
+			precursor_mz: Optional[Sequence[Optional[float]]] = None,
+			):
+
+		self.b = b
+		self.xlim = xlim
+
+		spectra = [as_spectrum(spectrum) for spectrum in spectra]
+
+		if names is not None:
+			names = [str(name) for name in names]
+			if len(names) != len(spectra):
+				raise ValueError("'names' must be the same length as 'spectra'")
+
+		self.names = names
+
+		if precursor_mz is None and any(spectrum.precursor_mz is not None for spectrum in spectra):
+			precursor_mz = [spectrum.precursor_mz for spectrum in spectra]
+
+		if precursor_mz is None:
+			self.precursor_mz = None
+			self.order = numpy.arange(len(spectra), dtype=numpy.int64)
+		else:
+			if len(precursor_mz) != len(spectra):
+				raise ValueError("'precursor_mz' must be the same length as 'spectra'")
+
+			precursors = numpy.array([numpy.nan if p is None else p for p in precursor_mz], dtype=numpy.float64)
+			self.order = numpy.argsort(precursors, kind="stable").astype(numpy.int64)
+			self.precursor_mz = precursors[self.order]
+
+		processed = [spectra[idx].filter(b, xlim) for idx in self.order]
+
+		lengths = numpy.array([len(mz) for mz, _ in processed], dtype=numpy.int64)
+		self.offsets = numpy.concatenate(([0], numpy.cumsum(lengths))).astype(numpy.int64)
+		self.owner = numpy.repeat(numpy.arange(len(processed), dtype=numpy.int64), lengths)
+
+		if processed:
+			self.mz = numpy.concatenate([mz for mz, _ in processed])
+			self.intensity = numpy.concatenate([intensity for _, intensity in processed])
+		else:
+			self.mz = numpy.empty(0, dtype=numpy.float64)
+			self.intensity = numpy.empty(0, dtype=numpy.float64)
+
+		self.norms = numpy.sqrt(numpy.bincount(self.owner, weights=self.intensity**2, minlength=len(processed)))
+
+	def __len__(self) -> int:
+		return len(self.offsets) - 1
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({len(self)} spectra)>"
+
+	def window(
+			self,
+			precursor_mz: float,
+			tolerance: float = 10,
+			tolerance_unit: str = "ppm",
+			) -> Tuple[int, int]:
+		"""
+		Returns the range of stored positions of the spectra whose precursor *m/z* is within the tolerance.
+
+		:param precursor_mz: The precursor *m/z* of the query.
+		:param tolerance: The maximum difference between the precursor *m/z* values.
+		:param tolerance_unit: The unit of ``tolerance``. Either ``'ppm'`` or ``'Da'``.
+
+		:returns: The ``start`` and ``stop`` positions of the candidates.
+		"""
+
+		if self.precursor_mz is None:
+			raise ValueError("The library does not have precursor m/z values.")
+
+		if tolerance_unit == "ppm":
+			delta = precursor_mz * tolerance * 1e-6
+		elif tolerance_unit == "Da":
+			delta = tolerance
+		else:
+			raise ValueError(f"Unknown tolerance unit {tolerance_unit!r}. Must be 'ppm' or 'Da'.")
+
+		start = numpy.searchsorted(self.precursor_mz, precursor_mz - delta, side="left")
+		stop = numpy.searchsorted(self.precursor_mz, precursor_mz + delta, side="right")
+		return int(start), int(stop)
+
+	def search(
+			self,
+			query: Union[numpy.ndarray, Spectrum],
+			top_k: int = 10,
+			**kwargs,
+			) -> List[SearchHit]:
+		r"""
+		Search the library for the spectra most similar to ``query``.
+
+		:param query: Array containing the query spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		:param top_k: The maximum number of hits to return.
+		:param \*\*kwargs: Additional keyword arguments passed to :func:`~.search_library`.
+		"""
+
+		return search_library(query, self, top_k=top_k, **kwargs)
+
+
+class _Query(NamedTuple):
+	# A query spectrum's peaks, preprocessed with the library's settings.
+	mz: numpy.ndarray
+	intensity: numpy.ndarray
+	norm: float
+	window: Optional[Tuple[int, int]]  # The candidates in the precursor window, or None for an open search.
+	hybrid: bool
+
+
+def _prepare_query(
+		query: Union[numpy.ndarray, Spectrum],
+		library: SpectralLibrary,
+		mode: Union[str, SearchMode],
+		tolerance: float,
+		tolerance_unit: str,
+		precursor_mz: Optional[float],
+		) -> _Query:
+	spectrum = as_spectrum(query)
+	mode = SearchMode(mode)
+	window = None
+
+	if mode != SearchMode.OPEN:
+		if precursor_mz is None:
+			precursor_mz = spectrum.precursor_mz
+		if precursor_mz is None:
+			raise ValueError(f"A precursor m/z is required for a {mode!s} search.")
+
+		window = library.window(precursor_mz, tolerance, tolerance_unit)
+
+	return _Query(
+			*spectrum.filter(library.b, library.xlim),
+			norm=spectrum.norm(library.b, library.xlim),
+			window=window,
+			hybrid=mode == SearchMode.HYBRID,
+			)
+
+
+def _score_peaks(
+		query: _Query,
+		lib_mz: numpy.ndarray,
+		lib_intensity: numpy.ndarray,
+		owner: numpy.ndarray,
+		norms: numpy.ndarray,
+		) -> Tuple[numpy.ndarray, numpy.ndarray]:
+	"""
+	Score a query against the library spectra whose peaks are given.
+
+	Peaks are aligned on identical *m/z* values, as in :class:`~.SpectrumSimilarity`.
+
+	:param query:
+	:param lib_mz: The *m/z* values of the library spectra's peaks.
+	:param lib_intensity: The normalised intensities of the library spectra's peaks.
+	:param owner: The spectrum each peak belongs to, counting from zero.
+	:param norms: The L2 norm of each spectrum's intensities.
+
+	:returns: The forward and reverse similarity scores for each spectrum.
+	"""
+
+	n_spectra = len(norms)
+	forward = numpy.zeros(n_spectra)
+	reverse = numpy.zeros(n_spectra)
+
+	if not len(query.mz) or not len(lib_mz):
+		return forward, reverse
+
+	pos = numpy.minimum(numpy.searchsorted(query.mz, lib_mz), len(query.mz) - 1)
+	matched = query.mz[pos] == lib_mz
+
+	owner = owner[matched]
+	matched_query = query.intensity[pos[matched]]
+
+	dot = numpy.bincount(owner, weights=lib_intensity[matched] * matched_query, minlength=n_spectra)
+	reverse_norm = numpy.sqrt(numpy.bincount(owner, weights=matched_query**2, minlength=n_spectra))
+
+	numpy.divide(dot, query.norm * norms, out=forward, where=dot > 0)
+	numpy.divide(dot, reverse_norm * norms, out=reverse, where=dot > 0)
+
+	return forward, reverse
+
+
+def _score_range(
+		query: _Query,
+		arrays: Dict[str, numpy.ndarray],
+		start: int,
+		stop: int,
+		) -> Tuple[numpy.ndarray, numpy.ndarray]:
+	"""
+	Score a query against the library spectra stored at positions ``start`` to ``stop``.
+
+	:returns: The forward and reverse similarity scores for each spectrum in the range.
+	"""
+
+	lo, hi = arrays["offsets"][start], arrays["offsets"][stop]
+
+	return _score_peaks(
+			query,
+			arrays["mz"][lo:hi],
+			arrays["intensity"][lo:hi],
+			arrays["owner"][lo:hi] - start,
+			arrays["norms"][start:stop],
+			)
+
+
+def _score_positions(
+		query: _Query,
+		arrays: Dict[str, numpy.ndarray],
+		positions: numpy.ndarray,
+		) -> Tuple[numpy.ndarray, numpy.ndarray]:
+	"""
+	Score a query against the library spectra stored at the given positions.
+
+	:returns: The forward and reverse similarity scores for each spectrum in ``positions``.
+	"""
+
+	offsets = arrays["offsets"]
+	starts = offsets[positions]
+	lengths = offsets[positions + 1] - starts
+
+	# Indices of the peaks of each spectrum, end to end.
+	local_owner = numpy.repeat(numpy.arange(len(positions)), lengths)
+	peak_starts = numpy.cumsum(lengths) - lengths
+	peaks = numpy.arange(int(lengths.sum())) - numpy.repeat(peak_starts - starts, lengths)
+
+	return _score_peaks(
+			query,
+			arrays["mz"][peaks],
+			arrays["intensity"][peaks],
+			local_owner,
+			arrays["norms"][positions],
+			)
+
+
+def _top_hits(
+		forward: numpy.ndarray,
+		reverse: numpy.ndarray,
+		top_k: int,
+		offset: int = 0,
+		) -> List[_Triple]:
+	"""
+	Returns the ``top_k`` best ``(position, score, reverse_score)`` triples, highest score first.
+	"""
+
+	if top_k < len(forward):
+		candidates = numpy.argpartition(-forward, top_k)[:top_k]
+	else:
+		candidates = numpy.arange(len(forward))
+
+	# Sort by descending score, breaking ties by position
+	candidates = candidates[numpy.lexsort((candidates, -forward[candidates]))]
+
+	return [(int(idx) + offset, float(forward[idx]), float(reverse[idx])) for idx in candidates]
+
+
+def _search_range(
+		query: _Query,
+		arrays: Dict[str, numpy.ndarray],
+		start: int,
+		stop: int,
+		top_k: int,
+		) -> Tuple[List[_Triple], List[_Triple]]:
+	"""
+	Search the library spectra stored at positions ``start`` to ``stop``.
+
+	:returns: The best hits within the query's precursor window,
+		and for a hybrid search the best hits outside of it.
+	"""
+
+	if query.window is None:
+		ranges = [(start, stop)]
+	else:
+		ranges = [(max(start, query.window[0]), min(stop, query.window[1]))]
+
+	outside_ranges = []
+	if query.hybrid and query.window is not None:
+		outside_ranges = [(start, min(stop, query.window[0])), (max(start, query.window[1]), stop)]
+
+	inside: List[_Triple] = []
+	outside: List[_Triple] = []
+
+	for hits, hit_ranges in ((inside, ranges), (outside, outside_ranges)):
+		for lo, hi in hit_ranges:
+			if lo < hi:
+				hits.extend(_top_hits(*_score_range(query, arrays, lo, hi), top_k, offset=lo))
+
+	return inside, outside
+
+
+def _merge_hits(
+		library: SpectralLibrary,
+		query: _Query,
+		inside: List[_Triple],
+		outside: List[_Triple],
+		top_k: int,
+		) -> List[SearchHit]:
+	"""
+	Combine the hits from one or more library partitions.
+	"""
+
+	inside.sort(key=lambda hit: (-hit[1], hit[0]))
+	hits = inside[:top_k]
+
+	if query.hybrid:
+		hits = [hit for hit in hits if hit[1] > 0]
+		outside.sort(key=lambda hit: (-hit[1], hit[0]))
+		hits.extend(outside[:top_k - len(hits)])
+
+	names = library.names
+	output = []
+
+	for position, score, reverse_score in hits:
+		idx = int(library.order[position])
+		output.append(SearchHit(idx, None if names is None else names[idx], score, reverse_score))
+
+	return output
+
+
+def search_library(
+		query: Union[numpy.ndarray, Spectrum],
+		library: SpectralLibrary,
+		top_k: int = 10,
+		mode: Union[str, SearchMode] = SearchMode.OPEN,
+		tolerance: float = 10,
+		tolerance_unit: str = "ppm",
+		precursor_mz: Optional[float] = None,
+		) -> List[SearchHit]:
+	"""
+	Search ``library`` for the spectra most similar to ``query``.
+
+	The scores are the same as those returned by :meth:`SpectrumSimilarity.score <.SpectrumSimilarity.score>`.
+
+	:param query: Array containing the query spectrum's peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+	:param library:
+	:param top_k: The maximum number of hits to return.
+	:param mode: Which library spectra to compare the query against.
+	:param tolerance: The maximum difference between the precursor *m/z* values of the query and a candidate.
+	:param tolerance_unit: The unit of ``tolerance``. Either ``'ppm'`` or ``'Da'``.
+	:param precursor_mz: The precursor *m/z* of the query.
+		If not given, the :attr:`Spectrum.precursor_mz <.spectrum.Spectrum.precursor_mz>` value is used.
+
+	:returns: The best matches, highest scoring first.
+		For a hybrid search the matches within the precursor tolerance come first.
+
+	.. versionchanged:: 1.2.0  Added the ``mode``, ``tolerance``, ``tolerance_unit`` and ``precursor_mz`` arguments.
+	"""
+
+	prepared = _prepare_query(query, library, mode, tolerance, tolerance_unit, precursor_mz)
+	arrays = {name: getattr(library, name) for name in _array_names}
+	inside, outside = _search_range(prepared, arrays, 0, len(library), top_k)
+	return _merge_hits(library, prepared, inside, outside, top_k)
+
+
+def _chunks(n_items: int, n_chunks: int) -> Iterator[Tuple[int, int]]:
+	bounds = numpy.linspace(0, n_items, n_chunks + 1).astype(int)
+	yield from zip(bounds[:-1].tolist(), bounds[1:].tolist())
+
+
+class _ArraySpec(NamedTuple):
+	# Describes an array placed in shared memory, so worker processes can attach to it.
+	shm_name: str
+	shape: Tuple[int, ...]
+	dtype: str
+
+
+class SharedLibrary:
+	"""
+	Places the arrays of a :class:`~.SpectralLibrary` in shared memory,
+	so that worker processes can search it without the library being copied to each of them.
+
+	Use as a context manager to ensure the shared memory is released afterwards:
+
+	.. code-block:: python
+
+		with SharedLibrary(library) as shared:
+			results = shared.search(queries, top_k=5, processes=4)
+
+	:param library:
+	"""  # noqa: D400
+
+	def __init__(self, library: SpectralLibrary):
+		self.library = library
+		self._blocks: List[shared_memory.SharedMemory] = []
+		self.specs: Dict[str, _ArraySpec] = {}
+
+		try:
+			for name in _array_names:
+				array = getattr(library, name)
+				block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+				self._blocks.append(block)
+				numpy.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+				self.specs[name] = _ArraySpec(block.name, array.shape, array.dtype.str)
+		except BaseException:
+			self.close()
+			raise
+
+	def close(self) -> None:
+		"""
+		Release the shared memory.
+		"""
+
+		while self._blocks:
+			block = self._blocks.pop()
+			block.close()
+			block.unlink()
+
+	def __enter__(self) -> "SharedLibrary":
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> None:  # noqa: MAN001
+		self.close()
+
+	def search(
+			self,
+			queries: Sequence[Union[numpy.ndarray, Spectrum]],
+			top_k: int = 10,
+			processes: Optional[int] = None,
+			partitions: Optional[int] = None,
+			mode: Union[str, SearchMode] = SearchMode.OPEN,
+			tolerance: float = 10,
+			tolerance_unit: str = "ppm",
+			precursor_mz: Optional[Sequence[Optional[float]]] = None,
+			) -> List[List[SearchHit]]:
+		"""
+		Search the library for the spectra most similar to each of ``queries``, using a pool of processes.
+
+		:param queries: Arrays containing each query spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or :class:`~.Spectrum` objects.
+		:param top_k: The maximum number of hits to return for each query.
+		:param processes: The number of worker processes. Defaults to the number of CPUs.
+		:param partitions: The number of pieces to split the library into.
+			Defaults to the number of worker processes.
+		:param mode: Which library spectra to compare the queries against.
+		:param tolerance: The maximum difference between the precursor *m/z* values of a query and a candidate.
+		:param tolerance_unit: The unit of ``tolerance``. Either ``'ppm'`` or ``'Da'``.
+		:param precursor_mz: The precursor *m/z* of each query.
+			If not given, the :attr:`Spectrum.precursor_mz <.spectrum.Spectrum.precursor_mz>` values are used.
+
+		:returns: A list of hits for each query, highest scoring first.
+		"""
+
+		library = self.library
+
+		if processes is None:
+			processes = os.cpu_count() or 1
+
+		if partitions is None:
+			partitions = processes
+
+		if precursor_mz is None:
+			precursor_mz = [None] * len(queries)
+		elif len(precursor_mz) != len(queries):
+			raise ValueError("'precursor_mz' must be the same length as 'queries'")
+
+		prepared = [
+				_prepare_query(query, library, mode, tolerance, tolerance_unit, precursor)
+				for query, precursor in zip(queries, precursor_mz)
+				]
+
+		with ProcessPoolExecutor(
+				max_workers=processes,
+				initializer=_attach_worker,
+				initargs=(self.specs, ),
+				) as executor:
+
+			n_chunks = max(1, min(partitions, len(library)))
+			futures = [
+					executor.submit(_search_partition, prepared, start, stop, top_k)
+					for start, stop in _chunks(len(library), n_chunks)
+					]
+
+			inside: List[List[_Triple]] = [[] for _ in prepared]
+			outside: List[List[_Triple]] = [[] for _ in prepared]
+
+			for future in futures:
+				for idx, (partial_inside, partial_outside) in enumerate(future.result()):
+					inside[idx].extend(partial_inside)
+					outside[idx].extend(partial_outside)
+
+		return [
+				_merge_hits(library, query, query_inside, query_outside, top_k)
+				for query, query_inside, query_outside in zip(prepared, inside, outside)
+				]
+
+
+# State of each worker process, set by _attach_worker.
+_worker_blocks: List[shared_memory.SharedMemory] = []
+_worker_arrays: Dict[str, numpy.ndarray] = {}
+
+
+def _attach_worker(specs: Dict[str, _ArraySpec]) -> None:
+	for name, spec in specs.items():
+		block = shared_memory.SharedMemory(name=spec.shm_name)
+		_worker_blocks.append(block)
+		_worker_arrays[name] = numpy.ndarray(spec.shape, dtype=numpy.dtype(spec.dtype), buffer=block.buf)
+
+
+def _search_partition(
+		queries: Sequence[_Query],
+		start: int,
+		stop: int,
+		top_k: int,
+		) -> List[Tuple[List[_Triple], List[_Triple]]]:
+	return [_search_range(query, _worker_arrays, start, stop, top_k) for query in queries]
+
+
+def parallel_search(
+		queries: Sequence[Union[numpy.ndarray, Spectrum]],
+		library: SpectralLibrary,
+		top_k: int = 10,
+		processes: Optional[int] = None,
+		partitions: Optional[int] = None,
+		**kwargs,
+		) -> List[List[SearchHit]]:
+	r"""
+	Search ``library`` for the spectra most similar to each of ``queries``, using a pool of processes.
+
+	The library is placed in shared memory once and split into partitions, which are searched in parallel.
+	The best hits from each partition are then merged.
+
+	:param queries: Arrays containing each query spectrum's peak list with the *m/z* values in the
+		first column and corresponding intensities in the second, or :class:`~.Spectrum` objects.
+	:param library:
+	:param top_k: The maximum number of hits to return for each query.
+	:param processes: The number of worker processes. Defaults to the number of CPUs.
+	:param partitions: The number of pieces to split the library into.
+		Defaults to the number of worker processes.
+	:param \*\*kwargs: Additional keyword arguments passed to :meth:`SharedLibrary.search <.SharedLibrary.search>`,
+		such as the search ``mode``.
+
+	:returns: A list of hits for each query, highest scoring first.
+	"""
+
+	with SharedLibrary(library) as shared:
+		return shared.search(queries, top_k=top_k, processes=processes, partitions=partitions, **kwargs)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+#
+#  spectrum.py
+"""
+Lightweight representation of a mass spectrum, with its preprocessing cached.
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+# 3rd party
+import numpy
+
+__all__ = ["Spectrum", "as_spectrum"]
+
+
+class Spectrum:
+	"""
+	A mass spectrum's peak list, with the *m/z* values sorted in ascending order.
+
+	The intensities normalised to the most intense peak are calculated once, and the peaks
+	selected for a given baseline threshold and *m/z* range (and their L2 norm) are cached,
+	so the same spectrum can be compared many times without repeating the preprocessing.
+
+	:param mz: List of *m/z* values.
+	:param intensities: List of intensities.
+	:param precursor_mz: The *m/z* of the precursor ion, for tandem mass spectra.
+	"""
+
+	__slots__ = ("mz", "intensity", "normalized", "precursor_mz", "_cache")
+
+	#: The *m/z* values, in ascending order.
+	mz: numpy.ndarray
+
+	#: The intensities corresponding to :attr:`mz`.
+	intensity: numpy.ndarray
+
+	#: The intensities as a percentage of the most intense peak.
+	normalized: numpy.ndarray
+
+	#: The *m/z* of the precursor ion, for tandem mass spectra.
+	precursor_mz: Optional[float]
+
+	_cache: Dict[Any, Any]
+
+	def __init__(
+			self,
+			mz: Sequence[float],
+			intensities: Sequence[float],
+			precursor_mz: Optional[float] = None,
+			):
+		mz = numpy.asarray(mz, dtype=numpy.float64).ravel()
+		intensity = numpy.asarray(intensities, dtype=numpy.float64).ravel()
+
+		if mz.shape != intensity.shape:
+			raise ValueError("'mz' and 'intensities' must be the same length")
+
+		order = numpy.argsort(mz, kind="stable")
+		self.mz = mz[order]
+		self.intensity = intensity[order]
+
+		if len(intensity):
+			self.normalized = self.intensity / self.intensity.max() * 100.0
+		else:
+			self.normalized = self.intensity.copy()
+
+		for array in (self.mz, self.intensity, self.normalized):
+			array.flags.writeable = False
+
+		self.precursor_mz = None if precursor_mz is None else float(precursor_mz)
+		self._cache = {}
+
+	@classmethod
+	def from_array(cls, spectrum: numpy.ndarray, precursor_mz: Optional[float] = None) -> "Spectrum":
+		"""
+		Construct a :class:`~.Spectrum` from an array in the format returned by :func:`~.create_array`.
+
+		:param spectrum: Array containing the spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second.
+		:param precursor_mz: The *m/z* of the precursor ion, for tandem mass spectra.
+		"""
+
+		spectrum = numpy.asarray(spectrum, dtype=numpy.float64).reshape(-1, 2)
+		return cls(spectrum[:, 0], spectrum[:, 1], precursor_mz)
+
+	def __len__(self) -> int:
+		return len(self.mz)
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__}({len(self)} peaks)>"
+
+	def __getstate__(self) -> Tuple[numpy.ndarray, numpy.ndarray, Optional[float]]:
+		return self.mz, self.intensity, self.precursor_mz
+
+	def __setstate__(self, state: Tuple[numpy.ndarray, numpy.ndarray, Optional[float]]) -> None:
+		self.__init__(*state)  # type: ignore[misc]
+
+	def to_array(self) -> numpy.ndarray:
+		"""
+		Returns the peak list in the format returned by :func:`~.create_array`.
+		"""
+
+		return numpy.column_stack((self.mz, self.intensity))
+
+	def clip(self, xlim: Tuple[float, float] = (50, 1200)) -> Tuple[numpy.ndarray, numpy.ndarray]:
+		"""
+		Returns the *m/z* values and normalised intensities of the peaks within ``xlim``.
+
+		:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+		"""
+
+		key = ("clip", tuple(xlim))
+
+		if key not in self._cache:
+			start = numpy.searchsorted(self.mz, xlim[0], side="left")
+			stop = numpy.searchsorted(self.mz, xlim[1], side="right")
+			self._cache[key] = (self.mz[start:stop], self.normalized[start:stop])
+
+		return self._cache[key]
+
+	def filter(  # noqa: A003  # pylint: disable=redefined-builtin
+			self,
+			b: float = 1,
+			xlim: Tuple[float, float] = (50, 1200),
+			) -> Tuple[numpy.ndarray, numpy.ndarray]:
+		"""
+		Returns the *m/z* values and normalised intensities of the peaks
+		within ``xlim`` with an intensity of at least ``b``.
+
+		:param b: numeric value specifying the baseline threshold for peak identification.
+			Expressed as a percent of the maximum intensity.
+		:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+		"""  # noqa: D400
+
+		key = ("filter", b, tuple(xlim))
+
+		if key not in self._cache:
+			mz, normalized = self.clip(xlim)
+			mask = normalized >= b
+			self._cache[key] = (mz[mask], normalized[mask])
+
+		return self._cache[key]
+
+	def norm(self, b: float = 1, xlim: Tuple[float, float] = (50, 1200)) -> float:
+		"""
+		Returns the L2 norm of the normalised intensities returned by :meth:`~.Spectrum.filter`.
+
+		:param b: numeric value specifying the baseline threshold for peak identification.
+			Expressed as a percent of the maximum intensity.
+		:param xlim: tuple of length 2, defining the beginning and ending values of the x-axis.
+		"""
+
+		key = ("norm", b, tuple(xlim))
+
+		if key not in self._cache:
+			self._cache[key] = float(numpy.sqrt(numpy.sum(numpy.square(self.filter(b, xlim)[1]))))
+
+		return self._cache[key]
+
+
+def as_spectrum(spectrum: Union[Spectrum, numpy.ndarray]) -> Spectrum:
+	"""
+	Returns ``spectrum`` as a :class:`~.Spectrum`.
+
+	Arrays in the format returned by :func:`~.create_array` are converted.
+
+	:param spectrum:
+	"""
+
+	if isinstance(spectrum, Spectrum):
+		return spectrum
+
+	return Spectrum.from_array(spectrum)
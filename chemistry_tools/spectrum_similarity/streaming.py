@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+#
+#  streaming.py
+"""
+Match spectra against a library as they arrive, using :mod:`asyncio`.
+
+:class:`~.MatchingService` accepts spectra into a bounded queue and searches them against a
+:class:`~.SpectralLibrary` in an executor, so the event loop stays responsive while the scores are calculated.
+When the queue is full :meth:`~.MatchingService.submit` waits, which slows the producer (for example,
+the process reading scans from the instrument) to the rate the service can sustain
+rather than allowing a backlog to build up in memory.
+
+.. code-block:: python
+
+	async def acquire(scans, library):
+		async with MatchingService(library, top_k=5) as service:
+
+			async def produce():
+				async for scan_id, spectrum in scans:
+					await service.submit(spectrum, scan_id)
+				await service.close()
+
+			asyncio.ensure_future(produce())
+
+			async for result in service.results():
+				print(result.query_id, result.hits[0])
+
+.. versionadded:: 1.2.0
+"""
+#
+#  Copyright (c) 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+
+# stdlib
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Deque, List, NamedTuple, Optional, Union
+
+# 3rd party
+import numpy
+
+# this package
+from chemistry_tools.spectrum_similarity.search import SearchHit, SpectralLibrary, search_library
+from chemistry_tools.spectrum_similarity.spectrum import Spectrum
+
+__all__ = ["MatchResult", "MatchingService"]
+
+# Placed on the queue to tell a worker to stop.
+_sentinel = object()
+
+
+class MatchResult(NamedTuple):
+	"""
+	The result of matching one spectrum against the library.
+	"""
+
+	#: The identifier the spectrum was submitted with.
+	query_id: Any
+
+	#: The best matches in the library, highest scoring first.
+	hits: List[SearchHit]
+
+	#: The time in seconds from the spectrum being submitted to the search completing.
+	latency: float
+
+	#: The exception raised while searching, if the search failed.
+	error: Optional[BaseException] = None
+
+
+class MatchingService:
+	r"""
+	Asynchronous service for matching a stream of spectra against a library.
+
+	:param library:
+	:param top_k: The maximum number of hits to return for each spectrum.
+	:param concurrency: The maximum number of spectra to search at once.
+		Defaults to the number of CPUs.
+	:param max_pending: The maximum number of spectra waiting to be searched,
+		and the maximum number of results waiting to be collected.
+	:param executor: The executor to run the searches in. If not given, a thread pool with
+		``concurrency`` threads is created (and shut down when the service is stopped).
+	:param \*\*kwargs: Additional keyword arguments passed to :func:`~.search_library`, such as the search ``mode``.
+
+	The service must be started with :meth:`~.MatchingService.start`, or by using it as an async context manager.
+	"""
+
+	#: The latencies of the most recent searches, in seconds.
+	latencies: Deque[float]
+
+	def __init__(
+			self,
+			library: SpectralLibrary,
+			top_k: int = 10,
+			concurrency: Optional[int] = None,
+			max_pending: int = 100,
+			executor: Optional[Executor] = None,
+			**kwargs,
+			):
+		self.library = library
+		self.top_k = top_k
+		self.concurrency = concurrency or os.cpu_count() or 1
+		self.max_pending = max_pending
+		self.search_kwargs = kwargs
+		self.latencies = deque(maxlen=10_000)
+
+		self._executor = executor
+		self._owns_executor = executor is None
+		self._workers: List["asyncio.Task[None]"] = []
+		self._queue: Optional[asyncio.Queue] = None
+		self._results: Optional[asyncio.Queue] = None
+		self._closed = False
+
+	async def __aenter__(self) -> "MatchingService":
+		await self.start()
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:  # noqa: MAN001
+		await self.stop()
+
+	async def start(self) -> None:
+		"""
+		Start the workers.
+		"""
+
+		if self._workers:
+			raise RuntimeError("The service has already been started.")
+
+		if self._executor is None:
+			self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+		self._queue = asyncio.Queue(maxsize=self.max_pending)
+		self._results = asyncio.Queue(maxsize=self.max_pending)
+		self._closed = False
+		self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+
+	async def submit(self, spectrum: Union[numpy.ndarray, Spectrum], query_id: Any = None) -> None:
+		"""
+		Add a spectrum to the queue, waiting for space if the queue is full.
+
+		:param spectrum: Array containing the spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		:param query_id: An identifier for the spectrum, returned with its :class:`~.MatchResult`.
+		"""
+
+		if self._queue is None:
+			raise RuntimeError("The service has not been started.")
+		if self._closed:
+			raise RuntimeError("The service has been closed.")
+
+		await self._queue.put((query_id, spectrum, time.perf_counter()))
+
+	async def close(self) -> None:
+		"""
+		Stop accepting spectra.
+
+		The spectra already submitted are searched, after which :meth:`~.MatchingService.results` finishes.
+		"""
+
+		if self._queue is None or self._closed:
+			return
+
+		self._closed = True
+
+		for _ in self._workers:
+			await self._queue.put(_sentinel)
+
+	async def results(self) -> AsyncIterator[MatchResult]:
+		"""
+		Iterate over the results as they are completed.
+
+		Iteration finishes once the service has been closed and all submitted spectra have been searched.
+		"""
+
+		if self._results is None:
+			raise RuntimeError("The service has not been started.")
+
+		remaining = len(self._workers)
+
+		while remaining:
+			result = await self._results.get()
+
+			if result is _sentinel:
+				remaining -= 1
+			else:
+				yield result
+
+	async def match(self, spectrum: Union[numpy.ndarray, Spectrum]) -> List[SearchHit]:
+		"""
+		Search a single spectrum against the library, bypassing the queue.
+
+		:param spectrum: Array containing the spectrum's peak list with the *m/z* values in the
+			first column and corresponding intensities in the second, or a :class:`~.Spectrum`.
+		"""
+
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(self._executor, self._search, spectrum)
+
+	async def stop(self) -> None:
+		"""
+		Stop the service immediately.
+
+		Spectra which have not been searched and results which have not been collected are discarded.
+		To finish searching the submitted spectra first, call :meth:`~.MatchingService.close`
+		and exhaust :meth:`~.MatchingService.results`.
+		"""
+
+		self._closed = True
+
+		for worker in self._workers:
+			worker.cancel()
+
+		await asyncio.gather(*self._workers, return_exceptions=True)
+		self._workers = []
+
+		if self._owns_executor and self._executor is not None:
+			self._executor.shutdown(wait=True)
+			self._executor = None
+
+	def latency_percentile(self, percentile: float = 99) -> float:
+		"""
+		Returns the given percentile of the recent search latencies, in seconds.
+
+		:param percentile:
+		"""
+
+		if not self.latencies:
+			return float("nan")
+
+		return float(numpy.percentile(self.latencies, percentile))
+
+	def _search(self, spectrum: Union[numpy.ndarray, Spectrum]) -> List[SearchHit]:
+		return search_library(spectrum, self.library, top_k=self.top_k, **self.search_kwargs)
+
+	async def _worker(self) -> None:
+		assert self._queue is not None
+		assert self._results is not None
+
+		loop = asyncio.get_running_loop()
+
+		while True:
+			item = await self._queue.get()
+
+			if item is _sentinel:
+				await self._results.put(_sentinel)
+				return
+
+			query_id, spectrum, submitted = item
+
+			try:
+				hits = await loop.run_in_executor(self._executor, partial(self._search, spectrum))
+			except Exception as e:
+				result = MatchResult(query_id, [], time.perf_counter() - submitted, e)
+			else:
+				result = MatchResult(query_id, hits, time.perf_counter() - submitted)
+				self.latencies.append(result.latency)
+
+			await self._results.put(result)
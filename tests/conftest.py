@@ -5,6 +5,7 @@ from typing import Iterator
 import pytest
 import requests
 from _pytest.fixtures import FixtureRequest
+from _pytest.monkeypatch import MonkeyPatch
 from betamax import Betamax  # type: ignore[import-untyped]
 from domdf_python_tools.paths import PathPlus
 
@@ -29,3 +30,18 @@ def pubchem_cassette(request: FixtureRequest) -> Iterator[requests.Session]:
 		vcr.use_cassette(request.node.name, record="none")
 
 		yield cached_requests
+
+
+@pytest.fixture()
+def tmp_cache_dir(tmp_pathplus: PathPlus, monkeypatch: MonkeyPatch) -> PathPlus:
+	"""
+	Moves :data:`chemistry_tools.cache.cache_dir` to a temporary directory,
+	so :func:`chemistry_tools.cache.clear_cache` does not delete the user's cache.
+	"""  # noqa: D400
+
+	cache_dir = tmp_pathplus / "cache"
+	cache_dir.maybe_make()
+	monkeypatch.setattr("chemistry_tools.cache.cache_dir", cache_dir)
+	monkeypatch.setattr("chemistry_tools.cache.cache.cache_dir", cache_dir)
+
+	return cache_dir
@@ -0,0 +1,216 @@
+# stdlib
+import datetime
+import multiprocessing
+import time
+from unittest import mock
+
+# 3rd party
+import requests
+from _pytest.monkeypatch import MonkeyPatch
+from cachecontrol import CacheControlAdapter
+from cachecontrol.caches.file_cache import FileCache
+from cachecontrol.heuristics import ExpiresAfter
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from chemistry_tools import cache
+from chemistry_tools.cache import (
+		BodyKeyedCacheController,
+		cache_stats,
+		clear_cache,
+		register_clear_callback,
+		set_cache_backend
+		)
+from chemistry_tools.cache_backends import CacheStats, SQLiteCache
+from tests.test_pubchem.conftest import StubPubChem
+
+
+def test_get_set(tmp_pathplus: PathPlus):
+	backend = SQLiteCache(tmp_pathplus / "cache.sqlite")
+	assert backend.get("https://example.com/a") is None
+
+	backend.set("https://example.com/a", b"response a")
+	backend.set("https://example.com/b", b"response b", expires=datetime.datetime.now() - datetime.timedelta(1))
+	assert backend.get("https://example.com/a") == b"response a"
+	assert backend.get("https://example.com/b") is None
+
+	backend.delete("https://example.com/a")
+	assert backend.get("https://example.com/a") is None
+
+	assert backend.stats() == CacheStats(entries=1, size=10, hits=1, misses=3, evictions=0)
+	backend.close()
+
+	# The responses are saved to disk.
+	backend = SQLiteCache(tmp_pathplus / "cache.sqlite")
+	assert backend.stats().entries == 1
+
+	backend.compact()
+	assert backend.stats().entries == 0
+
+
+def test_eviction():
+	backend = SQLiteCache(":memory:", max_size=30)
+
+	for key in "abc":
+		backend.set(key, b"0123456789")
+		time.sleep(0.01)
+
+	# Reading 'a' makes 'b' the least recently used response.
+	assert backend.get('a') == b"0123456789"
+	backend.set('d', b"0123456789")
+
+	assert backend.get('b') is None
+	assert all(backend.get(key) for key in "acd")
+	assert backend.stats() == CacheStats(entries=3, size=30, max_size=30, hits=4, misses=1, evictions=1)
+
+	backend.set('e', b'0' * 25)
+	assert backend.stats()[:2] == (1, 25)
+
+
+def test_ttls():
+	backend = SQLiteCache(
+			":memory:",
+			ttls={"/listkey/": datetime.timedelta(0), "/record/": datetime.timedelta(days=90)},
+			default_ttl=datetime.timedelta(seconds=-1),
+			)
+
+	backend.set("https://pubchem/rest/pug/compound/listkey/123/cids/JSON", b"cids")
+	backend.set("https://pubchem/rest/pug/compound/cid/1/record/JSON", b"record", expires=60)
+	backend.set("https://pubchem/rest/pug/compound/cid/1/synonyms/JSON", b"synonyms")
+
+	assert backend.get("https://pubchem/rest/pug/compound/listkey/123/cids/JSON") is None
+	assert backend.get("https://pubchem/rest/pug/compound/cid/1/record/JSON") == b"record"
+	assert backend.get("https://pubchem/rest/pug/compound/cid/1/synonyms/JSON") is None
+
+
+def _fill(filename: str, start: int) -> None:
+	backend = SQLiteCache(filename, max_size=2000)
+
+	for idx in range(start, start + 100):
+		backend.set(str(idx), b'x' * 20)
+		backend.get(str(idx - 1))
+
+
+def test_multiple_processes(tmp_pathplus: PathPlus):
+	filename = str(tmp_pathplus / "cache.sqlite")
+	SQLiteCache(filename).close()
+
+	processes = [multiprocessing.Process(target=_fill, args=(filename, start)) for start in range(0, 400, 100)]
+
+	for process in processes:
+		process.start()
+	for process in processes:
+		process.join()
+
+	assert [process.exitcode for process in processes] == [0, 0, 0, 0]
+	assert SQLiteCache(filename).stats()[:2] == (100, 2000)
+
+
+def test_set_cache_backend(tmp_pathplus: PathPlus, monkeypatch: MonkeyPatch):
+	original = cache._adapter.cache
+	backend = SQLiteCache(":memory:")
+	monkeypatch.setattr(cache, "_clear_callbacks", [])
+
+	try:
+		set_cache_backend(backend)
+		assert cache.cached_requests.get_adapter("https://").controller.cache is backend
+
+		backend.set("https://example.com", b"response")
+		assert cache_stats().entries == 1
+
+		clear_cache()
+		assert cache_stats().entries == 0
+		assert cache.cache_dir.is_dir()
+	finally:
+		set_cache_backend(original)
+
+
+def test_register_clear_callback(tmp_cache_dir: PathPlus, monkeypatch: MonkeyPatch):
+	monkeypatch.setattr(cache, "_clear_callbacks", [])
+	calls = []
+
+	@register_clear_callback
+	def callback() -> None:
+		# The cache directory is removed afterwards.
+		assert tmp_cache_dir.is_dir()
+		calls.append(1)
+
+	# Registering a callback again has no effect.
+	assert register_clear_callback(callback) is callback
+
+	clear_cache()
+	assert calls == [1]
+
+
+def test_file_cache_stats(tmp_pathplus: PathPlus):
+	original = cache._adapter.cache
+	backend = FileCache(str(tmp_pathplus))
+
+	try:
+		set_cache_backend(backend)
+		assert cache_stats() == CacheStats(entries=0, size=0)
+
+		backend.set("https://example.com/a", b"response a")
+		backend.set("https://example.com/b", b"response bb")
+		(tmp_pathplus / "records.sqlite").write_text("not a response")
+		assert cache_stats() == CacheStats(entries=2, size=21)
+	finally:
+		set_cache_backend(original)
+
+
+def test_http_cache(tmp_pathplus: PathPlus):
+	stub = StubPubChem()
+	stub.thread.start()
+
+	backend = SQLiteCache(tmp_pathplus / "cache.sqlite", ttls={"/synonyms/": datetime.timedelta(0)})
+	session = requests.Session()
+	session.mount("http://", CacheControlAdapter(cache=backend, heuristic=ExpiresAfter(days=1)))
+
+	try:
+		for _ in range(2):
+			assert session.get(f"{stub.url}/compound/cid/1/property/XLogP/JSON").json()["PropertyTable"]
+			assert session.get(f"{stub.url}/compound/cid/1/synonyms/JSON").json()["InformationList"]
+	finally:
+		stub.server.shutdown()
+		stub.server.server_close()
+
+	assert stub.paths() == [
+			"/rest/pug/compound/cid/1/property/XLogP/JSON",
+			"/rest/pug/compound/cid/1/synonyms/JSON",
+			"/rest/pug/compound/cid/1/synonyms/JSON",
+			]
+
+
+def test_http_cache_long_ttl(tmp_pathplus: PathPlus):
+	stub = StubPubChem()
+	stub.thread.start()
+
+	# The TTL is longer than the time given by the heuristic.
+	backend = SQLiteCache(tmp_pathplus / "cache.sqlite", ttls={"/synonyms/": datetime.timedelta(days=90)})
+	session = requests.Session()
+	session.mount(
+			"http://",
+			CacheControlAdapter(
+					cache=backend,
+					heuristic=ExpiresAfter(days=1),
+					controller_class=BodyKeyedCacheController,
+					),
+			)
+
+	try:
+		for days in (0, 30):
+			later = time.time() + days * 86400
+
+			with mock.patch("time.time", return_value=later):
+				assert session.get(f"{stub.url}/compound/cid/1/property/XLogP/JSON").json()["PropertyTable"]
+				assert session.get(f"{stub.url}/compound/cid/1/synonyms/JSON").json()["InformationList"]
+	finally:
+		stub.server.shutdown()
+		stub.server.server_close()
+
+	# Only the response with the long TTL is still fresh 30 days later.
+	assert stub.paths() == [
+			"/rest/pug/compound/cid/1/property/XLogP/JSON",
+			"/rest/pug/compound/cid/1/synonyms/JSON",
+			"/rest/pug/compound/cid/1/property/XLogP/JSON",
+			]
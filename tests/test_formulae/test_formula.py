@@ -102,7 +102,9 @@
 #
 
 # stdlib
+import copy
 import decimal
+import pickle
 import re
 from typing import Any, Dict
 
@@ -476,3 +478,19 @@ def test_invalid_formulae_unknown_element(formula: str):
 		)
 def test_parsing(formula: str, data: Dict[str, int]):
 	assert Formula.from_string(formula) == data
+
+
+@pytest.mark.parametrize(
+		"formula",
+		[
+				Formula.from_string("C6H12O6", charge=-1),
+				Species.from_string("H2O", phase='l'),
+				],
+		)
+def test_copying(formula: Formula):
+	for copied in (copy.deepcopy(formula), pickle.loads(pickle.dumps(formula))):  # nosec: B301
+		assert copied == formula
+		assert copied is not formula
+		assert type(copied) is type(formula)
+		assert copied.charge == formula.charge
+		assert vars(copied) == vars(formula)
@@ -0,0 +1,222 @@
+# stdlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# 3rd party
+import pytest
+import requests
+from _pytest.monkeypatch import MonkeyPatch
+from apeye.requests_url import RequestsURL
+
+# this package
+from chemistry_tools.pubchem.memory_cache import MemoryCache
+from chemistry_tools.pubchem.properties import valid_properties
+from chemistry_tools.pubchem.records import RecordStore
+
+#: Names known to the stub server, and their CIDs.
+NAMES = {"water": 962, "benzene": 241, "ethanol": 702, "coumarin": 323}
+
+
+def _property_value(prop: str, cid: int) -> Any:
+	if prop == "MolecularFormula":
+		return "CH4"
+
+	dtype = valid_properties[prop]
+
+	if dtype is float:
+		return cid + 0.5
+	elif dtype is int:
+		return cid
+	else:
+		return f"{prop}-{cid}"
+
+
+def _records(cids: List[int], operation: List[str]) -> Dict[str, Any]:
+	if operation[0] == "property":
+		props = operation[1].split(',')
+		rows = [{"CID": cid, **{prop: _property_value(prop, cid) for prop in props}} for cid in cids]
+		return {"PropertyTable": {"Properties": rows}}
+
+	elif operation[0] == "synonyms":
+		info = [{"CID": cid, "Synonym": [f"compound {cid}", f"CID{cid}"]} for cid in cids]
+		return {"InformationList": {"Information": info}}
+
+	elif operation[0] == "description":
+		info = []
+		for cid in cids:
+			info.append({"CID": cid, "Title": f"Compound {cid}"})
+			info.append({"CID": cid, "Description": f"Compound {cid} is a compound."})
+		return {"InformationList": {"Information": info}}
+
+	else:
+		compounds = [{
+				"id": {"id": {"cid": cid}},
+				"atoms": {"aid": [1], "element": [6]},
+				"count": {"heavy_atom": 1},
+				"props": [],
+				"coords": [],
+				} for cid in cids]
+		return {"PC_Compounds": compounds}
+
+
+class StubPubChem:
+	"""
+	A local HTTP server which answers a subset of the PUG REST API with synthetic data.
+	"""
+
+	def __init__(self):
+		#: The method, path and body of each request received.
+		self.requests: List[Tuple[str, str, str]] = []
+
+		#: The time in seconds to wait before responding to each request.
+		self.delay = 0.0
+
+		#: The times each request was received, from :func:`time.monotonic`.
+		self.times: List[float] = []
+
+		#: The number of requests to answer with ``503 Service Unavailable``.
+		self.busy = 0
+
+		#: Headers added to each response.
+		self.headers: Dict[str, str] = {}
+
+		#: The addresses of the clients which connected, one for each connection.
+		self.connections: Set[Tuple[str, int]] = set()
+
+		self._lock = threading.Lock()
+		self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+		self.server.daemon_threads = True
+		self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+	@property
+	def url(self) -> str:
+		host, port = self.server.server_address[:2]
+		return f"http://{host}:{port}/rest/pug"
+
+	def paths(self) -> List[str]:
+		return [path for _, path, _ in self.requests]
+
+	def respond(self, method: str, path: str, body: str) -> Tuple[int, Dict[str, Any]]:
+		with self._lock:
+			self.requests.append((method, path, body))
+			self.times.append(time.monotonic())
+
+			busy = self.busy > 0
+			self.busy = max(0, self.busy - 1)
+
+		if busy:
+			return 503, {"Fault": {"Code": "PUGREST.ServerBusy", "Details": ["Too many requests"]}}
+
+		if self.delay:
+			time.sleep(self.delay)
+
+		parts = unquote(urlsplit(path).path).split('/')[3:]
+
+		if method == "POST":
+			namespace, operation = parts[1], parts[2:]
+			identifiers = parse_qs(body)[namespace][0]
+		else:
+			namespace, identifiers, operation = parts[1], parts[2], parts[3:]
+
+		if namespace == "cid":
+			if not all(cid.strip().isdigit() for cid in identifiers.split(',')):
+				return 400, {"Fault": {"Code": "PUGREST.BadRequest", "Details": ["Invalid CID"]}}
+			cids = [int(cid) for cid in identifiers.split(',')]
+		elif identifiers.lower() in NAMES:
+			cids = [NAMES[identifiers.lower()]]
+		elif namespace in {"smiles", "inchi"}:
+			cids = [sum(map(ord, identifiers))]
+		else:
+			return 404, {"Fault": {"Code": "PUGREST.NotFound", "Details": ["No CID found"]}}
+
+		return 200, _records(cids, operation)
+
+	def _handler(self):  # noqa: MAN002
+		stub = self
+
+		class Handler(BaseHTTPRequestHandler):
+			# Keep connections open between requests.
+			protocol_version = "HTTP/1.1"
+
+			def _reply(self, body: str) -> None:
+				with stub._lock:
+					stub.connections.add(self.client_address)
+
+				status, data = stub.respond(self.command, self.path, body)
+				content = json.dumps(data).encode("UTF-8")
+				self.send_response(status)
+				self.send_header("Content-Type", "application/json")
+				self.send_header("Content-Length", str(len(content)))
+				for name, value in stub.headers.items():
+					self.send_header(name, value)
+				self.end_headers()
+				self.wfile.write(content)
+
+			def do_GET(self) -> None:  # noqa: N802
+				self._reply('')
+
+			def do_POST(self) -> None:  # noqa: N802
+				length = int(self.headers.get("Content-Length", 0))
+				self._reply(self.rfile.read(length).decode("UTF-8"))
+
+			def log_message(self, *args) -> None:
+				pass
+
+		return Handler
+
+
+@pytest.fixture(autouse=True)
+def record_store(monkeypatch: MonkeyPatch) -> Iterator[RecordStore]:
+	"""
+	Provides an empty, in-memory :class:`~.RecordStore` for each test, in place of the one in the user's cache.
+	"""
+
+	with RecordStore(":memory:") as store:
+		monkeypatch.setattr("chemistry_tools.pubchem.records._record_store", store)
+		monkeypatch.setattr("chemistry_tools.pubchem.records._record_store_enabled", True)
+		monkeypatch.setattr("chemistry_tools.pubchem.records._record_store_is_default", False)
+		yield store
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch: MonkeyPatch) -> MemoryCache:
+	"""
+	Provides an empty :class:`~.MemoryCache` for each test.
+	"""
+
+	cache = MemoryCache()
+	monkeypatch.setattr("chemistry_tools.pubchem.memory_cache._memory_cache", cache)
+	return cache
+
+
+@pytest.fixture()
+def pubchem_stub() -> Iterator[StubPubChem]:
+	"""
+	Provides a local stub of the PubChem REST API.
+	"""
+
+	stub = StubPubChem()
+	stub.thread.start()
+
+	try:
+		yield stub
+	finally:
+		stub.server.shutdown()
+		stub.server.server_close()
+
+
+@pytest.fixture()
+def stub_api(pubchem_stub: StubPubChem, monkeypatch: MonkeyPatch) -> StubPubChem:
+	"""
+	Points the synchronous API at the stub server, bypassing the on-disk cache and the rate limiter.
+	"""
+
+	api_base = RequestsURL(pubchem_stub.url)
+	api_base.session = requests.Session()
+	monkeypatch.setattr("chemistry_tools.pubchem.pug_rest.API_BASE", api_base)
+
+	return pubchem_stub
@@ -0,0 +1,126 @@
+# stdlib
+import asyncio
+import time
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from chemistry_tools.pubchem.aio import AsyncPubChem
+from chemistry_tools.pubchem.errors import NotFoundError
+from chemistry_tools.rate_limit import TokenBucket
+from tests.test_pubchem.conftest import StubPubChem
+
+
+def test_get_properties(pubchem_stub: StubPubChem, tmp_pathplus: PathPlus):
+
+	async def lookup():
+		async with AsyncPubChem(cache_dir=tmp_pathplus, base_url=pubchem_stub.url) as client:
+			return await asyncio.gather(
+					client.get_properties("water", ["MolecularWeight", "XLogP"]),
+					client.get_properties([1, 2], "HeavyAtomCount", namespace="cid"),
+					)
+
+	water, cids = asyncio.run(lookup())
+	assert water == [{"CID": 962, "MolecularWeight": 962.5, "XLogP": 962.5}]
+	assert cids == [{"CID": 1, "HeavyAtomCount": 1}, {"CID": 2, "HeavyAtomCount": 2}]
+
+
+def test_other_endpoints(pubchem_stub: StubPubChem, tmp_pathplus: PathPlus):
+
+	async def lookup():
+		async with AsyncPubChem(cache_dir=tmp_pathplus, base_url=pubchem_stub.url) as client:
+			return await asyncio.gather(
+					client.get_synonyms("benzene"),
+					client.get_compounds("coumarin"),
+					client.rest_get_full_record(702, namespace="cid"),
+					)
+
+	synonyms, compounds, record = asyncio.run(lookup())
+	assert synonyms == [{"CID": 241, "synonyms": ["compound 241", "CID241"]}]
+	assert len(compounds) == 1
+	assert compounds[0].cid == 323
+	assert compounds[0].title == "Compound 323"
+	assert record["PC_Compounds"][0]["id"]["id"]["cid"] == 702
+
+
+def test_batching(pubchem_stub: StubPubChem, tmp_pathplus: PathPlus):
+	bucket = TokenBucket(rate=1000, capacity=10)
+
+	async def lookup():
+		async with AsyncPubChem(bucket=bucket, cache_dir=tmp_pathplus, base_url=pubchem_stub.url) as client:
+			return await asyncio.gather(
+					client.get_synonyms(list(range(1, 2001)), "cid"),
+					client.get_compounds(["water", "benzene"]),
+					)
+
+	synonyms, compounds = asyncio.run(lookup())
+	assert [record["CID"] for record in synonyms] == list(range(1, 2001))
+	assert [compound.cid for compound in compounds] == [962, 241]
+	assert len(pubchem_stub.requests) == 4
+
+
+def test_not_found(pubchem_stub: StubPubChem, tmp_pathplus: PathPlus):
+
+	async def lookup():
+		async with AsyncPubChem(cache_dir=tmp_pathplus, base_url=pubchem_stub.url) as client:
+			return await client.get_properties("not a compound", "XLogP")
+
+	with pytest.raises(NotFoundError, match="No CID found"):
+		asyncio.run(lookup())
+
+
+def test_concurrency(pubchem_stub: StubPubChem, tmp_pathplus: PathPlus):
+	pubchem_stub.delay = 0.2
+	bucket = TokenBucket(rate=1000, capacity=10)
+
+	async def lookup():
+		async with AsyncPubChem(
+				concurrency=8,
+				bucket=bucket,
+				cache_dir=tmp_pathplus,
+				base_url=pubchem_stub.url,
+				) as client:
+			return await asyncio.gather(*(client.get_synonyms(cid, "cid") for cid in range(1, 9)))
+
+	start = time.perf_counter()
+	results = asyncio.run(lookup())
+	elapsed = time.perf_counter() - start
+
+	assert [result[0]["CID"] for result in results] == list(range(1, 9))
+	assert len(pubchem_stub.requests) == 8
+	assert elapsed < 8 * 0.2 / 2
+
+
+def test_rate_limit_and_cache(pubchem_stub: StubPubChem, tmp_pathplus: PathPlus):
+
+	async def lookup():
+		async with AsyncPubChem(concurrency=6, cache_dir=tmp_pathplus, base_url=pubchem_stub.url) as client:
+			return await asyncio.gather(*(client.get_synonyms(cid, "cid") for cid in range(1, 7)))
+
+	first = asyncio.run(lookup())
+	assert len(pubchem_stub.requests) == 6
+
+	# No more than 5 requests per second, with the same spacing as the synchronous limiter.
+	intervals = [b - a for a, b in zip(pubchem_stub.times, pubchem_stub.times[1:])]
+	assert min(intervals) >= 0.18
+
+	# The second run is answered from the on-disk cache, without waiting for the rate limiter.
+	start = time.perf_counter()
+	assert asyncio.run(lookup()) == first
+	assert time.perf_counter() - start < 0.5
+	assert len(pubchem_stub.requests) == 6
+
+
+def test_single_flight(pubchem_stub: StubPubChem, tmp_pathplus: PathPlus):
+	pubchem_stub.delay = 0.2
+
+	async def lookup():
+		async with AsyncPubChem(concurrency=4, cache_dir=tmp_pathplus, base_url=pubchem_stub.url) as client:
+			return await asyncio.gather(*(client.get_synonyms(2244, "cid") for _ in range(4)))
+
+	results = asyncio.run(lookup())
+
+	assert len(pubchem_stub.requests) == 1
+	assert all(result == results[0] for result in results)
@@ -0,0 +1,103 @@
+# stdlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 3rd party
+import pytest
+import requests
+from apeye.requests_url import RequestsURL
+from cachecontrol.cache import DictCache
+from _pytest.monkeypatch import MonkeyPatch
+
+# this package
+from chemistry_tools.pubchem.batching import map_batches, split_identifiers
+from chemistry_tools.pubchem.full_record import rest_get_full_record
+from chemistry_tools.pubchem.lookup import get_compounds
+from chemistry_tools.pubchem.properties import get_properties
+from chemistry_tools.pubchem.pug_rest import do_rest_get
+from chemistry_tools.pubchem.synonyms import get_synonyms
+from chemistry_tools.rate_limit import RateLimitAdapter, TokenBucket
+from tests.test_pubchem.conftest import StubPubChem
+
+
+def test_split_identifiers():
+	batches = split_identifiers(list(range(1, 2501)), "cid")
+	assert [len(batch) for batch in batches] == [833, 834, 833]
+	assert sum(batches, []) == [str(cid) for cid in range(1, 2501)]
+
+	assert split_identifiers("1,2, 3", "cid") == [['1', '2', '3']]
+	assert split_identifiers(5, "cid") == [['5']]
+
+	# Limited by the length of the URL rather than the number of CIDs.
+	batches = split_identifiers([10**8 + idx for idx in range(100)], "cid", max_length=200)
+	assert len(batches) == 5
+	assert all(len(','.join(batch)) <= 200 for batch in batches)
+
+	# Other namespaces take one identifier per request.
+	assert split_identifiers(["water", "benzene"], "name") == ["water", "benzene"]
+	assert split_identifiers("1,2-dichloroethane", "name") == ["1,2-dichloroethane"]
+
+
+def test_map_batches():
+
+	def function(batch):
+		time.sleep(0.01 * (3 - len(batch)))
+		return [value * 2 for value in batch]
+
+	batches = [[1], [2, 3], [4, 5]]
+	assert map_batches(function, batches) == [2, 4, 6, 8, 10]
+	assert map_batches(function, batches, max_workers=3) == [2, 4, 6, 8, 10]
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_get_properties(stub_api: StubPubChem, max_workers: int):
+	cids = list(range(2500, 0, -1))
+	results = get_properties(cids, ["MolecularWeight", "HeavyAtomCount"], "cid", max_workers=max_workers)
+
+	assert len(stub_api.requests) == 3
+	assert [result["CID"] for result in results] == cids
+	assert results[0] == {"CID": 2500, "MolecularWeight": 2500.5, "HeavyAtomCount": 2500}
+
+	frame = get_properties(cids, "MolecularWeight", "cid", as_dataframe=True, max_workers=max_workers)
+	assert list(frame.index) == cids
+
+
+def test_fan_out_names(stub_api: StubPubChem):
+	results = get_synonyms(["water", "benzene", "ethanol"])
+	assert [result["CID"] for result in results] == [962, 241, 702]
+	assert len(stub_api.requests) == 3
+
+	compounds = get_compounds(["coumarin", "water"], max_workers=2)
+	assert [compound.cid for compound in compounds] == [323, 962]
+
+
+def test_full_record(stub_api: StubPubChem):
+	record = rest_get_full_record(list(range(1, 1501)), "cid", max_workers=2)
+	assert [compound["id"]["id"]["cid"] for compound in record["PC_Compounds"]] == list(range(1, 1501))
+	assert len(stub_api.requests) == 2
+
+
+def test_parallel_rate_limit(pubchem_stub: StubPubChem, monkeypatch: MonkeyPatch):
+	# Requests made from several threads through one session still respect the rate limit.
+	adapter = RateLimitAdapter(TokenBucket(rate=10), cache=DictCache())
+	api_base = RequestsURL(pubchem_stub.url)
+	api_base.session = requests.Session()
+	api_base.session.mount("http://", adapter)
+	monkeypatch.setattr("chemistry_tools.pubchem.pug_rest.API_BASE", api_base)
+
+	results = get_synonyms(["water", "benzene", "ethanol", "coumarin"], max_workers=4)
+	assert [result["CID"] for result in results] == [962, 241, 702, 323]
+	assert len(pubchem_stub.times) == 4
+
+	times = sorted(pubchem_stub.times)
+	assert min(b - a for a, b in zip(times, times[1:])) >= 0.08
+
+
+def test_single_flight(stub_api: StubPubChem):
+	stub_api.delay = 0.2
+
+	with ThreadPoolExecutor(max_workers=4) as executor:
+		responses = list(executor.map(lambda _: do_rest_get("cid", 2244, domain="synonyms").json(), range(4)))
+
+	assert len(stub_api.requests) == 1
+	assert all(response == responses[0] for response in responses)
@@ -0,0 +1,83 @@
+# stdlib
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 3rd party
+import pytest
+import requests
+from _pytest.monkeypatch import MonkeyPatch
+from cachecontrol.cache import DictCache
+
+# this package
+import chemistry_tools.cache
+from chemistry_tools.cache import cached_requests, configure_connections, connection_pool, get_session
+from chemistry_tools.pubchem.pug_rest import do_rest_get
+from chemistry_tools.rate_limit import TokenBucket
+from tests.test_pubchem.conftest import StubPubChem
+
+
+@pytest.fixture()
+def pool_api(stub_api: StubPubChem, monkeypatch: MonkeyPatch) -> StubPubChem:
+	# Sessions created by connection_pool() share the cache and rate limiter of cached_requests.
+	monkeypatch.setattr(chemistry_tools.cache._adapter, "cache", DictCache())
+	monkeypatch.setattr(chemistry_tools.cache._adapter, "bucket", TokenBucket(rate=1000, capacity=10))
+
+	return stub_api
+
+
+def test_connection_pool(pool_api: StubPubChem):
+	pool_api.delay = 0.1
+
+	with connection_pool(max_connections=2) as session:
+		assert get_session() is session
+
+		with ThreadPoolExecutor(max_workers=6) as executor:
+			futures = [
+					executor.submit(contextvars.copy_context().run, do_rest_get, "cid", cid, domain="synonyms")
+					for cid in range(1, 7)
+					]
+			responses = [future.result() for future in futures]
+
+	cids = [response.json()["InformationList"]["Information"][0]["CID"] for response in responses]
+	assert cids == [1, 2, 3, 4, 5, 6]
+	assert len(pool_api.requests) == 6
+	assert len(pool_api.connections) == 2
+
+	assert get_session() is cached_requests
+
+
+def test_connection_pool_cache(pool_api: StubPubChem):
+	with connection_pool():
+		do_rest_get("cid", 2244, domain="synonyms")
+		assert do_rest_get("cid", 2244, domain="synonyms").from_cache
+
+	assert len(pool_api.requests) == 1
+
+
+def test_connection_pool_timeout(pool_api: StubPubChem):
+	pool_api.delay = 0.5
+
+	with connection_pool(timeout=0.1), pytest.raises(requests.exceptions.ReadTimeout):
+		do_rest_get("cid", 2244, domain="synonyms")
+
+	with pytest.raises(ValueError, match="'max_connections' must be at least 1"):
+		with connection_pool(max_connections=0):
+			pass
+
+
+def test_configure_connections():
+	adapter = chemistry_tools.cache._adapter
+
+	try:
+		configure_connections(max_connections=3, block=True, timeout=5, keep_alive=False)
+
+		assert adapter.poolmanager.connection_pool_kw == {"maxsize": 3, "block": True}
+		assert adapter.timeout == 5
+		assert cached_requests.headers["Connection"] == "close"
+	finally:
+		configure_connections()
+
+	assert adapter.poolmanager.connection_pool_kw == {"maxsize": 10, "block": False}
+	assert adapter.timeout == 30
+	assert cached_requests.headers["Connection"] == "keep-alive"
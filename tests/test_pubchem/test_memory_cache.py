@@ -0,0 +1,123 @@
+# stdlib
+import datetime
+import time
+
+# 3rd party
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+# this package
+from chemistry_tools.cache import clear_cache
+from chemistry_tools.pubchem.compound import Compound
+from chemistry_tools.pubchem.description import get_common_name, get_compound_id
+from chemistry_tools.pubchem.errors import NotFoundError
+from chemistry_tools.pubchem.lookup import get_compounds
+from chemistry_tools.pubchem.memory_cache import MemoryCache, _sizeof, set_memory_cache
+from chemistry_tools.pubchem.properties import get_properties
+from chemistry_tools.pubchem.synonyms import get_synonyms
+from tests.test_pubchem.conftest import StubPubChem
+
+
+def test_memory_cache():
+	cache = MemoryCache(max_size=_sizeof("a" * 100) * 2)
+	calls = []
+
+	def function(value: str):
+		calls.append(value)
+		return value * 100
+
+	assert cache.get('a', lambda: function('a')) == 'a' * 100
+	assert cache.get('a', lambda: function('a')) == 'a' * 100
+	assert calls == ['a']
+	assert (cache.hits, cache.misses) == (1, 1)
+
+	# The least recently used result is removed to make space.
+	cache.get('b', lambda: function('b'))
+	cache.get('a', lambda: function('a'))
+	cache.get('c', lambda: function('c'))
+	assert 'a' in cache
+	assert 'b' not in cache
+	assert len(cache) == 2
+	assert cache.size <= cache.max_size
+
+	# Results larger than the cache are not stored.
+	cache.get('d', lambda: function('d') * 10)
+	assert 'd' not in cache
+
+	cache.clear()
+	assert len(cache) == 0
+	assert cache.size == 0
+
+
+def test_max_age():
+	cache = MemoryCache(max_age=datetime.timedelta(seconds=0.05))
+	cache.set('a', 1)
+	assert 'a' in cache
+
+	time.sleep(0.1)
+	assert 'a' not in cache
+	assert cache.get('a', lambda: 2) == 2
+
+
+def test_errors_not_cached():
+	cache = MemoryCache()
+
+	def function():
+		raise NotFoundError
+
+	with pytest.raises(NotFoundError):
+		cache.get('a', function)
+
+	assert 'a' not in cache
+
+
+def test_results_are_copies(stub_api: StubPubChem):
+	properties = get_properties(2244, "MolecularFormula,XLogP", "cid")
+	properties[0]["MolecularFormula"] = "H2O"
+	synonyms = get_synonyms(2244, "cid")
+	synonyms[0]["synonyms"].append("modified")
+
+	# Later calls are not affected by changes to earlier results.
+	assert get_properties(2244, "MolecularFormula,XLogP", "cid")[0]["MolecularFormula"] != "H2O"
+	assert "modified" not in get_synonyms(2244, "cid")[0]["synonyms"]
+	assert len(stub_api.requests) == 2
+
+
+def test_sizeof():
+	record = {"CID": 1, "synonyms": ["water", "H2O"]}
+	assert _sizeof(record) > _sizeof({}) + _sizeof("water")
+	assert _sizeof([record, record]) < 2 * _sizeof(record)
+
+
+def test_requests(stub_api: StubPubChem, memory_cache: MemoryCache):
+	for _ in range(2):
+		assert get_properties([1, 2], "XLogP", "cid")[1] == {"CID": 2, "XLogP": 2.5}
+		assert get_properties("1,2", ["XLogP"], "cid", as_dataframe=True).loc[1, "XLogP"] == 1.5
+		assert get_synonyms("water")[0]["CID"] == 962
+		assert [compound.cid for compound in get_compounds(["water", "benzene"])] == [962, 241]
+		assert get_common_name("water") == "Compound 962"
+		assert get_compound_id("water") == 962
+		assert Compound.from_cid(1)._record["cid"] == 1
+
+	# The same arguments written differently give the same key.
+	assert len(stub_api.requests) == 7
+	assert (memory_cache.hits, memory_cache.misses) == (10, 6)
+
+	# The results are new lists each time.
+	first = get_synonyms("water")
+	first.clear()
+	assert get_synonyms("water")
+
+
+
+def test_clear_cache(stub_api: StubPubChem, memory_cache: MemoryCache, monkeypatch: MonkeyPatch):
+	monkeypatch.setattr("chemistry_tools.cache.cache.clear", lambda: None)
+
+	get_synonyms("water")
+	clear_cache()
+	assert len(memory_cache) == 0
+
+	set_memory_cache(None)
+	get_synonyms("water")
+	get_synonyms("water")
+	assert len(stub_api.requests) == 3
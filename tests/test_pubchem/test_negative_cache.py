@@ -0,0 +1,120 @@
+# stdlib
+import asyncio
+import datetime
+
+# 3rd party
+import pytest
+import requests
+from _pytest.monkeypatch import MonkeyPatch
+from apeye.requests_url import RequestsURL
+from cachecontrol.cache import DictCache
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from chemistry_tools.cache import (
+		CACHEABLE_METHODS,
+		BodyKeyedCacheController,
+		NegativeExpiresAfter,
+		bypass_negative_cache
+		)
+from chemistry_tools.pubchem.aio import AsyncPubChem
+from chemistry_tools.pubchem.errors import BadRequestError, NotFoundError
+from chemistry_tools.pubchem.lookup import get_compounds
+from chemistry_tools.pubchem.synonyms import get_synonyms
+from chemistry_tools.rate_limit import RateLimitAdapter, TokenBucket
+from tests.test_pubchem.conftest import StubPubChem
+
+
+@pytest.fixture()
+def cached_api(pubchem_stub: StubPubChem, monkeypatch: MonkeyPatch) -> NegativeExpiresAfter:
+	heuristic = NegativeExpiresAfter()
+	adapter = RateLimitAdapter(
+			TokenBucket(rate=1000),
+			cache=DictCache(),
+			heuristic=heuristic,
+			controller_class=BodyKeyedCacheController,
+			cacheable_methods=CACHEABLE_METHODS,
+			)
+	api_base = RequestsURL(pubchem_stub.url)
+	api_base.session = requests.Session()
+	api_base.session.mount("http://", adapter)
+	monkeypatch.setattr("chemistry_tools.pubchem.pug_rest.API_BASE", api_base)
+
+	return heuristic
+
+
+def test_not_found(pubchem_stub: StubPubChem, cached_api: NegativeExpiresAfter):
+	for _ in range(3):
+		with pytest.raises(NotFoundError, match="No CID found"):
+			get_compounds("not a compound")
+
+	with pytest.raises(BadRequestError):
+		get_synonyms("1,abc", "cid")
+	with pytest.raises(BadRequestError):
+		get_synonyms("1,abc", "cid")
+
+	assert len(pubchem_stub.requests) == 2
+
+	# Other responses are cached as before.
+	get_synonyms("water")
+	get_synonyms("water")
+	assert len(pubchem_stub.requests) == 3
+
+
+def test_bypass(pubchem_stub: StubPubChem, cached_api: NegativeExpiresAfter):
+	with pytest.raises(NotFoundError):
+		get_compounds("not a compound")
+
+	with bypass_negative_cache():
+		with pytest.raises(NotFoundError):
+			get_compounds("not a compound")
+
+		# Only error responses are requested again.
+		get_synonyms("water")
+		get_synonyms("water")
+
+		# The context applies to requests made in other threads.
+		with pytest.raises(NotFoundError):
+			get_synonyms(["benzene", "not a compound"], max_workers=2)
+
+	assert pubchem_stub.paths()[:3] == [
+			"/rest/pug/compound/name/not%20a%20compound/description/JSON",
+			"/rest/pug/compound/name/not%20a%20compound/description/JSON",
+			"/rest/pug/compound/name/water/synonyms/JSON",
+			]
+	assert sorted(pubchem_stub.paths()[3:]) == [
+			"/rest/pug/compound/name/benzene/synonyms/JSON",
+			"/rest/pug/compound/name/not%20a%20compound/synonyms/JSON",
+			]
+
+	# The new responses replace the cached ones.
+	with pytest.raises(NotFoundError):
+		get_compounds("not a compound")
+	assert len(pubchem_stub.requests) == 5
+
+
+def test_negative_expires_after(pubchem_stub: StubPubChem, cached_api: NegativeExpiresAfter):
+	cached_api.negative_delta = datetime.timedelta(0)
+
+	for _ in range(2):
+		with pytest.raises(NotFoundError):
+			get_compounds("not a compound")
+		get_synonyms("water")
+
+	assert len(pubchem_stub.requests) == 3
+
+
+def test_async(pubchem_stub: StubPubChem, tmp_pathplus: PathPlus):
+
+	async def lookup():
+		async with AsyncPubChem(cache_dir=tmp_pathplus, base_url=pubchem_stub.url) as client:
+			for _ in range(2):
+				with pytest.raises(NotFoundError):
+					await client.get_synonyms("not a compound")
+
+			with bypass_negative_cache():
+				with pytest.raises(NotFoundError):
+					await client.get_synonyms("not a compound")
+
+	asyncio.run(lookup())
+	assert len(pubchem_stub.requests) == 2
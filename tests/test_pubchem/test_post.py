@@ -0,0 +1,90 @@
+# stdlib
+import asyncio
+
+# 3rd party
+import requests
+from _pytest.monkeypatch import MonkeyPatch
+from apeye.requests_url import RequestsURL
+from cachecontrol.cache import DictCache
+from cachecontrol.heuristics import ExpiresAfter
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from chemistry_tools.cache import CACHEABLE_METHODS, BodyKeyedCacheController
+from chemistry_tools.pubchem.aio import AsyncPubChem
+from chemistry_tools.pubchem.properties import get_properties
+from chemistry_tools.pubchem.pug_rest import do_rest_get, request
+from chemistry_tools.pubchem.records import set_record_store
+from chemistry_tools.rate_limit import RateLimitAdapter, TokenBucket
+from tests.test_pubchem.conftest import StubPubChem
+
+
+def test_post_threshold(stub_api: StubPubChem):
+	do_rest_get("cid", [1, 2, 3], domain="synonyms")
+	assert stub_api.requests[-1] == ("GET", "/rest/pug/compound/cid/1,2,3/synonyms/JSON", '')
+
+	cids = list(range(1, 501))
+	results = get_properties(cids, "XLogP", "cid")
+	assert [result["CID"] for result in results] == cids
+
+	method, path, body = stub_api.requests[-1]
+	assert method == "POST"
+	assert path == "/rest/pug/compound/cid/property/XLogP/JSON"
+	assert body.startswith("cid=1%2C2%2C3%2C")
+
+
+def test_post_special_characters(stub_api: StubPubChem):
+	inchi = "InChI=1S/C6H6/c1-2-4-6-5-3-1/h1-6H"
+	data = do_rest_get("inchi", inchi, domain="synonyms").json()
+	assert data["InformationList"]["Information"][0]["CID"] == sum(map(ord, inchi))
+
+	method, path, body = stub_api.requests[-1]
+	assert method == "POST"
+	assert path == "/rest/pug/compound/inchi/synonyms/JSON"
+
+	request(inchi, "inchi", "synonyms")
+	assert stub_api.requests[-1][:2] == ("POST", "/rest/pug/compound/inchi/synonyms/JSON")
+
+	request("c1ccccc1", "smiles", "synonyms")
+	assert stub_api.requests[-1][:2] == ("GET", "/rest/pug/compound/smiles/c1ccccc1/synonyms/JSON")
+
+
+def test_post_cached(pubchem_stub: StubPubChem, monkeypatch: MonkeyPatch):
+	set_record_store(None)
+	adapter = RateLimitAdapter(
+			TokenBucket(rate=1000),
+			cache=DictCache(),
+			controller_class=BodyKeyedCacheController,
+			cacheable_methods=CACHEABLE_METHODS,
+			heuristic=ExpiresAfter(days=1),
+			)
+	api_base = RequestsURL(pubchem_stub.url)
+	api_base.session = requests.Session()
+	api_base.session.mount("http://", adapter)
+	monkeypatch.setattr("chemistry_tools.pubchem.pug_rest.API_BASE", api_base)
+
+	first = list(range(1, 401))
+	second = list(range(2, 402))
+
+	assert [r["CID"] for r in get_properties(first, "XLogP", "cid")] == first
+	assert [r["CID"] for r in get_properties(first, "XLogP", "cid")] == first
+	assert len(pubchem_stub.requests) == 1
+
+	# The same URL with a different body is a different cache entry.
+	assert [r["CID"] for r in get_properties(second, "XLogP", "cid")] == second
+	assert [r["CID"] for r in get_properties(second, "XLogP", "cid")] == second
+	assert len(pubchem_stub.requests) == 2
+	assert {method for method, _, _ in pubchem_stub.requests} == {"POST"}
+
+
+def test_post_async(pubchem_stub: StubPubChem, tmp_pathplus: PathPlus):
+	cids = list(range(1, 501))
+
+	async def lookup():
+		async with AsyncPubChem(cache_dir=tmp_pathplus, base_url=pubchem_stub.url) as client:
+			return await client.get_synonyms(cids, "cid")
+
+	assert [r["CID"] for r in asyncio.run(lookup())] == cids
+	assert [r["CID"] for r in asyncio.run(lookup())] == cids
+	assert len(pubchem_stub.requests) == 1
+	assert pubchem_stub.requests[0][0] == "POST"
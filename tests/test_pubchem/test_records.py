@@ -0,0 +1,175 @@
+# stdlib
+import datetime
+import threading
+
+# 3rd party
+from _pytest.monkeypatch import MonkeyPatch
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from chemistry_tools.cache import clear_cache
+from chemistry_tools.pubchem.full_record import rest_get_full_record
+from chemistry_tools.formulae import Formula
+from chemistry_tools.pubchem.compound import Compound
+from chemistry_tools.pubchem.memory_cache import set_memory_cache
+from chemistry_tools.pubchem.properties import get_properties, get_property, valid_properties
+from chemistry_tools.pubchem.records import RecordStore, get_record_store, set_record_store
+from chemistry_tools.pubchem.synonyms import get_synonyms
+from tests.test_pubchem.conftest import StubPubChem
+
+
+def requested_cids(stub: StubPubChem):
+	cids = []
+
+	for method, path, body in stub.requests:
+		if method == "POST":
+			values = body.split('=', 1)[1].replace("%2C", ',')
+		else:
+			values = path.split('/')[5]
+		cids.extend(int(cid) for cid in values.split(','))
+
+	return cids
+
+
+def test_record_store(tmp_pathplus: PathPlus):
+	with RecordStore(tmp_pathplus / "records.sqlite") as store:
+		assert len(store) == 0
+		store.set("synonyms", {1: {"CID": 1, "Synonym": ["a"]}, 2: {"CID": 2, "Synonym": ["b"]}})
+		store.set("property/XLogP", {1: {"CID": 1, "XLogP": 1.5}})
+
+		assert len(store) == 3
+		expected = {1: {"CID": 1, "Synonym": ["a"]}, 2: {"CID": 2, "Synonym": ["b"]}}
+		assert store.get("synonyms", [2, 3, 1]) == expected
+		assert store.get("property/XLogP", [2]) == {}
+		assert store.get("synonyms", range(10000)).keys() == {1, 2}
+
+	# The records are saved to disk.
+	with RecordStore(tmp_pathplus / "records.sqlite") as store:
+		assert len(store) == 3
+
+		store.clear()
+		assert len(store) == 0
+
+	with RecordStore(tmp_pathplus / "records.sqlite", expires_after=datetime.timedelta(0)) as store:
+		store.set("synonyms", {1: {"CID": 1}})
+		assert store.get("synonyms", [1]) == {}
+
+
+def test_overlapping_requests(stub_api: StubPubChem):
+	results = get_properties(list(range(1, 501)), ["MolecularWeight", "XLogP"], "cid")
+	assert [result["CID"] for result in results] == list(range(1, 501))
+
+	# A subset of the CIDs is answered entirely from the store.
+	results = get_properties(list(range(10, 0, -1)), ["MolecularWeight", "XLogP"], "cid")
+	assert results[0] == {"CID": 10, "MolecularWeight": 10.5, "XLogP": 10.5}
+	assert [result["CID"] for result in results] == list(range(10, 0, -1))
+	assert len(stub_api.requests) == 1
+
+	# Only the CIDs which are not in the store are requested.
+	results = get_properties(list(range(250, 751)), ["MolecularWeight", "XLogP"], "cid")
+	assert [result["CID"] for result in results] == list(range(250, 751))
+	assert requested_cids(stub_api) == list(range(1, 751))
+
+	# A subset of the properties is also answered from the store.
+	frame = get_properties([1, 2], "MolecularWeight", "cid", as_dataframe=True)
+	assert list(frame["MolecularWeight"]) == [1.5, 2.5]
+	assert len(stub_api.requests) == 2
+
+
+def test_property_superset(stub_api: StubPubChem):
+	get_properties([1, 2], "MolecularWeight", "cid")
+	get_properties([2, 3], "XLogP", "cid")
+
+	# Only the missing properties are requested, for the CIDs which lack them.
+	results = get_properties([1, 2, 3], ["MolecularWeight", "XLogP", "Charge"], "cid")
+	assert results[1] == {"CID": 2, "MolecularWeight": 2.5, "XLogP": 2.5, "Charge": 2}
+	assert stub_api.paths()[2:] == [
+			"/rest/pug/compound/cid/1/property/XLogP,Charge/JSON",
+			"/rest/pug/compound/cid/2/property/Charge/JSON",
+			"/rest/pug/compound/cid/3/property/MolecularWeight,Charge/JSON",
+			]
+
+	assert get_property(3, "XLogP", "cid") == 3.5
+	assert get_properties("1,2,3", "XLogP,Charge", "cid")[0]["Charge"] == 1
+	assert len(stub_api.requests) == 5
+
+
+def test_fetch_all_properties(stub_api: StubPubChem):
+	set_record_store(RecordStore(":memory:", fetch_all_properties=True))
+
+	assert get_properties([1, 2], "MolecularFormula", "cid")[0]["MolecularFormula"] == Formula({'C': 1, 'H': 4})
+	results = get_properties([1, 2], "all", "cid")
+	assert results[0]["XLogP"] == 1.5
+	assert results[1]["HeavyAtomCount"] == 2
+	assert len(stub_api.requests) == 1
+	assert stub_api.paths()[0].endswith(f"/property/{','.join(valid_properties)}/JSON")
+
+
+def test_compound_properties(stub_api: StubPubChem):
+	compound = Compound.from_cid(1)
+	assert compound.get_properties(["MolecularWeight", "XLogP"]) == {"MolecularWeight": 1.5, "XLogP": 1.5}
+	assert compound.get_property("XLogP") == 1.5
+
+	# Another instance for the same compound uses the stored properties.
+	assert Compound.from_cid(1).get_properties("XLogP,MolecularWeight") == {"XLogP": 1.5, "MolecularWeight": 1.5}
+	property_paths = [path for path in stub_api.paths() if "/property/" in path]
+	assert property_paths == ["/rest/pug/compound/cid/1/property/MolecularWeight,XLogP/JSON"]
+
+
+def test_synonyms_and_full_record(stub_api: StubPubChem):
+	get_synonyms("1,2,3", "cid")
+	results = get_synonyms([3, 4], "cid")
+	assert results == [
+			{"CID": 3, "synonyms": ["compound 3", "CID3"]},
+			{"CID": 4, "synonyms": ["compound 4", "CID4"]},
+			]
+	assert requested_cids(stub_api) == [1, 2, 3, 4]
+
+	rest_get_full_record([5, 6], "cid")
+	record = rest_get_full_record([6, 5, 7], "cid")
+	assert [compound["id"]["id"]["cid"] for compound in record["PC_Compounds"]] == [6, 5, 7]
+	assert requested_cids(stub_api) == [1, 2, 3, 4, 5, 6, 7]
+
+	# 3D records are stored separately from 2D records.
+	rest_get_full_record(5, "cid", record_type="3d")
+	assert requested_cids(stub_api)[-1] == 5
+
+
+def test_other_namespaces(stub_api: StubPubChem):
+	# Records fetched by name are stored by CID.
+	assert get_synonyms("water")[0]["CID"] == 962
+	assert get_synonyms(962, "cid")[0]["CID"] == 962
+	assert len(stub_api.requests) == 1
+
+
+def test_disabled(stub_api: StubPubChem):
+	set_memory_cache(None)
+	set_record_store(None)
+	assert get_record_store() is None
+
+	get_synonyms(1, "cid")
+	get_synonyms(1, "cid")
+	assert len(stub_api.requests) == 2
+
+
+def test_threads(stub_api: StubPubChem, record_store: RecordStore):
+
+	def lookup(start: int):
+		get_properties(list(range(start, start + 100)), "XLogP", "cid")
+
+	threads = [threading.Thread(target=lookup, args=(start, )) for start in range(1, 800, 100)]
+
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert len(record_store) == 800
+
+
+def test_clear_cache(record_store: RecordStore, monkeypatch: MonkeyPatch):
+	monkeypatch.setattr("chemistry_tools.cache.cache.clear", lambda: None)
+
+	record_store.set("synonyms", {1: {"CID": 1}})
+	clear_cache()
+	assert len(record_store) == 0
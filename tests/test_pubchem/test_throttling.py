@@ -0,0 +1,88 @@
+# stdlib
+import asyncio
+
+# 3rd party
+import pytest
+import requests
+from _pytest.monkeypatch import MonkeyPatch
+from apeye.requests_url import RequestsURL
+from cachecontrol.cache import DictCache
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from chemistry_tools.cache import CACHEABLE_METHODS, BodyKeyedCacheController
+from chemistry_tools.pubchem.aio import AsyncPubChem
+from chemistry_tools.pubchem.errors import PubChemHTTPError
+from chemistry_tools.pubchem.synonyms import get_synonyms
+from chemistry_tools.rate_limit import AdaptiveTokenBucket, Backoff, RateLimitAdapter
+from tests.test_pubchem.conftest import StubPubChem
+
+
+@pytest.fixture()
+def bucket(pubchem_stub: StubPubChem, monkeypatch: MonkeyPatch) -> AdaptiveTokenBucket:
+	bucket = AdaptiveTokenBucket(rate=100)
+	adapter = RateLimitAdapter(
+			bucket,
+			cache=DictCache(),
+			controller_class=BodyKeyedCacheController,
+			cacheable_methods=CACHEABLE_METHODS,
+			)
+	api_base = RequestsURL(pubchem_stub.url)
+	api_base.session = requests.Session()
+	api_base.session.mount("http://", adapter)
+	monkeypatch.setattr("chemistry_tools.pubchem.pug_rest.API_BASE", api_base)
+	monkeypatch.setattr("chemistry_tools.pubchem.pug_rest.backoff", Backoff(retries=3, base=0.01))
+
+	return bucket
+
+
+def test_retry_when_busy(pubchem_stub: StubPubChem, bucket: AdaptiveTokenBucket):
+	pubchem_stub.busy = 2
+	pubchem_stub.headers["Retry-After"] = '0'
+
+	assert get_synonyms(2244, "cid")[0]["CID"] == 2244
+	assert len(pubchem_stub.requests) == 3
+	assert bucket.rate == 25
+
+	# Gives up once the retries are used up.
+	pubchem_stub.busy = 4
+
+	with pytest.raises(PubChemHTTPError, match="Service Unavailable"):
+		get_synonyms(962, "cid")
+
+	assert len(pubchem_stub.requests) == 7
+
+
+def test_throttling_control(pubchem_stub: StubPubChem, bucket: AdaptiveTokenBucket):
+	pubchem_stub.headers["X-Throttling-Control"] = (
+			"Request Count status: Red (80%), Request Time status: Green (10%), Service status: Green (20%)"
+			)
+
+	get_synonyms(2244, "cid")
+	assert bucket.rate == 50
+
+	pubchem_stub.headers["X-Throttling-Control"] = (
+			"Request Count status: Green (10%), Request Time status: Green (10%), Service status: Green (20%)"
+			)
+
+	get_synonyms(962, "cid")
+	assert bucket.rate == 60
+
+
+def test_retry_when_busy_async(pubchem_stub: StubPubChem, tmp_pathplus: PathPlus):
+	pubchem_stub.busy = 2
+	pubchem_stub.headers["Retry-After"] = '0'
+	bucket = AdaptiveTokenBucket(rate=100)
+
+	async def lookup():
+		async with AsyncPubChem(
+				bucket=bucket,
+				backoff=Backoff(retries=3, base=0.01),
+				cache_dir=tmp_pathplus,
+				base_url=pubchem_stub.url,
+				) as client:
+			return await client.get_synonyms(2244, "cid")
+
+	assert asyncio.run(lookup())[0]["CID"] == 2244
+	assert len(pubchem_stub.requests) == 3
+	assert bucket.rate == 25
@@ -0,0 +1,275 @@
+# stdlib
+import asyncio
+import itertools
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+# 3rd party
+import pytest
+import requests
+from _pytest.monkeypatch import MonkeyPatch
+from domdf_python_tools.paths import PathPlus
+
+# this package
+import chemistry_tools.cache
+from chemistry_tools.cache import clear_cache, set_rate_limiter
+from chemistry_tools.pubchem.aio import AsyncPubChem
+from chemistry_tools.rate_limit import (
+		AdaptiveTokenBucket,
+		Backoff,
+		SharedTokenBucket,
+		ThrottlingStatus,
+		TokenBucket,
+		parse_retry_after,
+		parse_throttling_control
+		)
+
+
+def test_token_bucket():
+	bucket = TokenBucket(rate=5)
+	assert bucket.reserve() == 0
+	assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+	assert bucket.reserve() == pytest.approx(0.4, abs=0.01)
+
+	bucket = TokenBucket(rate=10, capacity=3)
+	assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+	assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+	with pytest.raises(ValueError, match="'rate' must be greater than zero"):
+		TokenBucket(rate=0)
+	with pytest.raises(ValueError, match="'capacity' must be at least 1"):
+		TokenBucket(capacity=0.5)
+
+
+def test_token_bucket_threads():
+	bucket = TokenBucket(rate=20)
+	times = []
+
+	def worker() -> None:
+		for _ in range(3):
+			bucket.wait()
+			times.append(time.monotonic())
+
+	threads = [threading.Thread(target=worker) for _ in range(4)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	times.sort()
+	assert min(b - a for a, b in zip(times, times[1:])) >= 0.045
+
+
+def test_token_bucket_async():
+	bucket = TokenBucket(rate=20)
+
+	async def acquire() -> float:
+		await bucket.acquire()
+		return time.monotonic()
+
+	async def main():
+		return await asyncio.gather(*(acquire() for _ in range(5)))
+
+	times = sorted(asyncio.run(main()))
+	assert min(b - a for a, b in zip(times, times[1:])) >= 0.045
+
+
+def _response(status_code: int = 200, **headers: str) -> requests.Response:
+	response = requests.Response()
+	response.status_code = status_code
+	response.headers.update({name.replace('_', '-'): value for name, value in headers.items()})
+	return response
+
+
+def test_parse_throttling_control():
+	header = "Request Count status: Green (0%), Request Time status: Yellow (62%), Service status: Green (20%)"
+	assert parse_throttling_control(header) == ThrottlingStatus("Yellow", 62)
+	assert parse_throttling_control("Request Count status: black (100%)") == ThrottlingStatus("Black", 100)
+	assert parse_throttling_control('') is None
+	assert parse_throttling_control(None) is None
+
+
+def test_parse_retry_after():
+	assert parse_retry_after(_response(503, Retry_After="3")) == 3
+	assert parse_retry_after(_response(503, Retry_After="Wed, 21 Oct 2015 07:28:00 GMT")) == 0
+	assert parse_retry_after(_response(503, Retry_After="soon")) is None
+	assert parse_retry_after(_response(503)) is None
+
+
+def test_adaptive_token_bucket():
+	bucket = AdaptiveTokenBucket(rate=10, min_rate=2)
+
+	bucket.throttle(ThrottlingStatus("Red", 80))
+	assert bucket.rate == 5
+	bucket.throttle(ThrottlingStatus("Yellow", 60))
+	assert bucket.rate == 3.75
+	bucket.throttle(ThrottlingStatus("Black", 100))
+	assert bucket.rate == 2
+
+	# Speeds up only while the load is low.
+	bucket.throttle(ThrottlingStatus("Green", 70))
+	assert bucket.rate == 2
+	for _ in range(20):
+		bucket.observe(_response(X_Throttling_Control="Request Count status: Green (10%)"))
+	assert bucket.rate == 10
+
+	with pytest.raises(ValueError, match="'min_rate' must be greater than zero and no greater than 'rate'"):
+		AdaptiveTokenBucket(rate=5, min_rate=10)
+
+
+def test_adaptive_token_bucket_retry_after():
+	bucket = AdaptiveTokenBucket(rate=10)
+	bucket.observe(_response(503, Retry_After="2"))
+
+	assert bucket.rate == 5
+	assert bucket.reserve() == pytest.approx(2.2, abs=0.01)
+
+
+def test_backoff():
+	backoff = Backoff(retries=3, base=0.01)
+	responses = [_response(503), _response(429, Retry_After="0"), _response(200)]
+	assert backoff.call(lambda: responses.pop(0)).status_code == 200
+
+	# Gives up after the given number of retries.
+	responses = [_response(503) for _ in range(5)]
+	assert backoff.call(lambda: responses.pop(0)).status_code == 503
+	assert len(responses) == 1
+
+	attempts = []
+
+	def fail() -> requests.Response:
+		attempts.append(1)
+		raise requests.exceptions.ConnectionError("failed")
+
+	# Connection errors are only retried once by default.
+	with pytest.raises(requests.exceptions.ConnectionError):
+		backoff.call(fail)
+	assert len(attempts) == 2
+
+	attempts.clear()
+	with pytest.raises(requests.exceptions.ConnectionError):
+		Backoff(retries=3, base=0.01, connection_retries=3).call(fail)
+	assert len(attempts) == 4
+
+	for attempt in range(10):
+		assert 0 <= backoff.delay(attempt) <= min(60, 0.01 * 2**attempt)
+	assert 5 <= backoff.delay(0, _response(503, Retry_After="5")) <= 5.01
+
+	with pytest.raises(ValueError, match="'retries' cannot be negative"):
+		Backoff(retries=-1)
+	with pytest.raises(ValueError, match="'connection_retries' cannot be negative"):
+		Backoff(connection_retries=-1)
+
+
+def test_backoff_async():
+	backoff = Backoff(retries=3, base=0.01)
+	responses = [_response(503), _response(503), _response(200)]
+
+	async def send() -> requests.Response:
+		return responses.pop(0)
+
+	assert asyncio.run(backoff.call_async(send)).status_code == 200
+
+	attempts = []
+
+	async def fail() -> requests.Response:
+		attempts.append(1)
+		raise requests.exceptions.ConnectionError("failed")
+
+	with pytest.raises(requests.exceptions.ConnectionError):
+		asyncio.run(backoff.call_async(fail))
+	assert len(attempts) == 2
+
+
+def test_shared_token_bucket(tmp_pathplus: PathPlus):
+	filename = tmp_pathplus / "rate_limit.sqlite"
+
+	with SharedTokenBucket(filename, rate=5) as first, SharedTokenBucket(filename, rate=5) as second:
+		assert first.reserve() == 0
+		assert second.reserve() == pytest.approx(0.2, abs=0.01)
+		assert first.reserve() == pytest.approx(0.4, abs=0.01)
+
+		# Slowing down one slows down all of them.
+		second.throttle(ThrottlingStatus("Red", 90))
+		assert first.reserve() == pytest.approx(3 / 2.5, abs=0.02)
+		assert first.rate == 2.5
+
+		# Buckets with other names have their own tokens.
+		with SharedTokenBucket(filename, rate=5, name="other") as other:
+			assert other.reserve() == 0
+
+
+def test_shared_token_bucket_acquire(tmp_pathplus: PathPlus):
+	filename = tmp_pathplus / "rate_limit.sqlite"
+
+	with SharedTokenBucket(filename, rate=100) as bucket:
+		# Another process holds the lock on the database.
+		connection = sqlite3.connect(filename, isolation_level=None)
+		connection.execute("BEGIN IMMEDIATE")
+
+		async def main() -> None:
+			acquire = asyncio.ensure_future(bucket.acquire())
+
+			# The event loop keeps running while the bucket waits for the lock.
+			await asyncio.sleep(0.1)
+			assert not acquire.done()
+
+			connection.execute("COMMIT")
+			await acquire
+
+		try:
+			asyncio.run(main())
+		finally:
+			connection.close()
+
+
+def test_shared_token_bucket_clear_cache(tmp_cache_dir: PathPlus):
+	with SharedTokenBucket(rate=100) as bucket:
+		assert bucket.filename == os.fspath(tmp_cache_dir / "rate_limit.sqlite")
+		bucket.wait()
+
+		# The database is deleted along with the rest of the cache, and created again when next used.
+		clear_cache()
+		assert not (tmp_cache_dir / "rate_limit.sqlite").exists()
+
+		bucket.wait()
+		asyncio.run(bucket.acquire())
+		assert (tmp_cache_dir / "rate_limit.sqlite").is_file()
+
+
+def _wait_for_token(filename: str) -> List[float]:
+	times = []
+
+	with SharedTokenBucket(filename, rate=10) as bucket:
+		for _ in range(3):
+			bucket.wait()
+			times.append(time.time())
+
+	return times
+
+
+def test_shared_token_bucket_processes(tmp_pathplus: PathPlus):
+	filename = os.fspath(tmp_pathplus / "rate_limit.sqlite")
+
+	with ProcessPoolExecutor(max_workers=3, mp_context=multiprocessing.get_context("spawn")) as executor:
+		times = sorted(itertools.chain.from_iterable(executor.map(_wait_for_token, [filename] * 3)))
+
+	assert len(times) == 9
+	assert min(b - a for a, b in zip(times, times[1:])) >= 0.09
+
+
+def test_set_rate_limiter(monkeypatch: MonkeyPatch, tmp_pathplus: PathPlus):
+	monkeypatch.setattr(chemistry_tools.cache, "bucket", chemistry_tools.cache.bucket)
+	monkeypatch.setattr(chemistry_tools.cache._adapter, "bucket", chemistry_tools.cache._adapter.bucket)
+
+	with SharedTokenBucket(tmp_pathplus / "rate_limit.sqlite") as bucket:
+		set_rate_limiter(bucket)
+
+		assert chemistry_tools.cache.bucket is bucket
+		assert chemistry_tools.cache._adapter.bucket is bucket
+		assert AsyncPubChem(cache_dir=tmp_pathplus).bucket is bucket
@@ -0,0 +1,102 @@
+# stdlib
+import asyncio
+import threading
+import time
+
+# 3rd party
+import pytest
+
+# this package
+from chemistry_tools.single_flight import SingleFlight
+
+
+def test_do():
+	flight = SingleFlight()
+	calls = []
+	results = []
+
+	def function():
+		token = object()
+		calls.append(token)
+		time.sleep(0.1)
+		return token
+
+	def worker(key: str):
+		results.append((key, flight.do(key, function)))
+
+	threads = [threading.Thread(target=worker, args=(key, )) for key in "aaaab"]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert len(calls) == 2
+	tokens = {key: {id(token) for k, token in results if k == key} for key in "ab"}
+	assert len(tokens['a']) == len(tokens['b']) == 1
+	assert tokens['a'] != tokens['b']
+	assert len(flight) == 0
+
+	# The result is not kept once the call has finished.
+	assert flight.do('a', function) is calls[2]
+
+
+def test_do_exception():
+	flight = SingleFlight()
+	errors = []
+
+	def function():
+		time.sleep(0.1)
+		raise ValueError("failed")
+
+	def worker():
+		try:
+			flight.do('a', function)
+		except ValueError as e:
+			errors.append(e)
+
+	threads = [threading.Thread(target=worker) for _ in range(3)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert len(errors) == 3
+	assert len({id(error) for error in errors}) == 1
+
+
+def test_do_async():
+	flight = SingleFlight()
+	calls = []
+
+	async def function():
+		token = object()
+		calls.append(token)
+		await asyncio.sleep(0.1)
+		return token
+
+	async def failing():
+		await asyncio.sleep(0.1)
+		raise ValueError("failed")
+
+	async def main():
+		results = await asyncio.gather(*(flight.do_async(key, function) for key in "aaab"))
+		assert len(flight) == 0
+
+		errors = await asyncio.gather(*(flight.do_async('c', failing) for _ in range(3)), return_exceptions=True)
+		assert all(isinstance(error, ValueError) for error in errors)
+
+		# Cancelling one waiter does not cancel the call.
+		first = asyncio.ensure_future(flight.do_async('d', function))
+		second = asyncio.ensure_future(flight.do_async('d', function))
+		await asyncio.sleep(0.01)
+		first.cancel()
+
+		with pytest.raises(asyncio.CancelledError):
+			await first
+
+		return results, await second
+
+	results, second = asyncio.run(main())
+	assert results == [calls[0], calls[0], calls[0], calls[1]]
+	assert len(calls) == 3
+	assert second is calls[2]
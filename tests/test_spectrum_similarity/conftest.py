@@ -0,0 +1,21 @@
+# stdlib
+from typing import List
+
+# 3rd party
+import numpy
+import pytest
+
+# this package
+from chemistry_tools.spectrum_similarity import create_array
+
+
+def random_spectrum(rng: numpy.random.Generator, n_peaks: int = 30) -> numpy.ndarray:
+	mz = rng.choice(numpy.arange(50, 400), size=n_peaks, replace=False)
+	intensities = rng.integers(1, 10000, size=n_peaks)
+	return create_array(intensities=intensities, mz=mz)
+
+
+@pytest.fixture()
+def spectra() -> List[numpy.ndarray]:
+	rng = numpy.random.default_rng(20201)
+	return [random_spectrum(rng, int(rng.integers(5, 60))) for _ in range(40)]
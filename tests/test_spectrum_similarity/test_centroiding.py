@@ -0,0 +1,109 @@
+# stdlib
+from typing import Sequence
+
+# 3rd party
+import numpy
+import pytest
+
+# this package
+from chemistry_tools.spectrum_similarity import Spectrum, SpectrumSimilarity
+from chemistry_tools.spectrum_similarity.centroiding import centroid, centroid_batch, smooth
+from chemistry_tools.spectrum_similarity.preprocessing import PeakBatch
+
+
+def profile(centres: Sequence[float], heights: Sequence[float], width: float = 0.02) -> numpy.ndarray:
+	mz = numpy.arange(90, 310, 0.005)
+	intensity = numpy.zeros_like(mz)
+
+	for centre, height in zip(centres, heights):
+		intensity += height * numpy.exp(-0.5 * ((mz - centre) / width)**2)
+
+	return numpy.column_stack((mz, intensity))
+
+
+def test_centroid():
+	scan = profile([100.0213, 150.5, 299.987], [1000, 50, 400])
+	peaks = centroid(scan[:, 0], scan[:, 1], min_intensity=1)
+
+	numpy.testing.assert_allclose(peaks[:, 0], [100.0213, 150.5, 299.987], atol=1e-3)
+	numpy.testing.assert_allclose(peaks[:, 1], [1000, 50, 400], rtol=0.01)
+
+
+def test_centroid_noise():
+	rng = numpy.random.default_rng(3)
+	scan = profile([120.1, 200.2], [1000, 800])
+	noisy = scan[:, 1] + rng.normal(0, 10, size=len(scan))
+
+	# Without smoothing or a threshold the noise produces many spurious maxima.
+	assert len(centroid(scan[:, 0], noisy)) > 100
+
+	peaks = centroid(scan[:, 0], noisy, smoothing=9, min_intensity=100)
+	numpy.testing.assert_allclose(peaks[:, 0], [120.1, 200.2], atol=2e-3)
+
+
+def test_centroid_batch():
+	scans = [
+			profile([100.5, 200.25], [100, 300]),
+			numpy.empty((0, 2)),
+			profile([150.75], [50]),
+			]
+	batch = PeakBatch.from_spectra([Spectrum.from_array(scan) for scan in scans])
+	centroided = centroid_batch(batch, min_intensity=1)
+
+	assert numpy.diff(centroided.offsets).tolist() == [2, 0, 1]
+	numpy.testing.assert_allclose(centroided.mz, [100.5, 200.25, 150.75], atol=1e-3)
+
+	# Each scan matches centroiding it on its own.
+	for scan, spectrum in zip(scans, centroided.to_spectra()):
+		expected = centroid(scan[:, 0], scan[:, 1], min_intensity=1)
+		numpy.testing.assert_allclose(spectrum.to_array(), expected.reshape(-1, 2))
+
+
+def test_centroid_apex_at_edge():
+	# Peaks cut off at the start and end of the scan, with their apices at the first and last points.
+	mz = [100.0, 100.01, 100.02, 100.03, 100.04, 100.05, 100.06, 100.07]
+	intensity = [90, 60, 30, 10, 20, 40, 80, 100]
+	peaks = centroid(mz, intensity)
+
+	numpy.testing.assert_allclose(peaks[:, 0], [
+			numpy.average(mz[:4], weights=intensity[:4]),
+			numpy.average(mz[3:], weights=intensity[3:]),
+			])
+	numpy.testing.assert_allclose(peaks[:, 1], [90, 100])
+
+	# The same, for scans within a batch.
+	spectra = [Spectrum(mz, intensity), Spectrum(mz[::-1], intensity[::-1])]
+	centroided = centroid_batch(PeakBatch.from_spectra(spectra))
+	for spectrum in centroided.to_spectra():
+		numpy.testing.assert_allclose(spectrum.to_array(), peaks)
+
+
+def test_centroid_flat_top():
+	# Saturated peaks, whose apices span several points.
+	numpy.testing.assert_allclose(centroid([1, 2, 3, 4, 5], [0, 5, 5, 5, 0]), [[3, 5]])
+	numpy.testing.assert_allclose(centroid([1, 2, 3, 4, 5, 6, 7], [0, 1, 5, 5, 5, 1, 0]), [[4, 5]])
+
+	# A plateau on the rising side of a peak is not a peak itself.
+	numpy.testing.assert_allclose(centroid([1, 2, 3, 4, 5], [0, 5, 5, 7, 0]), [[43 / 12, 7]])
+
+	# Peaks either side of a flat valley.
+	numpy.testing.assert_allclose(centroid([1, 2, 3, 4, 5, 6, 7], [0, 4, 0, 0, 0, 2, 0]), [[2, 4], [6, 2]])
+
+
+def test_centroided_spectra_can_be_compared():
+	top = centroid(*profile([100, 150, 200], [100, 50, 20]).T, min_intensity=1)
+	bottom = centroid(*profile([100, 150, 200], [100, 50, 20]).T, min_intensity=1)
+	assert SpectrumSimilarity(top, bottom, b=0).score()[0] == pytest.approx(1)
+
+
+def test_smooth():
+	batch = PeakBatch([1, 2, 3, 4, 5], [0, 3, 0, 6, 0], [0, 3, 5], [numpy.nan, numpy.nan])
+	numpy.testing.assert_allclose(smooth(batch, 3), [1.5, 1, 1.5, 3, 3])
+
+	with pytest.raises(ValueError, match="'window' must be at least 1"):
+		smooth(batch, 0)
+
+
+def test_centroid_length_mismatch():
+	with pytest.raises(ValueError, match="'mz' and 'intensities' must be the same length"):
+		centroid([1, 2, 3], [1, 2])
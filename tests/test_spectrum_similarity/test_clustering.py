@@ -0,0 +1,82 @@
+# stdlib
+from typing import List
+
+# 3rd party
+import numpy
+import pytest
+
+# this package
+from chemistry_tools.spectrum_similarity import Spectrum, SpectrumSimilarity
+from chemistry_tools.spectrum_similarity.clustering import cluster_spectra, consensus_spectrum
+
+
+def make_collection(spectra: List[numpy.ndarray]) -> List[Spectrum]:
+	# Three noisy copies of each of the first ten spectra, each group at its own precursor m/z.
+	rng = numpy.random.default_rng(5)
+	collection = []
+
+	for idx, spectrum in enumerate(spectra[:10]):
+		for _ in range(3):
+			noisy = spectrum.astype(numpy.float64)
+			noisy[:, 1] *= rng.uniform(0.9, 1.1, size=len(noisy))
+			collection.append(Spectrum.from_array(noisy, precursor_mz=200 + idx * 0.5 + rng.uniform(0, 1e-4)))
+
+	collection.sort(key=lambda spectrum: spectrum.precursor_mz)
+	return collection
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_cluster_spectra(spectra: List[numpy.ndarray], processes: int):
+	collection = make_collection(spectra)
+	clusters = list(cluster_spectra(iter(collection), threshold=0.9, processes=processes))
+
+	assert len(clusters) == 10
+	assert sorted(idx for cluster in clusters for idx in cluster.members) == list(range(30))
+
+	for cluster in clusters:
+		assert len(cluster.members) == 3
+		assert len({round(collection[idx].precursor_mz, 1) for idx in cluster.members}) == 1
+		assert cluster.consensus.precursor_mz == pytest.approx(collection[cluster.members[0]].precursor_mz, abs=1e-3)
+
+		for idx in cluster.members:
+			assert SpectrumSimilarity(cluster.consensus.to_array(), collection[idx].to_array()).score()[0] > 0.9
+
+
+def test_threshold_separates(spectra: List[numpy.ndarray]):
+	# Different spectra sharing a precursor are not merged.
+	collection = [Spectrum.from_array(spectrum, precursor_mz=300) for spectrum in spectra[:5]]
+	clusters = list(cluster_spectra(collection, threshold=0.99))
+	assert [cluster.members for cluster in clusters] == [[0], [1], [2], [3], [4]]
+
+	# Identical spectra with distant precursors are not merged either.
+	collection = [Spectrum.from_array(spectra[0], precursor_mz=300 + idx) for idx in range(3)]
+	clusters = list(cluster_spectra(collection))
+	assert len(clusters) == 3
+
+
+def test_max_bucket_size(spectra: List[numpy.ndarray]):
+	collection = [Spectrum.from_array(spectra[0], precursor_mz=300) for _ in range(5)]
+	assert [c.members for c in cluster_spectra(collection)] == [[0, 1, 2, 3, 4]]
+	assert [c.members for c in cluster_spectra(collection, max_bucket_size=2)] == [[0, 1], [2, 3], [4]]
+
+
+def test_cluster_spectra_errors(spectra: List[numpy.ndarray]):
+	with pytest.raises(ValueError, match="Spectrum 0 does not have a precursor m/z."):
+		list(cluster_spectra(spectra))
+
+	collection = [Spectrum.from_array(spectra[0], precursor_mz=p) for p in (300, 200)]
+	with pytest.raises(ValueError, match="The spectra must be in ascending order of precursor m/z."):
+		list(cluster_spectra(collection))
+
+
+def test_consensus_spectrum():
+	first = Spectrum([100, 200, 300], [100, 50, 10], precursor_mz=400)
+	second = Spectrum([100, 200, 350], [100, 30, 20], precursor_mz=402)
+
+	consensus = consensus_spectrum([first, second], b=0)
+	numpy.testing.assert_array_equal(consensus.mz, [100, 200, 300, 350])
+	numpy.testing.assert_allclose(consensus.intensity, [100, 40, 5, 10])
+	assert consensus.precursor_mz == 401
+
+	consensus = consensus_spectrum([first, second], b=0, min_fraction=1)
+	numpy.testing.assert_array_equal(consensus.mz, [100, 200])
@@ -0,0 +1,80 @@
+# stdlib
+from typing import List, Tuple
+
+# 3rd party
+import numpy
+import pytest
+
+# this package
+from chemistry_tools.spectrum_similarity import create_array
+from chemistry_tools.spectrum_similarity.deconvolution import PROTON_MASS, averagine_pattern, deconvolute
+from chemistry_tools.spectrum_similarity.preprocessing import ISOTOPE_SPACING
+
+
+def envelope(mass: float, charge: int, height: float = 1000, n_isotopes: int = 4) -> List[Tuple[float, float]]:
+	mz = mass / charge + PROTON_MASS
+	pattern = averagine_pattern(mass, n_isotopes) * height
+	return [(mz + idx * ISOTOPE_SPACING / charge, abundance) for idx, abundance in enumerate(pattern)]
+
+
+@pytest.fixture()
+def peaks() -> numpy.ndarray:
+	peaks = envelope(1200.5, 1) + envelope(1500.7, 2) + envelope(2400.1, 3) + [(333.3, 50), (900.1234, 80)]
+	mz, intensity = zip(*peaks)
+	return create_array(intensities=intensity, mz=mz)
+
+
+def test_deconvolute(peaks: numpy.ndarray):
+	clusters = deconvolute(peaks)
+
+	assert clusters.charge.tolist() == [2, 3, 1]
+	numpy.testing.assert_allclose(clusters.monoisotopic_mass, [1500.7, 2400.1, 1200.5])
+	assert clusters.n_peaks.tolist() == [4, 4, 4]
+	assert numpy.isnan(clusters.score).all()
+
+	# The two lone peaks are not assigned.
+	assert (clusters.assignment == -1).sum() == 2
+	assert numpy.bincount(clusters.assignment[clusters.assignment >= 0]).tolist() == [4, 4, 4]
+	numpy.testing.assert_allclose(clusters.intensity.sum(), peaks[:-2, 1].sum())
+
+
+def test_deconvolute_tolerance(peaks: numpy.ndarray):
+	shifted = peaks.copy()
+	shifted[1, 0] += 0.01  # 8 ppm at m/z 1202.5
+
+	assert deconvolute(shifted).n_peaks.tolist() == [4, 4, 4]
+	assert deconvolute(shifted, tolerance=5).n_peaks.tolist() == [4, 4, 2]
+
+
+def test_deconvolute_averagine(peaks: numpy.ndarray):
+	clusters = deconvolute(peaks, averagine=True)
+	numpy.testing.assert_allclose(clusters.score, 1, atol=0.01)
+
+	# A "cluster" with the wrong isotope pattern.
+	wrong = numpy.vstack([peaks, [[600.0, 10], [601.00335, 1000]]])
+	assert len(deconvolute(wrong).charge) == 4
+	assert len(deconvolute(wrong, averagine=True, min_score=0.9).charge) == 3
+
+
+def test_deconvolute_empty():
+	clusters = deconvolute(numpy.empty((0, 2)))
+	assert len(clusters.charge) == 0
+	assert len(clusters.assignment) == 0
+
+	clusters = deconvolute(create_array(intensities=[1, 2], mz=[100, 200]))
+	assert clusters.assignment.tolist() == [-1, -1]
+
+
+def test_deconvolute_arguments(peaks: numpy.ndarray):
+	with pytest.raises(ValueError, match="'max_charge' must be at least 1"):
+		deconvolute(peaks, max_charge=0)
+
+	with pytest.raises(ValueError, match="'min_peaks' must be between 1 and 'max_isotopes'"):
+		deconvolute(peaks, min_peaks=10)
+
+
+def test_averagine_pattern():
+	# The most abundant isotope peak moves to higher masses as the mass increases.
+	assert numpy.argmax(averagine_pattern(500)) == 0
+	assert numpy.argmax(averagine_pattern(5000)) == 3
+	assert averagine_pattern(1000).max() == 1
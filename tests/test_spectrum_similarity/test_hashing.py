@@ -0,0 +1,100 @@
+# stdlib
+import os
+import sqlite3
+from typing import List
+
+# 3rd party
+import numpy
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from chemistry_tools.cache import clear_cache
+from chemistry_tools.spectrum_similarity import Spectrum, SpectrumSimilarity, as_spectrum
+from chemistry_tools.spectrum_similarity.hashing import SimilarityCache, _exact_hash, find_duplicates, spectrum_hash
+
+
+def test_spectrum_hash(spectra: List[numpy.ndarray]):
+	spectrum = spectra[0]
+	expected = spectrum_hash(spectrum)
+	assert len(expected) == 40
+
+	# Peak order, intensity scale and tiny float noise don't change the hash.
+	shuffled = spectrum[numpy.random.default_rng(1).permutation(len(spectrum))]
+	assert spectrum_hash(shuffled) == expected
+	assert spectrum_hash(Spectrum(spectrum[:, 0], spectrum[:, 1] * 3.5)) == expected
+	assert spectrum_hash(Spectrum(spectrum[:, 0] + 1e-9, spectrum[:, 1])) == expected
+
+	# Different spectra have different hashes.
+	assert len({spectrum_hash(s) for s in spectra}) == len(spectra)
+	assert spectrum_hash(Spectrum(spectrum[:, 0] + 0.01, spectrum[:, 1])) != expected
+
+
+def test_find_duplicates(spectra: List[numpy.ndarray]):
+	collection = list(spectra[:5]) + [spectra[1], spectra[3][::-1], spectra[1]]
+	assert find_duplicates(collection) == [[1, 5, 7], [3, 6]]
+	assert find_duplicates(spectra) == []
+
+
+def test_similarity_cache(spectra: List[numpy.ndarray], tmp_pathplus: PathPlus):
+	filename = tmp_pathplus / "scores.sqlite"
+
+	with SimilarityCache(filename) as cache:
+		assert len(cache) == 0
+		scores = cache.score(spectra[0], spectra[1])
+		assert scores == pytest.approx(SpectrumSimilarity(spectra[0], spectra[1]).score())
+		assert len(cache) == 1
+
+		# Repeated comparisons are looked up.
+		assert cache.score(spectra[0], spectra[1]) == scores
+		assert len(cache) == 1
+
+		# Different parameters and order are stored separately.
+		cache.score(spectra[0], spectra[1], b=10)
+		cache.score(spectra[1], spectra[0])
+		assert len(cache) == 3
+
+	with SimilarityCache(filename) as cache:
+		assert len(cache) == 3
+		hash_a, hash_b = _exact_hash(as_spectrum(spectra[0])), _exact_hash(as_spectrum(spectra[1]))
+		assert cache.get(hash_a, hash_b, {"xlim": [50, 1200], "b": 1}) == scores
+		assert cache.get(hash_a, hash_b) is None
+
+		cache.set(hash_a, hash_b, (0.5, 0.25))
+		assert cache.get(hash_a, hash_b) == (0.5, 0.25)
+
+		cache.clear()
+		assert len(cache) == 0
+
+	# A closed cache is not reopened.
+	with pytest.raises(sqlite3.ProgrammingError, match="closed database"):
+		len(cache)
+
+
+def test_similarity_cache_rounding(tmp_pathplus: PathPlus):
+	# The spectra have the same hash, but only the second is identical to the reference spectrum.
+	spectrum = numpy.array([[100.00001, 100], [200, 50]])
+	similar = numpy.array([[100.00004, 100], [200, 50]])
+	reference = numpy.array([[100.00004, 100], [200, 50]])
+	assert spectrum_hash(spectrum) == spectrum_hash(similar)
+
+	with SimilarityCache(tmp_pathplus / "scores.sqlite") as cache:
+		assert cache.score(spectrum, reference) == pytest.approx(SpectrumSimilarity(spectrum, reference).score())
+		assert cache.score(similar, reference) == pytest.approx((1.0, 1.0))
+		assert len(cache) == 2
+
+
+def test_similarity_cache_clear_cache(spectra: List[numpy.ndarray], tmp_cache_dir: PathPlus):
+	with SimilarityCache() as cache:
+		assert cache.filename == os.fspath(tmp_cache_dir / "similarity.sqlite")
+		cache.score(spectra[0], spectra[1])
+
+		clear_cache()
+		assert not tmp_cache_dir.exists()
+
+		# The database is recreated when next used.
+		assert len(cache) == 0
+		expected = SpectrumSimilarity(spectra[0], spectra[1]).score()
+		assert cache.score(spectra[0], spectra[1]) == pytest.approx(expected)
+		assert len(cache) == 1
+		assert (tmp_cache_dir / "similarity.sqlite").is_file()
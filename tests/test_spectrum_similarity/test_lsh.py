@@ -0,0 +1,65 @@
+# stdlib
+from typing import List
+
+# 3rd party
+import numpy
+import pytest
+
+# this package
+from chemistry_tools.spectrum_similarity.lsh import ApproximateIndex, measure_recall
+from chemistry_tools.spectrum_similarity.search import SpectralLibrary, search_library
+
+
+def test_index_arguments(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary(spectra)
+
+	with pytest.raises(ValueError, match="'bits' must be between 1 and 63"):
+		ApproximateIndex(library, bits=64)
+
+	with pytest.raises(ValueError, match="'n_tables' must be at least 1"):
+		ApproximateIndex(library, n_tables=0)
+
+	assert repr(ApproximateIndex(library, n_tables=4, bits=8)) == "<ApproximateIndex(40 spectra, 4x8 bits)>"
+
+
+def test_self_is_candidate(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary(spectra, names=[f"spectrum {idx}" for idx in range(len(spectra))])
+	index = ApproximateIndex(library, chunk_size=7)
+
+	for idx, query in enumerate(spectra):
+		hits = index.search(query, top_k=3)
+		assert hits[0].index == idx
+		assert hits[0].name == f"spectrum {idx}"
+		assert hits[0].score == pytest.approx(1)
+
+
+def test_chunking_is_consistent(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary(spectra)
+	whole = ApproximateIndex(library, seed=5)
+	chunked = ApproximateIndex(library, seed=5, chunk_size=3)
+	numpy.testing.assert_array_equal(whole._keys, chunked._keys)
+
+
+def test_scores_are_exact(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary(spectra)
+	index = ApproximateIndex(library, n_tables=4, bits=4)
+	query = spectra[11]
+
+	exact = {hit.index: hit for hit in search_library(query, library, top_k=len(spectra))}
+
+	for hit in index.search(query, top_k=len(spectra)):
+		assert hit.score == pytest.approx(exact[hit.index].score)
+		assert hit.reverse_score == pytest.approx(exact[hit.index].reverse_score)
+
+
+def test_measure_recall(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary(spectra)
+
+	# With a single bit per table every spectrum is shortlisted, so the search is exact.
+	report = measure_recall(ApproximateIndex(library, n_tables=64, bits=1), spectra[:5], top_k=5)
+	assert report.recall == 1.0
+	assert report.n_queries == 5
+
+	report = measure_recall(ApproximateIndex(library, n_tables=2, bits=24), spectra[:5], top_k=5)
+	assert 0 < report.recall <= 1
+	assert 0 < report.candidate_fraction < 1
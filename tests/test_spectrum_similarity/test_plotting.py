@@ -0,0 +1,51 @@
+# stdlib
+from typing import List
+
+# 3rd party
+import numpy
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from chemistry_tools.spectrum_similarity.plotting import HeadToTailRenderer, PlotJob, render_plots
+
+pytest.importorskip("matplotlib")
+
+
+def test_renderer_reuses_figure(spectra: List[numpy.ndarray], tmp_pathplus: PathPlus):
+	renderer = HeadToTailRenderer()
+	figure = renderer.figure
+
+	renderer.render(spectra[0], spectra[1], tmp_pathplus / "first.png", "before", "after")
+	assert len(renderer._top.get_segments()) == len(spectra[0])
+	assert renderer._top_label.get_text() == "before"
+
+	renderer.render(spectra[2], spectra[3], tmp_pathplus / "second.svg")
+	assert renderer.figure is figure
+	assert len(renderer._bottom.get_segments()) == len(spectra[3])
+	assert renderer._top_label.get_text() == ''
+
+	assert (tmp_pathplus / "first.png").read_bytes().startswith(b"\x89PNG")
+	assert "<svg" in (tmp_pathplus / "second.svg").read_text()
+
+
+def test_renderer_filter(tmp_pathplus: PathPlus):
+	spectrum = numpy.array([[100, 100], [200, 0.5], [300, 50], [2000, 10]])
+
+	renderer = HeadToTailRenderer()
+	renderer.draw(spectrum, spectrum)
+	assert len(renderer._top.get_segments()) == 3
+
+	renderer = HeadToTailRenderer(b=1, filter=True)
+	renderer.draw(spectrum, spectrum)
+	assert len(renderer._top.get_segments()) == 2
+	numpy.testing.assert_array_equal(renderer._bottom.get_segments()[1], [[300, 0], [300, -50]])
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_render_plots(spectra: List[numpy.ndarray], tmp_pathplus: PathPlus, processes: int):
+	jobs = [PlotJob(spectra[idx], spectra[idx + 1], tmp_pathplus / f"{idx}.png", str(idx)) for idx in range(5)]
+	written = render_plots(jobs, processes=processes, chunk_size=2, figsize=(3, 2), dpi=50)
+
+	assert written == [str(tmp_pathplus / f"{idx}.png") for idx in range(5)]
+	assert all((tmp_pathplus / f"{idx}.png").is_file() for idx in range(5))
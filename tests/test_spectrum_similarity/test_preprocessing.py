@@ -0,0 +1,104 @@
+# stdlib
+from typing import List
+
+# 3rd party
+import numpy
+import pytest
+
+# this package
+from chemistry_tools.spectrum_similarity import Spectrum
+from chemistry_tools.spectrum_similarity.preprocessing import (
+		ClipMZ,
+		Deisotope,
+		MinPeaks,
+		NoiseFilter,
+		PeakBatch,
+		Pipeline,
+		RemovePrecursor,
+		TopN,
+		TransformIntensity,
+		estimate_noise
+		)
+
+
+@pytest.fixture()
+def batch() -> PeakBatch:
+	return PeakBatch.from_spectra([
+			Spectrum([100, 101.00335, 150, 200, 250], [50, 10, 20, 100, 5], precursor_mz=250),
+			Spectrum([], []),
+			Spectrum([60, 70, 80], [1, 2, 3]),
+			])
+
+
+def peak_lists(batch: PeakBatch) -> List[List[float]]:
+	return [spectrum.mz.tolist() for spectrum in batch.to_spectra()]
+
+
+def test_batch_round_trip(batch: PeakBatch):
+	assert repr(batch) == "<PeakBatch(3 spectra, 8 peaks)>"
+	assert batch.owner.tolist() == [0, 0, 0, 0, 0, 2, 2, 2]
+
+	spectra = batch.to_spectra()
+	assert [len(spectrum) for spectrum in spectra] == [5, 0, 3]
+	assert [spectrum.precursor_mz for spectrum in spectra] == [250, None, None]
+
+
+def test_clip_mz(batch: PeakBatch):
+	assert peak_lists(ClipMZ((65, 200))(batch)) == [[100, 101.00335, 150, 200], [], [70, 80]]
+
+
+def test_top_n(batch: PeakBatch):
+	assert peak_lists(TopN(2)(batch)) == [[100, 200], [], [70, 80]]
+	assert peak_lists(TopN(1, window=100)(batch)) == [[100, 200], [], [80]]
+
+
+def test_remove_precursor(batch: PeakBatch):
+	assert peak_lists(RemovePrecursor(1.5)(batch)) == [[100, 101.00335, 150, 200], [], [60, 70, 80]]
+	assert peak_lists(RemovePrecursor(100, "ppm")(batch))[0] == [100, 101.00335, 150, 200]
+
+	with pytest.raises(ValueError, match="Unknown tolerance unit 'mDa'"):
+		RemovePrecursor(1, "mDa")(batch)
+
+
+def test_transform_intensity(batch: PeakBatch):
+	numpy.testing.assert_allclose(TransformIntensity("sqrt")(batch).intensity, numpy.sqrt(batch.intensity))
+	numpy.testing.assert_allclose(TransformIntensity("log")(batch).intensity, numpy.log1p(batch.intensity))
+
+	with pytest.raises(ValueError, match="'cube' is not a valid IntensityTransform"):
+		TransformIntensity("cube")(batch)
+
+
+def test_noise(batch: PeakBatch):
+	numpy.testing.assert_array_equal(estimate_noise(batch), [20, numpy.nan, 2])
+	assert peak_lists(NoiseFilter(1)(batch)) == [[100, 150, 200], [], [70, 80]]
+
+
+def test_min_peaks(batch: PeakBatch):
+	assert peak_lists(MinPeaks(4)(batch)) == [[100, 101.00335, 150, 200, 250], [], []]
+
+
+def test_deisotope(batch: PeakBatch):
+	assert peak_lists(Deisotope()(batch)) == [[100, 150, 200, 250], [], [60, 70, 80]]
+
+	doubly_charged = PeakBatch.from_spectra([Spectrum([500, 500.50168, 501.00335], [100, 60, 20])])
+	assert peak_lists(Deisotope()(doubly_charged)) == [[500, 500.50168]]
+	assert peak_lists(Deisotope(max_charge=2)(doubly_charged)) == [[500]]
+
+
+def test_pipeline_caches(spectra: List[numpy.ndarray]):
+	pipeline = Pipeline([NoiseFilter(), TopN(5), TransformIntensity()])
+	assert pipeline == Pipeline([NoiseFilter(), TopN(5), TransformIntensity()])
+
+	objects = [Spectrum.from_array(spectrum) for spectrum in spectra]
+	processed = pipeline(objects)
+
+	assert len(processed) == len(spectra)
+	assert all(len(spectrum) <= 5 for spectrum in processed)
+
+	# The same pipeline returns the cached spectra.
+	again = Pipeline([NoiseFilter(), TopN(5), TransformIntensity()])(objects)
+	assert all(a is b for a, b in zip(processed, again))
+
+	# Unhashable steps are applied without caching.
+	uncached = Pipeline([lambda batch: batch, TopN(5)])
+	assert len(uncached(objects)) == len(spectra)
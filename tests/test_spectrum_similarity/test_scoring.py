@@ -0,0 +1,105 @@
+# stdlib
+import math
+from typing import List
+
+# 3rd party
+import numpy
+import pytest
+
+# this package
+from chemistry_tools.spectrum_similarity import SpectrumSimilarity, create_array
+from chemistry_tools.spectrum_similarity.scoring import METRICS, align, align_batch, score_alignment, score_pairs
+
+
+def test_align():
+	top = create_array(mz=[60, 70, 80], intensities=[100, 50, 20])
+	bottom = create_array(mz=[70, 80, 90], intensities=[10, 100, 40])
+
+	aligned = align(top, bottom, b=0)
+	assert aligned.n_pairs == 1
+	assert aligned.mz.tolist() == [60, 70, 80, 90]
+	assert aligned.intensity_top.tolist() == [100, 50, 20, 0]
+	assert aligned.intensity_bottom.tolist() == [0, 10, 100, 40]
+	assert aligned.in_top.tolist() == [True, True, True, False]
+	assert aligned.in_bottom.tolist() == [False, True, True, True]
+
+
+def test_align_batch_empty():
+	aligned = align_batch([])
+	assert aligned.n_pairs == 0
+	assert all(len(value) == 0 for value in score_alignment(aligned).values())
+
+
+def test_single_pair_scores():
+	top = create_array(mz=[60, 70, 80], intensities=[100, 50, 20])
+	bottom = create_array(mz=[70, 80, 90], intensities=[10, 100, 40])
+
+	scores = score_alignment(align(top, bottom, b=0))
+	assert set(scores) == set(METRICS)
+	assert scores["matched_peaks"].tolist() == [2]
+	assert scores["matched_fraction"][0] == pytest.approx(2 / 3)
+
+	u, v = numpy.array([100, 50, 20, 0]), numpy.array([0, 10, 100, 40])
+	assert scores["cosine"][0] == pytest.approx(u @ v / (numpy.linalg.norm(u) * numpy.linalg.norm(v)))
+
+	mz = numpy.array([60, 70, 80, 90])
+	wu, wv = mz**3 * u**0.6, mz**3 * v**0.6
+	weighted_cosine = wu @ wv / (numpy.linalg.norm(wu) * numpy.linalg.norm(wv))
+	assert scores["weighted_dot"][0] == pytest.approx(weighted_cosine)
+
+	# Only one pair of adjacent matched peaks: (70, 80)
+	ratio = (100**0.6 * 50**0.6) / (10**0.6 * 20**0.6)
+	ratio_term = min(ratio, 1 / ratio)
+	expected_composite = (3 * weighted_cosine**2 + 2 * ratio_term) / (3 + 2)
+	assert scores["nist_composite"][0] == pytest.approx(expected_composite)
+
+	assert 0 < scores["entropy"][0] < 1
+
+
+def test_entropy_unweighted():
+	top = create_array(mz=[60, 70], intensities=[1, 1])
+	bottom = create_array(mz=[70, 80], intensities=[1, 1])
+
+	score = score_alignment(align(top, bottom, b=0), ["entropy"], entropy_weighting=False)["entropy"][0]
+
+	# S(P) = S(Q) = ln 2, S((P+Q)/2) = 1.5 ln 2
+	expected = 1 - (2 * 1.5 * math.log(2) - 2 * math.log(2)) / math.log(4)
+	assert score == pytest.approx(expected)
+
+
+def test_identical_and_disjoint():
+	spectrum = create_array(mz=[60, 70, 80], intensities=[100, 50, 20])
+	other = create_array(mz=[61, 71], intensities=[100, 50])
+
+	scores = score_pairs([(spectrum, spectrum), (spectrum, other)], b=0)
+
+	for metric in ["cosine", "reverse_cosine", "weighted_dot", "nist_composite", "entropy", "matched_fraction"]:
+		assert scores[metric] == pytest.approx([1, 0]), metric
+
+	assert scores["matched_peaks"].tolist() == [3, 0]
+
+
+def test_batch_matches_single(spectra: List[numpy.ndarray]):
+	pairs = [(spectra[idx], spectra[idx + 1]) for idx in range(0, 20)]
+	batch = score_pairs(pairs)
+
+	for idx, (top, bottom) in enumerate(pairs):
+		single = score_alignment(align(top, bottom))
+		for metric in METRICS:
+			assert batch[metric][idx] == pytest.approx(single[metric][0])
+
+		expected = SpectrumSimilarity(top, bottom).score()
+		assert batch["cosine"][idx] == pytest.approx(expected[0])
+		assert batch["reverse_cosine"][idx] == pytest.approx(expected[1])
+
+
+def test_spectrum_similarity_scores(spectra: List[numpy.ndarray]):
+	similarity = SpectrumSimilarity(spectra[0], spectra[1])
+	scores = similarity.scores(["cosine", "matched_peaks"])
+	assert scores == {"cosine": pytest.approx(similarity.score()[0]), "matched_peaks": scores["matched_peaks"]}
+	assert isinstance(scores["matched_peaks"], int)
+
+
+def test_unknown_metric():
+	with pytest.raises(ValueError, match="Unknown metric 'foo'"):
+		score_alignment(align_batch([]), ["foo"])
@@ -0,0 +1,150 @@
+# stdlib
+from typing import List
+
+# 3rd party
+import numpy
+import pytest
+
+# this package
+from chemistry_tools.spectrum_similarity import Spectrum, SpectrumSimilarity
+from chemistry_tools.spectrum_similarity.search import SpectralLibrary, parallel_search, search_library
+
+
+def test_library_layout(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary(spectra, b=0)
+	assert len(library) == len(spectra)
+	assert library.offsets[-1] == len(library.mz) == len(library.intensity) == len(library.owner)
+	assert repr(library) == "<SpectralLibrary(40 spectra)>"
+
+	for idx in range(len(library)):
+		mz = library.mz[library.offsets[idx]:library.offsets[idx + 1]]
+		assert (numpy.diff(mz) > 0).all()
+
+
+def test_names_length(spectra: List[numpy.ndarray]):
+	with pytest.raises(ValueError, match="'names' must be the same length as 'spectra'"):
+		SpectralLibrary(spectra, names=["a", "b"])
+
+
+@pytest.mark.parametrize("b", [0, 1, 10])
+def test_scores_match_spectrum_similarity(spectra: List[numpy.ndarray], b: float):
+	library = SpectralLibrary(spectra, b=b)
+	query = spectra[3]
+
+	hits = search_library(query, library, top_k=len(spectra))
+	assert len(hits) == len(spectra)
+	assert hits[0].index == 3
+	assert hits[0].score == pytest.approx(1)
+
+	for hit in hits:
+		expected = SpectrumSimilarity(query, spectra[hit.index], b=b).score()
+		assert hit.score == pytest.approx(expected[0])
+		assert hit.reverse_score == pytest.approx(expected[1])
+
+	scores = [hit.score for hit in hits]
+	assert scores == sorted(scores, reverse=True)
+
+
+def test_names(spectra: List[numpy.ndarray]):
+	names = [f"spectrum {idx}" for idx in range(len(spectra))]
+	library = SpectralLibrary(spectra, names=names)
+	hits = library.search(spectra[7], top_k=3)
+	assert len(hits) == 3
+	assert hits[0].name == "spectrum 7"
+
+
+def test_parallel_search(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary(spectra)
+	queries = spectra[:5]
+
+	results = parallel_search(queries, library, top_k=5, processes=2, partitions=3)
+	assert len(results) == len(queries)
+
+	for query, hits in zip(queries, results):
+		expected = search_library(query, library, top_k=5)
+		assert [hit.index for hit in hits] == [hit.index for hit in expected]
+		assert [hit.score for hit in hits] == pytest.approx([hit.score for hit in expected])
+
+
+def test_spectrum_objects(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary([Spectrum.from_array(spectrum) for spectrum in spectra])
+	query = Spectrum.from_array(spectra[11])
+
+	hits = search_library(query, library, top_k=3)
+	assert hits == search_library(spectra[11], SpectralLibrary(spectra), top_k=3)
+	assert parallel_search([query], library, top_k=3, processes=1)[0] == hits
+
+
+@pytest.fixture()
+def precursor_library(spectra: List[numpy.ndarray]) -> SpectralLibrary:
+	precursors = [100.0 + 10 * (idx % 10) for idx in range(len(spectra))]
+	return SpectralLibrary([Spectrum.from_array(s, precursor) for s, precursor in zip(spectra, precursors)])
+
+
+def test_precursor_index(precursor_library: SpectralLibrary):
+	assert precursor_library.precursor_mz is not None
+	assert (numpy.diff(precursor_library.precursor_mz) >= 0).all()
+	assert sorted(precursor_library.order.tolist()) == list(range(len(precursor_library)))
+
+	start, stop = precursor_library.window(120, tolerance=0.5, tolerance_unit="Da")
+	assert stop - start == 4
+	assert (precursor_library.precursor_mz[start:stop] == 120).all()
+
+	assert precursor_library.window(120.001, tolerance=10, tolerance_unit="ppm") == (start, stop)
+	assert precursor_library.window(120.01, tolerance=10, tolerance_unit="ppm") == (stop, stop)
+
+	with pytest.raises(ValueError, match="Unknown tolerance unit 'mDa'"):
+		precursor_library.window(120, tolerance_unit="mDa")
+
+
+def test_precursor_search(spectra: List[numpy.ndarray], precursor_library: SpectralLibrary):
+	query = Spectrum.from_array(spectra[12], precursor_mz=120)
+
+	hits = search_library(query, precursor_library, top_k=10, mode="precursor", tolerance=1, tolerance_unit="Da")
+	assert sorted(hit.index for hit in hits) == [2, 12, 22, 32]
+	assert hits[0].index == 12
+
+	open_hits = search_library(query, precursor_library, top_k=40)
+	assert len(open_hits) == 40
+	assert {hit.index: hit.score for hit in hits} == {
+			hit.index: pytest.approx(hit.score)
+			for hit in open_hits
+			if hit.index in {2, 12, 22, 32}
+			}
+
+	# Explicit precursor m/z overrides the spectrum's
+	hits = search_library(spectra[12], precursor_library, mode="precursor", precursor_mz=130, tolerance=1e-3)
+	assert sorted(hit.index for hit in hits) == [3, 13, 23, 33]
+
+	with pytest.raises(ValueError, match="A precursor m/z is required for a precursor search."):
+		search_library(spectra[12], precursor_library, mode="precursor")
+
+	with pytest.raises(ValueError, match="The library does not have precursor m/z values."):
+		search_library(query, SpectralLibrary(spectra), mode="precursor")
+
+
+def test_hybrid_search(spectra: List[numpy.ndarray], precursor_library: SpectralLibrary):
+	query = Spectrum.from_array(spectra[12], precursor_mz=120)
+
+	hits = search_library(query, precursor_library, top_k=10, mode="hybrid")
+	window_hits = [hit for hit in hits[:4] if hit.score > 0]
+	assert hits[0].index == 12
+	assert {hit.index for hit in window_hits} <= {2, 12, 22, 32}
+	assert len(hits) == 10
+
+	# No spectra within the window, so equivalent to an open search.
+	query = Spectrum.from_array(spectra[12], precursor_mz=500)
+	assert search_library(query, precursor_library, top_k=5, mode="hybrid") == search_library(
+			query,
+			precursor_library,
+			top_k=5,
+			)
+
+
+def test_parallel_precursor_search(spectra: List[numpy.ndarray], precursor_library: SpectralLibrary):
+	queries = [Spectrum.from_array(spectra[idx], precursor_mz=100.0 + 10 * (idx % 10)) for idx in range(5)]
+
+	for mode in ["precursor", "hybrid"]:
+		results = parallel_search(queries, precursor_library, top_k=6, processes=2, partitions=4, mode=mode)
+		for query, hits in zip(queries, results):
+			assert hits == search_library(query, precursor_library, top_k=6, mode=mode)
@@ -0,0 +1,56 @@
+# stdlib
+import pickle
+from typing import List
+
+# 3rd party
+import numpy
+import pytest
+
+# this package
+from chemistry_tools.spectrum_similarity import Spectrum, SpectrumSimilarity, create_array
+
+
+def test_spectrum():
+	spectrum = Spectrum(mz=[300, 60, 40, 100], intensities=[50, 200, 1000, 5])
+
+	assert not hasattr(spectrum, "__dict__")
+	assert len(spectrum) == 4
+	assert repr(spectrum) == "<Spectrum(4 peaks)>"
+	assert spectrum.mz.tolist() == [40, 60, 100, 300]
+	assert spectrum.intensity.tolist() == [1000, 200, 5, 50]
+	assert spectrum.normalized.tolist() == [100, 20, 0.5, 5]
+
+	mz, intensity = spectrum.clip((50, 1200))
+	assert mz.tolist() == [60, 100, 300]
+	assert intensity.tolist() == [20, 0.5, 5]
+
+	mz, intensity = spectrum.filter(b=1)
+	assert mz.tolist() == [60, 300]
+	assert intensity.tolist() == [20, 5]
+	assert spectrum.filter(b=1) is spectrum.filter(b=1)
+
+	assert spectrum.norm(b=1) == pytest.approx(numpy.sqrt(20**2 + 5**2))
+
+	with pytest.raises(ValueError, match="must be the same length"):
+		Spectrum([1, 2], [3])
+
+
+def test_spectrum_array_round_trip(spectra: List[numpy.ndarray]):
+	spectrum = Spectrum.from_array(spectra[0])
+	order = numpy.argsort(spectra[0][:, 0])
+	numpy.testing.assert_array_equal(spectrum.to_array(), spectra[0][order])
+
+	unpickled = pickle.loads(pickle.dumps(spectrum))
+	numpy.testing.assert_array_equal(unpickled.mz, spectrum.mz)
+	numpy.testing.assert_array_equal(unpickled.normalized, spectrum.normalized)
+
+
+def test_spectrum_similarity_accepts_spectrum(spectra: List[numpy.ndarray]):
+	top, bottom = spectra[0], create_array(intensities=spectra[0][:, 1][::-1], mz=spectra[0][:, 0])
+
+	expected = SpectrumSimilarity(top, bottom).score()
+	top_spectrum, bottom_spectrum = Spectrum.from_array(top), Spectrum.from_array(bottom)
+
+	similarity = SpectrumSimilarity(top_spectrum, bottom_spectrum)
+	assert similarity.top_spectrum is top_spectrum
+	assert similarity.score() == pytest.approx(expected)
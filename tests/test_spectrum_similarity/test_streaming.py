@@ -0,0 +1,92 @@
+# stdlib
+import asyncio
+from typing import List
+
+# 3rd party
+import numpy
+import pytest
+
+# this package
+from chemistry_tools.spectrum_similarity.search import SpectralLibrary, search_library
+from chemistry_tools.spectrum_similarity.streaming import MatchingService
+
+
+def test_matching_service(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary(spectra)
+
+	async def run():
+		async with MatchingService(library, top_k=3, concurrency=2, max_pending=2) as service:
+
+			async def produce():
+				for idx, spectrum in enumerate(spectra):
+					await service.submit(spectrum, idx)
+				await service.close()
+
+			producer = asyncio.ensure_future(produce())
+			results = [result async for result in service.results()]
+			await producer
+
+			return results, service.latency_percentile(99)
+
+	results, p99 = asyncio.run(run())
+
+	assert sorted(result.query_id for result in results) == list(range(len(spectra)))
+	assert p99 > 0
+
+	for result in results:
+		assert result.error is None
+		assert result.hits == search_library(spectra[result.query_id], library, top_k=3)
+
+
+def test_back_pressure(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary(spectra)
+
+	async def run():
+		async with MatchingService(library, concurrency=1, max_pending=2) as service:
+			# Nothing is collecting the results, so the queues fill up and submit() waits.
+			submitted = 0
+
+			async def produce():
+				nonlocal submitted
+				for spectrum in spectra:
+					await service.submit(spectrum)
+					submitted += 1
+
+			producer = asyncio.ensure_future(produce())
+			await asyncio.sleep(0.2)
+			assert not producer.done()
+			producer.cancel()
+
+			return submitted
+
+	# Two results, one in progress, and two waiting to be searched.
+	assert asyncio.run(run()) <= 5
+
+
+def test_match_and_errors(spectra: List[numpy.ndarray]):
+	library = SpectralLibrary(spectra)
+
+	async def run():
+		service = MatchingService(library, top_k=1, concurrency=1)
+
+		with pytest.raises(RuntimeError, match="The service has not been started."):
+			await service.submit(spectra[0])
+
+		async with service:
+			hits = await service.match(spectra[5])
+
+			await service.submit(numpy.array([[1, 2, 3]]), "bad")
+			await service.close()
+
+			with pytest.raises(RuntimeError, match="The service has been closed."):
+				await service.submit(spectra[0])
+
+			results = [result async for result in service.results()]
+
+		return hits, results
+
+	hits, results = asyncio.run(run())
+	assert hits[0].index == 5
+	assert len(results) == 1
+	assert results[0].query_id == "bad"
+	assert isinstance(results[0].error, ValueError)